@@ -0,0 +1,106 @@
+"""Time the phases of a qpc command line in a fresh process.
+
+Run by startup.py as:
+
+    python probe.py ITERATIONS SUBCOMMAND [ACTION] [ARGS...]
+
+The first iteration is a cold start; the following ones run the same
+command line again in this process, as the agent or qpc batch would. The
+timings of every iteration are printed on stdout as a JSON list.
+
+Only modules needed before the clock starts are imported at the top.
+"""
+
+import json
+import os
+import sys
+import time
+
+SPAWN_TIME_ENV = "QPC_BENCH_SPAWN_TIME"
+PASSWORD = "bench-password"
+
+
+def _answer_prompts():
+    """Answer the password and pagination prompts of the commands."""
+    import builtins  # pylint: disable=import-outside-toplevel
+    import getpass  # pylint: disable=import-outside-toplevel
+
+    getpass.getpass = lambda *args, **kwargs: PASSWORD
+    builtins.input = lambda *args, **kwargs: ""
+
+
+def _run_iteration(argv, cold):
+    """Run the command line once and time each phase.
+
+    :param argv: command line arguments, without the program name
+    :param cold: True for the first iteration, which imports qpc
+    :returns: dictionary of phase durations in seconds, and the exit code
+    """
+    timings = {}
+    start = time.perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from qpc import cli, utils
+    from qpc.cache import set_cache_enabled
+    from qpc.release import PKG_NAME
+    from qpc.request import reset_retry_budget, set_jobs
+
+    # startup.py puts the subcommand and action first
+    for command in ((argv[0], None), tuple(argv[:2])):
+        if command in cli.COMMANDS:
+            cli.load_command(cli.COMMANDS[command])
+    if cold:
+        timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    command_line = cli.CLI(name=PKG_NAME)
+    args = command_line.parse_args(argv)
+    timings["argparse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    utils.read_server_config()
+    utils.read_client_token()
+    utils.read_require_auth()
+    utils.get_server_location()
+    timings["config"] = time.perf_counter() - start
+
+    handlers = utils.logger.handlers[:]
+    exit_code = 0
+    start = time.perf_counter()
+    try:
+        utils.setup_logging(args.verbosity)
+        set_jobs(args.jobs)
+        set_cache_enabled(args.use_cache)
+        reset_retry_budget()
+        command_line.run()
+    except SystemExit as error:
+        exit_code = utils.get_exit_code(error.code)
+    except Exception:  # pylint: disable=broad-except
+        exit_code = 1
+    timings["request"] = time.perf_counter() - start
+    utils.logger.handlers = handlers
+    return timings, exit_code
+
+
+def main():
+    """Run the iterations and print their timings."""
+    spawned = float(os.environ.get(SPAWN_TIME_ENV, time.time()))
+    startup = time.time() - spawned
+    iterations, argv = int(sys.argv[1]), sys.argv[2:]
+    _answer_prompts()
+    stdout, stderr = sys.stdout, sys.stderr
+    results = []
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        sys.stdout = sys.stderr = devnull
+        try:
+            for iteration in range(iterations):
+                timings, exit_code = _run_iteration(argv, iteration == 0)
+                if iteration == 0:
+                    timings["startup"] = startup
+                results.append({"timings": timings, "exit_code": exit_code})
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
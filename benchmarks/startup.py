@@ -0,0 +1,348 @@
+"""Benchmark the startup and per-command latency of qpc.
+
+Every subcommand and action registered in qpc.cli.COMMANDS is run against
+a local stub server, from a throwaway home directory, and the time spent
+in each phase is recorded:
+
+- startup: from spawning the process until Python runs the probe
+- import: importing qpc and the command module
+- argparse: building the parsers and parsing the command line
+- config: reading the server config and the client token
+- request: running the command, including its requests to the stub
+
+Each of --runs processes runs the command once cold, then --warm-runs
+more times in the same process. The report, written as JSON, gives the
+percentiles of every phase so runs of two versions can be compared:
+
+    python benchmarks/startup.py --runs 20 --output before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).absolute().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+# pylint: disable=wrong-import-position
+from probe import SPAWN_TIME_ENV  # noqa: E402
+
+from qpc import agent, cli, server  # noqa: E402
+from qpc.release import VERSION  # noqa: E402
+from qpc.utils import create_tar_buffer  # noqa: E402
+
+PERCENTILES = (50, 90, 99)
+PHASES = ("startup", "import", "argparse", "config", "request")
+
+# command lines, after the subcommand and action; "{port}" is replaced by
+# the port of the stub server
+ARGUMENTS = {
+    ("server", "config"): ["--host", "127.0.0.1", "--port", "{port}", "--use-http"],
+    ("server", "login"): ["--username", "admin"],
+    ("cred", "add"): [
+        "--name",
+        "bench",
+        "--type",
+        "network",
+        "--username",
+        "admin",
+        "--password",
+    ],
+    ("cred", "edit"): ["--name", "bench", "--username", "root"],
+    ("cred", "show"): ["--name", "bench"],
+    ("cred", "clear"): ["--name", "bench"],
+    ("source", "add"): [
+        "--name",
+        "bench",
+        "--type",
+        "network",
+        "--hosts",
+        "10.0.0.1",
+        "--cred",
+        "bench",
+    ],
+    ("source", "show"): ["--name", "bench"],
+    ("source", "clear"): ["--name", "bench"],
+    ("source", "edit"): ["--name", "bench", "--hosts", "10.0.0.2"],
+    ("scan", "add"): ["--name", "bench", "--sources", "bench"],
+    ("scan", "start"): ["--name", "bench"],
+    ("scan", "show"): ["--name", "bench"],
+    ("scan", "pause"): ["--id", "1"],
+    ("scan", "cancel"): ["--id", "1"],
+    ("scan", "restart"): ["--id", "1"],
+    ("scan", "edit"): ["--name", "bench", "--sources", "bench"],
+    ("scan", "clear"): ["--name", "bench"],
+    ("scan", "job"): ["--id", "1"],
+    ("report", "deployments"): [
+        "--report",
+        "1",
+        "--json",
+        "--output-file",
+        "deployments.json",
+    ],
+    ("report", "details"): ["--report", "1", "--json", "--output-file", "details.json"],
+    ("report", "insights"): ["--report", "1", "--output-file", "insights.tar.gz"],
+    ("report", "download"): ["--report", "1", "--output-file", "report.tar.gz"],
+    ("report", "merge"): ["--report-ids", "1", "2"],
+    ("report", "merge-status"): ["--job", "1"],
+    ("report", "upload"): ["--json-file", "upload.json"],
+    ("insights", "config"): ["--host", "127.0.0.1", "--port", "{port}", "--use-http"],
+    ("insights", "add_login"): ["--username", "admin", "--password"],
+    ("insights", "publish"): ["--report", "1"],
+    ("batch", None): ["--file", "batch.txt"],
+}
+
+# commands that are not benchmarked, as they start or stop a process
+SKIPPED = {(agent.SUBCOMMAND, agent.START), (agent.SUBCOMMAND, agent.STOP)}
+
+# files the command lines above read, created in the working directory
+INPUT_FILES = {
+    "batch.txt": "server status\ncred list\n",
+    "upload.json": json.dumps(
+        {"id": 1, "sources": [{"facts": [{}], "server_id": "1"}]}
+    ),
+}
+
+STUB_OBJECT = {
+    "id": 1,
+    "name": "bench",
+    "cred_type": "network",
+    "source_type": "network",
+    "username": "admin",
+    "hosts": ["10.0.0.1"],
+    "port": 22,
+    "credentials": [{"id": 1, "name": "bench"}],
+    "sources": [{"id": 1, "name": "bench", "source_type": "network"}],
+    "scan_type": "inspect",
+    "status": "completed",
+    "report_id": 1,
+    "token": "bench",
+}
+DETAIL_PATH = re.compile(r"/\d+/?$")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer every request the way a quipucords server would succeed."""
+
+    protocol_version = "HTTP/1.1"
+    # answers are written in two parts; do not wait for ACKs between them
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep the benchmark output quiet."""
+
+    def _answer(self, status, body=None):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if "gzip" in self.headers.get("Accept", ""):
+            content = create_tar_buffer({"report.json": STUB_OBJECT})
+            content_type = "application/gzip"
+        else:
+            content = b"" if body is None else json.dumps(body).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("X-Server-Version", VERSION)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer a detail or a single page list."""
+        path = self.path.split("?", 1)[0]
+        if DETAIL_PATH.search(path):
+            self._answer(200, STUB_OBJECT)
+        else:
+            self._answer(
+                200,
+                {"count": 1, "next": None, "previous": None, "results": [STUB_OBJECT]},
+            )
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Answer a creation or a login."""
+        self._answer(200 if self.path == server.LOGIN_URI else 201, STUB_OBJECT)
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Answer an update."""
+        self._answer(200, STUB_OBJECT)
+
+    do_PATCH = do_PUT
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """Answer a deletion."""
+        self._answer(204)
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples):
+    """Describe the durations of a phase, in milliseconds.
+
+    :param samples: list of durations in seconds
+    """
+    millis = [sample * 1000 for sample in samples]
+    summary = {
+        "count": len(millis),
+        "min": min(millis),
+        "mean": sum(millis) / len(millis),
+        "max": max(millis),
+    }
+    for percent in PERCENTILES:
+        summary[f"p{percent}"] = percentile(millis, percent)
+    return {key: round(value, 3) for key, value in summary.items()}
+
+
+def command_line(subcommand, action, port):
+    """Return the command line of a command, without the program name."""
+    argv = [subcommand] if action is None else [subcommand, action]
+    return argv + [
+        arg.format(port=port) for arg in ARGUMENTS.get((subcommand, action), [])
+    ]
+
+
+def prepare_home(home, port):
+    """Write the qpc server config and login token of the stub server.
+
+    This is done again before every command, as "server logout" removes
+    the token.
+    """
+    config_dir = home / ".config" / "qpc"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    (config_dir / "server.config").write_text(
+        json.dumps({"host": "127.0.0.1", "port": port, "use_http": True})
+    )
+    (config_dir / "client_token").write_text(json.dumps({"token": "bench"}))
+
+
+def run_probe(argv, iterations, workdir, env):
+    """Run the probe in a new process and return its results."""
+    env = dict(env, **{SPAWN_TIME_ENV: repr(time.time())})
+    output = subprocess.run(
+        [sys.executable, str(BENCHMARKS_DIR / "probe.py"), str(iterations)] + argv,
+        cwd=workdir,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def benchmark(commands, runs, warm_runs, port, home):
+    """Benchmark each command and return the report entries."""
+    env = dict(os.environ)
+    env.update(
+        {
+            "HOME": str(home),
+            "PYTHONPATH": str(BENCHMARKS_DIR.parent),
+            "PYTHONHASHSEED": "0",
+            agent.NO_AGENT_ENV: "1",
+        }
+    )
+    for name, content in INPUT_FILES.items():
+        (home / name).write_text(content)
+    entries = []
+    for subcommand, action in commands:
+        argv = command_line(subcommand, action, port)
+        prepare_home(home, port)
+        cold, warm, exit_codes = {}, {}, set()
+        for _ in range(runs):
+            results = run_probe(argv, 1 + warm_runs, home, env)
+            for index, result in enumerate(results):
+                samples = cold if index == 0 else warm
+                for phase, duration in result["timings"].items():
+                    samples.setdefault(phase, []).append(duration)
+                exit_codes.add(result["exit_code"])
+        entries.append(
+            {
+                "command": " ".join(argv[: 1 if action is None else 2]),
+                "argv": argv,
+                "exit_codes": sorted(exit_codes),
+                "cold": {
+                    phase: summarize(cold[phase]) for phase in PHASES if phase in cold
+                },
+                "warm": {
+                    phase: summarize(warm[phase]) for phase in PHASES if phase in warm
+                },
+            }
+        )
+        print(f"{entries[-1]['command']}: done", file=sys.stderr)
+    return entries
+
+
+def parse_args():
+    """Parse the benchmark options."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--runs", type=int, default=10, help="processes started per command"
+    )
+    parser.add_argument(
+        "--warm-runs",
+        type=int,
+        default=5,
+        help="runs in the same process after the cold one",
+    )
+    parser.add_argument(
+        "--command",
+        dest="commands",
+        action="append",
+        metavar='"SUBCOMMAND [ACTION]"',
+        help="only benchmark this command; may be repeated",
+    )
+    parser.add_argument("--output", help="write the report to this file")
+    return parser.parse_args()
+
+
+def main():
+    """Run the benchmark and write its report."""
+    args = parse_args()
+    commands = [command for command in cli.COMMANDS if command not in SKIPPED]
+    if args.commands:
+        wanted = {tuple(name.split()) for name in args.commands}
+        commands = [
+            command
+            for command in commands
+            if tuple(part for part in command if part) in wanted
+        ]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        with tempfile.TemporaryDirectory(prefix="qpc-bench-") as home:
+            entries = benchmark(commands, args.runs, args.warm_runs, port, Path(home))
+    finally:
+        server.shutdown()
+        server.server_close()
+    report = {
+        "qpc_version": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "warm_runs": args.warm_runs,
+        "unit": "ms",
+        "commands": entries,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
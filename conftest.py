@@ -20,9 +20,16 @@ QPC_PATH_CONSTANTS = (
     "INSIGHTS_CONFIG",
     "INSIGHTS_ENCRYPTION",
     "INSIGHTS_LOGIN_CONFIG",
+    "QPC_AGENT_SOCKET",
     "QPC_CLIENT_TOKEN",
+    "QPC_COMPLETION_CACHE",
+    "QPC_HTTP_CACHE",
     "QPC_LOG",
+    "QPC_MIRROR_DIR",
+    "QPC_NAME_CACHE",
     "QPC_SERVER_CONFIG",
+    "QPC_SERVER_INFO",
+    "QPC_SERVERS_DIR",
 )
 
 
@@ -33,6 +40,31 @@ def mock_path_constants(tmp_path, monkeypatch):
         monkeypatch.setattr(f"qpc.utils.{path}", str(tmp_path / path))
 
 
+@pytest.fixture(autouse=True)
+def reset_request_session(monkeypatch):
+    """Discard the shared HTTP session, executor and transport between tests.
+
+    Retries are kept but sent without backoff, so tests never sleep.
+    """
+    monkeypatch.setattr("qpc.request.RETRY_BACKOFF_FACTOR", 0)
+    yield
+    from qpc.async_request import set_transport
+    from qpc.cache import set_cache_enabled
+    from qpc.mirror import set_mirror_mode
+    from qpc.request import DEFAULT_JOBS, close_session, reset_retry_budget, set_jobs
+    from qpc.server_info import reset_server_info
+    from qpc.utils import set_server_profile
+
+    close_session()
+    set_jobs(DEFAULT_JOBS)
+    set_transport(None)
+    reset_retry_budget()
+    set_cache_enabled(True)
+    set_mirror_mode()
+    reset_server_info()
+    set_server_profile()
+
+
 def _set_path_constants_to_none():
     """Set qpc path constants to None."""
     for constant in QPC_PATH_CONSTANTS:
@@ -1,13 +1,20 @@
 """Main qpc entrypoint."""
 
 import gettext
+import sys
 
-from qpc.cli import CLI
+from qpc.agent.client import forward
 
 
 def main():
-    """Execute qpc CLI."""
+    """Execute qpc CLI, in the running agent if there is one."""
     gettext.install("qpc")
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    # pylint: disable=import-outside-toplevel
+    from qpc.cli import CLI
+
     CLI().main()
 
 
@@ -0,0 +1,43 @@
+"""Constants for the agent commands."""
+
+from qpc import cred, insights, server
+
+SUBCOMMAND = "agent"
+START = "start"
+STOP = "stop"
+STATUS = "status"
+
+# set to any non-empty value to run every command in the invoking process
+NO_AGENT_ENV = "QPC_NO_AGENT"
+
+# environment variables read while a command runs (by requests, for the
+# proxies and CA bundle); the agent runs a forwarded command with the
+# values of the invoking process. Everything else, i.e. HOME or the
+# locale, is read once, when the agent starts.
+FORWARDED_ENV = (
+    "HTTP_PROXY",
+    "HTTPS_PROXY",
+    "ALL_PROXY",
+    "NO_PROXY",
+    "http_proxy",
+    "https_proxy",
+    "all_proxy",
+    "no_proxy",
+    "REQUESTS_CA_BUNDLE",
+    "CURL_CA_BUNDLE",
+)
+
+# seconds "agent start" waits for the background process to accept commands
+START_TIMEOUT = 10
+
+# commands the agent hands back to the invoking process: the agent ones,
+# and those prompting for secrets, which must be read from the terminal
+LOCAL_COMMANDS = (
+    (SUBCOMMAND, START),
+    (SUBCOMMAND, STOP),
+    (SUBCOMMAND, STATUS),
+    (server.SUBCOMMAND, server.LOGIN),
+    (cred.SUBCOMMAND, cred.ADD),
+    (cred.SUBCOMMAND, cred.EDIT),
+    (insights.SUBCOMMAND, insights.ADD_LOGIN),
+)
@@ -0,0 +1,116 @@
+"""Forward command lines to a running qpc agent.
+
+The agent listens on a Unix socket under the qpc data directory. Both
+sides exchange one JSON object per line: the client sends the command
+line and the directory it runs in, and the agent sends back what the
+command writes to stdout and stderr, asks for a line of stdin when the
+command reads one, and ends with the exit code.
+
+This module is imported before anything else by the qpc entry point, so
+it only depends on the standard library and qpc.utils.
+"""
+
+import json
+import os
+import socket
+import sys
+
+from qpc import messages, utils
+from qpc.agent import FORWARDED_ENV, NO_AGENT_ENV
+from qpc.translation import _
+
+
+def send_message(channel, message):
+    """Write a message to the other side.
+
+    :param channel: binary file object of the connection
+    :param message: JSON serializable dictionary
+    """
+    channel.write(json.dumps(message).encode("utf-8") + b"\n")
+    channel.flush()
+
+
+def read_message(channel):
+    """Read a message from the other side.
+
+    :param channel: binary file object of the connection
+    :returns: dictionary, or None once the connection is closed
+    """
+    line = channel.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def connect():
+    """Open a connection to the agent.
+
+    :returns: connected socket
+    :raises: OSError if no agent is listening
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(utils.QPC_AGENT_SOCKET)
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def control(action):
+    """Send a control message to the agent.
+
+    :param action: agent action (i.e. qpc.agent.STATUS)
+    :returns: the reply dictionary, or None if no agent is running
+    """
+    try:
+        conn = connect()
+    except OSError:
+        return None
+    with conn, conn.makefile("rwb") as channel:
+        send_message(channel, {"control": action})
+        return read_message(channel)
+
+
+def _relay(channel):
+    """Copy the output of a forwarded command until it exits.
+
+    :returns: exit code, or None if the agent handed the command back
+    """
+    while True:
+        message = read_message(channel)
+        if message is None:
+            sys.stderr.write(_(messages.AGENT_CONNECTION_LOST) + "\n")
+            return 1
+        if "stdout" in message:
+            sys.stdout.write(message["stdout"])
+            sys.stdout.flush()
+        elif "stderr" in message:
+            sys.stderr.write(message["stderr"])
+            sys.stderr.flush()
+        elif "read" in message:
+            send_message(channel, {"line": sys.stdin.readline()})
+        elif "local" in message:
+            return None
+        elif "exit" in message:
+            return message["exit"]
+
+
+def forward(argv):
+    """Run a command line in the agent, if one is running.
+
+    :param argv: command line arguments, without the program name
+    :returns: exit code of the command, or None if it must run in this
+        process (no agent is running, it is disabled with QPC_NO_AGENT,
+        or the command is one the agent does not run)
+    """
+    if os.environ.get(NO_AGENT_ENV):
+        return None
+    try:
+        conn = connect()
+    except OSError:
+        return None
+    with conn, conn.makefile("rwb") as channel:
+        env = {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ}
+        send_message(channel, {"argv": argv, "cwd": os.getcwd(), "env": env})
+        return _relay(channel)
@@ -0,0 +1,5 @@
+"""Commands for import organization."""
+
+from qpc.agent.start import AgentStartCommand
+from qpc.agent.status import AgentStatusCommand
+from qpc.agent.stop import AgentStopCommand
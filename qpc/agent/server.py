@@ -0,0 +1,238 @@
+"""Long-lived process running the commands forwarded by qpc invocations.
+
+The agent keeps everything a fresh qpc process would have to set up again
+in memory: the imported modules, the parsed config and token, and the
+HTTP session with its open connections. Commands run one at a time, in
+the directory and with the proxy and CA bundle variables (see
+agent.FORWARDED_ENV) of the process that invoked them, with stdout,
+stderr and stdin relayed over the connection (see qpc.agent.client).
+"""
+
+import io
+import logging
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from qpc import agent, utils
+from qpc.agent.client import read_message, send_message
+from qpc.cli import CLI
+from qpc.release import PKG_NAME
+from qpc.request import reset_retry_budget
+
+logger = logging.getLogger(__name__)
+
+
+class _RemoteOutput(io.TextIOBase):
+    """Text stream sending what is written to one of the client streams."""
+
+    def __init__(self, channel, name):
+        """Create stream.
+
+        :param channel: binary file object of the connection
+        :param name: "stdout" or "stderr"
+        """
+        super().__init__()
+        self.channel = channel
+        self.name = name
+
+    def writable(self):
+        """Streams are write only."""
+        return True
+
+    def write(self, text):
+        """Send text to the client."""
+        if text:
+            send_message(self.channel, {self.name: text})
+        return len(text)
+
+
+class _RemoteInput(io.TextIOBase):
+    """Text stream reading lines from the client stdin on demand."""
+
+    def __init__(self, rfile, wfile):
+        """Create stream.
+
+        :param rfile: binary file object the client replies on
+        :param wfile: binary file object the requests are sent on
+        """
+        super().__init__()
+        self.rfile = rfile
+        self.wfile = wfile
+
+    def readable(self):
+        """Streams are read only."""
+        return True
+
+    def readline(self, size=-1):
+        """Ask the client for a line of its stdin; empty once it is at EOF."""
+        send_message(self.wfile, {"read": True})
+        reply = read_message(self.rfile) or {}
+        return reply.get("line", "")
+
+    def read(self, size=-1):
+        """Read the client stdin until EOF."""
+        return "".join(iter(self.readline, ""))
+
+
+class AgentRequestHandler(socketserver.StreamRequestHandler):
+    """Serve a single connection: a command line or a control message."""
+
+    def handle(self):
+        """Read the request and answer it."""
+        message = read_message(self.rfile)
+        if message is None:
+            return
+        control = message.get("control")
+        if control == agent.STATUS:
+            send_message(self.wfile, self.server.status())
+        elif control == agent.STOP:
+            send_message(self.wfile, self.server.status())
+            # shutdown waits for serve_forever, which runs this handler
+            threading.Thread(target=self.server.shutdown).start()
+        elif "argv" in message:
+            self.server.run_command(
+                message["argv"], message.get("cwd"), self, message.get("env")
+            )
+
+
+class AgentServer(socketserver.UnixStreamServer):
+    """Unix socket server running forwarded commands one at a time."""
+
+    def __init__(self, path):
+        """Listen on path, replacing the socket of an agent that died.
+
+        :param path: path of the Unix socket
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        # other users must not connect between bind and chmod
+        umask = os.umask(0o077)
+        try:
+            super().__init__(path, AgentRequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.started = time.time()
+        self.commands = 0
+
+    def server_close(self):
+        """Stop listening and remove the socket."""
+        super().server_close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def status(self):
+        """Describe the agent for the status and stop actions."""
+        return {
+            "pid": os.getpid(),
+            "started": datetime.fromtimestamp(self.started).isoformat(" ", "seconds"),
+            "commands": self.commands,
+        }
+
+    def run_command(self, argv, cwd, handler, env=None):
+        """Run a command line as the qpc entry point would.
+
+        :param argv: command line arguments, without the program name
+        :param cwd: directory the command was invoked from
+        :param handler: AgentRequestHandler of the connection
+        :param env: the agent.FORWARDED_ENV variables of the invoking
+            process; None to keep those of the agent
+        """
+        saved_streams = sys.argv, sys.stdin, sys.stdout, sys.stderr
+        saved_cwd = os.getcwd()
+        saved_env = {name: os.environ.get(name) for name in agent.FORWARDED_ENV}
+        if env is not None:
+            _set_environ(env)
+        saved_logging = _isolate_logging()
+        sys.argv = [PKG_NAME] + list(argv)
+        sys.stdin = _RemoteInput(handler.rfile, handler.wfile)
+        sys.stdout = _RemoteOutput(handler.wfile, "stdout")
+        sys.stderr = _RemoteOutput(handler.wfile, "stderr")
+        local = False
+        code = 0
+        try:
+            os.chdir(cwd or saved_cwd)
+            cli = CLI(name=PKG_NAME)
+            local = cli.requested_command(argv) in agent.LOCAL_COMMANDS
+            if not local:
+                self.commands += 1
+                reset_retry_budget()
+                cli.main()
+        except SystemExit as error:
+            code = utils.get_exit_code(error.code)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            code = 1
+        finally:
+            _restore_logging(saved_logging)
+            sys.argv, sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.chdir(saved_cwd)
+            _set_environ(saved_env)
+        if local:
+            send_message(handler.wfile, {"local": True})
+            return
+        try:
+            send_message(handler.wfile, {"exit": code})
+        except OSError:
+            logger.debug("Client left before the command finished")
+
+
+def _set_environ(values):
+    """Set the agent.FORWARDED_ENV variables, unsetting those without a value.
+
+    :param values: dictionary of the variable values
+    """
+    for name in agent.FORWARDED_ENV:
+        value = values.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _isolate_logging():
+    """Let setup_logging configure logging for a command as in a new process.
+
+    :returns: state to give back to _restore_logging
+    """
+    root = logging.getLogger()
+    saved = root.level, root.handlers[:], utils.logger.handlers[:]
+    root.handlers = []
+    root.setLevel(logging.WARNING)
+    return saved
+
+
+def _restore_logging(saved):
+    """Close the handlers a command added and restore the previous ones."""
+    level, root_handlers, qpc_handlers = saved
+    root = logging.getLogger()
+    for log, handlers in ((root, root_handlers), (utils.logger, qpc_handlers)):
+        for handler in log.handlers:
+            if handler not in handlers:
+                handler.close()
+        log.handlers = handlers
+    root.setLevel(level)
+
+
+def serve():
+    """Run the agent until it is stopped or terminated."""
+    utils.ensure_data_dir_exists()
+    server = AgentServer(utils.QPC_AGENT_SOCKET)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
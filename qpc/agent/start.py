@@ -0,0 +1,75 @@
+"""AgentStartCommand is used to start the qpc agent."""
+
+import subprocess
+import sys
+import time
+from logging import getLogger
+
+from qpc import agent, messages, utils
+from qpc.agent.client import control
+from qpc.clicommand import CliCommand
+from qpc.translation import _
+
+logger = getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class AgentStartCommand(CliCommand):
+    """Defines the agent start command.
+
+    This command starts the process serving qpc commands over a Unix
+    socket, in the background unless --foreground is given.
+    """
+
+    SUBCOMMAND = agent.SUBCOMMAND
+    ACTION = agent.START
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.ACTION),
+            None,
+            None,
+            [],
+        )
+        self.parser.add_argument(
+            "--foreground",
+            dest="foreground",
+            action="store_true",
+            help=_(messages.AGENT_START_FOREGROUND_HELP),
+        )
+
+    def _do_command(self):
+        """Start the agent unless one is already running."""
+        status = control(agent.STATUS)
+        if status is not None:
+            logger.error(_(messages.AGENT_ALREADY_RUNNING), status["pid"])
+            sys.exit(1)
+        if self.args.foreground:
+            # pylint: disable=import-outside-toplevel
+            from qpc.agent.server import serve
+
+            serve()
+            return
+
+        with open(utils.QPC_LOG, "ab") as log_file:
+            process = subprocess.Popen(  # pylint: disable=consider-using-with
+                [sys.executable, "-m", "qpc.agent.server"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=log_file,
+                start_new_session=True,
+            )
+        deadline = time.monotonic() + agent.START_TIMEOUT
+        while process.poll() is None and time.monotonic() < deadline:
+            status = control(agent.STATUS)
+            if status is not None:
+                logger.info(_(messages.AGENT_STARTED), status["pid"])
+                return
+            time.sleep(0.05)
+        logger.error(_(messages.AGENT_START_FAILED), utils.QPC_LOG)
+        sys.exit(1)
@@ -0,0 +1,44 @@
+"""AgentStatusCommand is used to show whether the qpc agent is running."""
+
+import sys
+from logging import getLogger
+
+from qpc import agent, messages
+from qpc.agent.client import control
+from qpc.clicommand import CliCommand
+from qpc.translation import _
+
+logger = getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class AgentStatusCommand(CliCommand):
+    """Defines the agent status command.
+
+    This command reports the pid of the running agent and how many
+    commands it has run.
+    """
+
+    SUBCOMMAND = agent.SUBCOMMAND
+    ACTION = agent.STATUS
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.ACTION),
+            None,
+            None,
+            [],
+        )
+
+    def _do_command(self):
+        """Print the status of the agent."""
+        status = control(agent.STATUS)
+        if status is None:
+            logger.error(_(messages.AGENT_NOT_RUNNING))
+            sys.exit(1)
+        print(_(messages.AGENT_STATUS) % status)
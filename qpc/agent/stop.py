@@ -0,0 +1,43 @@
+"""AgentStopCommand is used to stop the qpc agent."""
+
+import sys
+from logging import getLogger
+
+from qpc import agent, messages
+from qpc.agent.client import control
+from qpc.clicommand import CliCommand
+from qpc.translation import _
+
+logger = getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class AgentStopCommand(CliCommand):
+    """Defines the agent stop command.
+
+    This command stops the running agent; later commands run in-process.
+    """
+
+    SUBCOMMAND = agent.SUBCOMMAND
+    ACTION = agent.STOP
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.ACTION),
+            None,
+            None,
+            [],
+        )
+
+    def _do_command(self):
+        """Ask the agent to stop."""
+        status = control(agent.STOP)
+        if status is None:
+            logger.error(_(messages.AGENT_NOT_RUNNING))
+            sys.exit(1)
+        logger.info(_(messages.AGENT_STOPPED), status["pid"])
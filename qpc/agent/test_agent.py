@@ -0,0 +1,81 @@
+"""Test the qpc agent."""
+
+import os
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+from qpc import agent, utils
+from qpc.agent.client import control, forward
+from qpc.agent.server import _set_environ
+from qpc.release import VERSION
+
+
+@pytest.fixture
+def running_agent(tmp_path, monkeypatch):
+    """Start an agent in its own process, with tmp_path as HOME."""
+    monkeypatch.delenv(agent.NO_AGENT_ENV, raising=False)
+    monkeypatch.setattr(
+        utils, "QPC_AGENT_SOCKET", str(tmp_path / ".local/share/qpc/agent.sock")
+    )
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "qpc.agent.server"],
+        env={**os.environ, "HOME": str(tmp_path)},
+    )
+    deadline = time.monotonic() + agent.START_TIMEOUT
+    while control(agent.STATUS) is None:
+        assert process.poll() is None and time.monotonic() < deadline
+        time.sleep(0.05)
+    yield process
+    if process.poll() is None:
+        control(agent.STOP)
+        process.wait(timeout=agent.START_TIMEOUT)
+
+
+def test_forward_output(running_agent, capsys):
+    """Test the output and exit code of a command come back from the agent."""
+    assert forward(["--version"]) == 0
+    assert capsys.readouterr().out == f"{VERSION}\n"
+    assert forward(["cred", "list"]) == 1
+    assert "server config" in capsys.readouterr().err
+    assert control(agent.STATUS)["pid"] == running_agent.pid
+
+
+def test_prompting_command_runs_locally(running_agent):
+    """Test commands reading secrets are handed back to the caller."""
+    assert forward(["server", "login"]) is None
+    assert forward(["agent", "status"]) is None
+    assert control(agent.STATUS)["commands"] == 0
+
+
+def test_disabled(running_agent, monkeypatch):
+    """Test QPC_NO_AGENT keeps commands in the invoking process."""
+    monkeypatch.setenv(agent.NO_AGENT_ENV, "1")
+    assert forward(["--version"]) is None
+
+
+def test_socket_private(running_agent):
+    """Test only the current user may connect to the agent."""
+    assert stat.S_IMODE(os.stat(utils.QPC_AGENT_SOCKET).st_mode) == 0o600
+
+
+def test_set_environ(monkeypatch):
+    """Test forwarded variables are set, and unset when not forwarded."""
+    monkeypatch.setenv("HTTPS_PROXY", "http://agent:3128")
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    monkeypatch.setenv("HOME", "/agent")
+    _set_environ({"NO_PROXY": "localhost", "HOME": "/client"})
+    assert os.environ.get("HTTPS_PROXY") is None
+    assert os.environ["NO_PROXY"] == "localhost"
+    assert os.environ["HOME"] == "/agent"
+
+
+def test_stop(running_agent):
+    """Test the agent exits and removes its socket once stopped."""
+    assert control(agent.STOP)["pid"] == running_agent.pid
+    assert running_agent.wait(timeout=agent.START_TIMEOUT) == 0
+    assert not os.path.exists(utils.QPC_AGENT_SOCKET)
+    assert forward(["--version"]) is None
@@ -0,0 +1,235 @@
+"""Python API for qpc operations.
+
+The functions below talk to the server configured with "qpc server
+config", using the token saved by "qpc server login", and return the
+objects decoded from the server responses. They print nothing and never
+exit: errors are raised as qpc.exceptions.QPCError subclasses.
+
+    from qpc import api
+
+    job = api.start_scan("network-scan")
+    job = api.wait_for_job(job["id"], timeout=3600)
+    api.download_report("report.tar.gz", report_id=job["report_id"])
+
+Besides wait_for_job, the module only holds what the commands use:
+"scan start" and "report download" are built on it, every command looks
+objects up by name with find_by_name, and "qpc sync" and the completion
+cache list objects with the list functions.
+"""
+
+import time
+import urllib.parse as urlparse
+
+from requests import codes
+
+from qpc import cred, messages, names, report, scan, source
+from qpc.exceptions import QPCNotFoundError, QPCRequestError, QPCTimeoutError
+from qpc.request import GET, POST, send_request
+from qpc.server_info import FEATURE_MASKED_REPORTS, get_min_server_version
+from qpc.translation import _
+from qpc.utils import QPC_MIN_SERVER_VERSION, STREAM_CHUNK_SIZE, write_file
+
+# scan job status values after which the job does not change anymore
+FINISHED_JOB_STATUSES = (
+    scan.SCAN_STATUS_COMPLETED,
+    scan.SCAN_STATUS_FAILED,
+    scan.SCAN_STATUS_CANCELED,
+)
+
+# seconds between two status checks of wait_for_job
+DEFAULT_POLL_INTERVAL = 5
+
+
+def call(
+    method,
+    path,
+    params=None,
+    payload=None,
+    expected=(codes.ok,),
+    **kwargs,
+):
+    """Send a request and check the status of the answer.
+
+    :param method: the request method (i.e. qpc.request.GET)
+    :param path: path after server and port (i.e. /api/v1/credentials/)
+    :param params: query parameters
+    :param payload: dictionary sent as the JSON body
+    :param expected: status codes of a successful answer
+    :param kwargs: other arguments of qpc.request.send_request
+    :returns: the QPCResponse
+    :raises: QPCRequestError if the status is not one of expected
+    """
+    kwargs.setdefault("min_server_version", QPC_MIN_SERVER_VERSION)
+    response = send_request(method, path, params=params, payload=payload, **kwargs)
+    if response.status_code not in expected:
+        try:
+            details = response.json()
+        except ValueError:
+            details = response.text
+        raise QPCRequestError(
+            _(messages.API_REQUEST_FAILED)
+            % {
+                "method": method,
+                "path": path,
+                "status": response.status_code,
+                "details": details,
+            },
+            response,
+        )
+    return response
+
+
+def _list(path, params=None, **kwargs):
+    """Return the results of every page of a list endpoint.
+
+    :param kwargs: other arguments of qpc.request.send_request
+    """
+    params = dict(params or {})
+    results = []
+    while True:
+        json_data = call(GET, path, params, **kwargs).json()
+        results.extend(json_data.get("results", []))
+        next_link = json_data.get("next")
+        if not next_link:
+            return results
+        query = urlparse.parse_qs(urlparse.urlparse(next_link).query)
+        params["page"] = query.get("page", ["1"])[0]
+
+
+def find_by_name(path, name, sole=False, **kwargs):
+    """Return the object with the given name from a list endpoint.
+
+    :param path: list path of the object (i.e. /api/v1/credentials/)
+    :param name: the object name
+    :param sole: True to also accept the only object the server lists for
+        the name, whatever its name
+    :param kwargs: other arguments of qpc.request.send_request
+    :returns: the object dictionary, or None if there is none
+    """
+    results = _list(path, {"name": name}, **kwargs)
+    for result in results:
+        if result.get("name") == name:
+            return result
+    if sole and len(results) == 1:
+        return results[0]
+    return None
+
+
+def list_credentials(cred_type=None):
+    """List the credentials.
+
+    :param cred_type: only list credentials of this type (i.e. "network")
+    :returns: list of credential dictionaries
+    """
+    return _list(cred.CREDENTIAL_URI, {"cred_type": cred_type} if cred_type else None)
+
+
+def list_sources(source_type=None):
+    """List the sources.
+
+    :param source_type: only list sources of this type (i.e. "vcenter")
+    :returns: list of source dictionaries
+    """
+    params = {"source_type": source_type} if source_type else None
+    return _list(source.SOURCE_URI, params)
+
+
+def list_scans(scan_type=None):
+    """List the scans.
+
+    :param scan_type: only list scans of this type (i.e. "inspect")
+    :returns: list of scan dictionaries
+    """
+    return _list(scan.SCAN_URI, {"scan_type": scan_type} if scan_type else None)
+
+
+def start_scan(name):
+    """Start a new job of the scan with the given name.
+
+    :returns: the scan job dictionary
+    :raises: QPCNotFoundError if the scan does not exist
+    """
+    response = names.with_id(
+        scan.SCAN_URI,
+        name,
+        lambda name: find_by_name(scan.SCAN_URI, name),
+        lambda scan_id: call(
+            POST,
+            f"{scan.SCAN_URI}{scan_id}/jobs/",
+            expected=(codes.created, codes.not_found),
+        ),
+    )
+    if response is None or response.status_code == codes.not_found:
+        raise QPCNotFoundError(_(messages.SCAN_DOES_NOT_EXIST) % name)
+    return response.json()
+
+
+def list_scan_jobs(scan_id, status=None):
+    """List the jobs of a scan.
+
+    :param scan_id: scan identifier
+    :param status: only list jobs with this status (i.e. "running")
+    :returns: list of scan job dictionaries
+    """
+    path = f"{scan.SCAN_URI}{scan_id}/jobs/"
+    return _list(path, {"status": status} if status else None)
+
+
+def get_scan_job(job_id):
+    """Return a scan job.
+
+    :param job_id: scan job identifier
+    :returns: the scan job dictionary
+    """
+    return call(GET, f"{scan.SCAN_JOB_URI}{job_id}").json()
+
+
+def wait_for_job(job_id, timeout=None, interval=DEFAULT_POLL_INTERVAL):
+    """Wait until a scan job is completed, failed or canceled.
+
+    :param job_id: scan job identifier
+    :param timeout: seconds to wait at most; forever if None
+    :param interval: seconds between two checks of the job status
+    :returns: the finished scan job dictionary
+    :raises: QPCTimeoutError if the job is still running after timeout
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        job = get_scan_job(job_id)
+        if job.get("status") in FINISHED_JOB_STATUSES:
+            return job
+        if deadline is not None and time.monotonic() + interval > deadline:
+            raise QPCTimeoutError(
+                _(messages.API_JOB_TIMEOUT)
+                % {"job_id": job_id, "timeout": timeout, "status": job.get("status")}
+            )
+        time.sleep(interval)
+
+
+def download_report(path, report_id=None, scan_job_id=None, mask=False, progress=None):
+    """Save the reports of a scan job as a tar.gz file.
+
+    :param path: file the report is written to
+    :param report_id: report identifier
+    :param scan_job_id: scan job identifier, used if report_id is None
+    :param mask: True to download the report with sensitive data masked
+    :param progress: optional callable receiving the number of bytes
+        written so far (see qpc.utils.write_file)
+    :returns: the identifier of the downloaded report
+    :raises: QPCNotFoundError if the scan job has no report, and
+        EnvironmentError if the file can not be written
+    """
+    if report_id is None:
+        report_id = get_scan_job(scan_job_id).get("report_id")
+        if not report_id:
+            raise QPCNotFoundError(_(messages.DOWNLOAD_NO_REPORT_FOR_SJ) % scan_job_id)
+    response = call(
+        GET,
+        f"{report.REPORT_URI}{report_id}",
+        params={"mask": True} if mask else None,
+        headers={"Accept": "application/gzip"},
+        stream=True,
+        min_server_version=get_min_server_version(FEATURE_MASKED_REPORTS),
+    )
+    write_file(path, response.iter_content(STREAM_CHUNK_SIZE), True, progress)
+    return report_id
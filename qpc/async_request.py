@@ -0,0 +1,441 @@
+"""asyncio counterpart of the qpc.request module.
+
+async_request() mirrors send_request(): it builds the URL and headers from
+the same configuration, goes through the same response cache and mirror,
+runs the same error and version checks and logs the same way. Errors are
+raised as QPCError subclasses, never exiting the event loop; the file I/O
+these steps need runs in the default executor. The HTTP exchange itself is
+delegated to a pluggable AsyncTransport; the default StreamTransport
+speaks HTTP/1.1 over asyncio streams, so no thread is used per call.
+"""
+
+import asyncio
+import functools
+import io
+import json
+import ssl
+from contextvars import copy_context
+from urllib.parse import urlencode, urlsplit
+
+from requests import codes
+from requests.structures import CaseInsensitiveDict
+
+from qpc import cache, mirror
+from qpc.exceptions import QPCConnectionError, QPCError
+from qpc.release import PKG_NAME, VERSION
+from qpc.request import (
+    DELETE,
+    GET,
+    RETRY_METHODS,
+    RETRY_STATUS_CODES,
+    SUPPORTED_METHODS,
+    build_request_headers,
+    check_response,
+    connection_error_message,
+    get_max_retries,
+    get_retry_delay,
+    invalidate_changes,
+    log_retry,
+    should_retry,
+)
+from qpc.utils import (
+    CONFIG_POOL_SIZE,
+    DEFAULT_POOL_SIZE,
+    QPC_MIN_SERVER_VERSION,
+    get_server_location,
+    get_ssl_verify,
+    log_request_info,
+    read_server_config,
+)
+
+# transport used when async_request() is not given one explicitly
+_transport = None
+
+
+class AsyncResponse:
+    """Fully read HTTP response returned by an AsyncTransport.
+
+    It exposes the subset of the requests.Response interface used by qpc
+    commands, and decodes the JSON body only once.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, url, status_code, headers, content, reason="OK"):
+        """Create response object."""
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self._json_data = None
+        self._json_decoded = False
+
+    @classmethod
+    def from_response(cls, response):
+        """Copy a requests.Response, i.e. one served by the cache or mirror."""
+        return cls(
+            response.url,
+            response.status_code,
+            response.headers,
+            response.content,
+            response.reason,
+        )
+
+    @property
+    def encoding(self):
+        """Return the charset announced by the server, defaulting to utf-8."""
+        content_type = self.headers.get("Content-Type", "")
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    @property
+    def text(self):
+        """Return the body decoded as text."""
+        return self.content.decode(self.encoding, errors="replace")
+
+    @property
+    def raw(self):
+        """Return the body as a file-like object."""
+        return io.BytesIO(self.content)
+
+    def json(self):
+        """Decode the body on first call and return the cached result.
+
+        :raises: ValueError (JSONDecodeError) if the body is not valid JSON.
+        """
+        if not self._json_decoded:
+            self._json_data = json.loads(self.content)
+            self._json_decoded = True
+        return self._json_data
+
+    def iter_content(self, chunk_size=1):
+        """Yield the body in chunks of chunk_size bytes."""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+
+class AsyncTransport:
+    """Interface for the non-blocking HTTP layer used by async_request().
+
+    Implementations send a single request and return an AsyncResponse.
+    Failing to reach the server must raise OSError or EOFError, which
+    async_request() reports like a requests ConnectionError.
+    """
+
+    async def send(self, method, url, headers, body=None, verify=True):
+        """Send a request and return the response.
+
+        :param method: the request method (i.e. GET)
+        :param url: the full url, including the query string
+        :param headers: dictionary of headers to send
+        :param body: bytes to send as the request body, if any
+        :param verify: same meaning as the requests verify argument
+        :returns: AsyncResponse object
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Release any resource held by the transport."""
+
+
+class StreamTransport(AsyncTransport):
+    """HTTP/1.1 transport built on asyncio streams.
+
+    Connections are kept alive and reused; at most pool_size connections
+    per server are open at the same time. A request that fails on a reused
+    connection is only sent again on a new one if its method is safe to
+    repeat (see qpc.request.RETRY_METHODS).
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        """Create transport."""
+        self.pool_size = pool_size
+        self._loop = None
+        self._idle = {}
+        self._slots = {}
+
+    def _bind_loop(self):
+        """Drop connections and limits created by a different event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._idle = {}
+            self._slots = {}
+
+    @staticmethod
+    def _ssl_context(verify):
+        """Build the SSL context matching the requests verify argument."""
+        if verify is False:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            return context
+        if isinstance(verify, str):
+            return ssl.create_default_context(cafile=verify)
+        return ssl.create_default_context()
+
+    async def send(self, method, url, headers, body=None, verify=True):
+        """Send a request and return the response."""
+        self._bind_loop()
+        parts = urlsplit(url)
+        use_ssl = parts.scheme == "https"
+        port = parts.port or (443 if use_ssl else 80)
+        key = (parts.hostname, port, use_ssl)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        host_header = f"{parts.hostname}:{port}"
+
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(self.pool_size)
+        async with self._slots[key]:
+            idle = self._idle.setdefault(key, [])
+            while idle:
+                # a kept-alive connection may have been closed by the server
+                reader, writer = idle.pop()
+                if reader.at_eof() or writer.is_closing():
+                    writer.close()
+                    continue
+                try:
+                    return await self._exchange(
+                        key, reader, writer, method, target, host_header, headers, body
+                    )
+                except (OSError, EOFError):
+                    writer.close()
+                    # the server may have acted on the request before the
+                    # connection failed; only send it again if that is safe
+                    if method not in RETRY_METHODS:
+                        raise
+            reader, writer = await asyncio.open_connection(
+                parts.hostname,
+                port,
+                ssl=self._ssl_context(verify) if use_ssl else None,
+            )
+            try:
+                return await self._exchange(
+                    key, reader, writer, method, target, host_header, headers, body
+                )
+            except BaseException:
+                writer.close()
+                raise
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    async def _exchange(
+        self, key, reader, writer, method, target, host_header, headers, body
+    ):
+        """Write one request on the connection and read its response."""
+        req_headers = {
+            "Host": host_header,
+            "User-Agent": f"{PKG_NAME}/{VERSION}",
+            "Accept": "*/*",
+            "Accept-Encoding": "identity",
+            "Connection": "keep-alive",
+        }
+        req_headers.update(headers)
+        if body is not None:
+            req_headers["Content-Length"] = str(len(body))
+        head = [f"{method} {target} HTTP/1.1"]
+        head += [f"{name}: {value}" for name, value in req_headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if body:
+            writer.write(body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        http_version, status, reason = (
+            status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""]
+        )[:3]
+        status_code = int(status)
+        resp_headers = CaseInsensitiveDict()
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip(), value.strip()
+            if name in resp_headers:
+                value = f"{resp_headers[name]}, {value}"
+            resp_headers[name] = value
+
+        reusable = http_version == "HTTP/1.1"
+        if resp_headers.get("Connection", "").lower() == "close":
+            reusable = False
+        if status_code in (204, 304) or status_code < 200:
+            content = b""
+        elif resp_headers.get("Transfer-Encoding", "").lower() == "chunked":
+            content = await self._read_chunked(reader)
+        elif "Content-Length" in resp_headers:
+            content = await reader.readexactly(int(resp_headers["Content-Length"]))
+        else:
+            content = await reader.read()
+            reusable = False
+
+        if reusable:
+            self._idle[key].append((reader, writer))
+        else:
+            writer.close()
+        return AsyncResponse(
+            host_header + target, status_code, resp_headers, content, reason
+        )
+
+    @staticmethod
+    async def _read_chunked(reader):
+        """Read a body sent with chunked transfer encoding."""
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise asyncio.IncompleteReadError(b"".join(chunks), None)
+            size = int(size_line.split(b";")[0].strip(), 16)
+            if size == 0:
+                # skip optional trailers up to the final blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+    async def close(self):
+        """Close every idle connection."""
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle = {}
+
+
+def get_transport():
+    """Return the transport used by default, creating it on first use.
+
+    :returns: AsyncTransport object
+    """
+    global _transport  # pylint: disable=global-statement
+    if _transport is None:
+        pool_size = DEFAULT_POOL_SIZE
+        config = read_server_config()
+        if config is not None:
+            pool_size = config.get(CONFIG_POOL_SIZE, DEFAULT_POOL_SIZE)
+        _transport = StreamTransport(pool_size=pool_size)
+    return _transport
+
+
+def set_transport(transport):
+    """Replace the transport used by default.
+
+    :param transport: AsyncTransport object, or None to restore the default
+    """
+    global _transport  # pylint: disable=global-statement
+    _transport = transport
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a function doing file I/O in the default executor."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(None, call)
+
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+async def async_request(
+    method,
+    path,
+    params=None,
+    payload=None,
+    parser=None,
+    headers=None,
+    min_server_version=QPC_MIN_SERVER_VERSION,
+    transport=None,
+):
+    """Send a request to the server without blocking the event loop.
+
+    The arguments, retries, response cache and mirror match
+    qpc.request.send_request.
+
+    :param method: the request method to execute
+    :param path: path after server and port (i.e. /api/v1/credentials)
+    :param params: uri encoding params (i.e. ?param1=hello&param2=world)
+    :param payload: dictionary of payload to be posted
+    :param parser: parser of the command, to name it in the log
+    :param headers: headers to include
+    :param min_server_version: min qpc server version allowed
+    :param transport: AsyncTransport to use instead of the default one
+    :returns: AsyncResponse object
+    :raises: QPCError if the method is not supported, QPCConnectionError if
+        the server can not be reached, QPCOfflineError if offline and the
+        mirror can not answer, and the errors raised by check_response
+    """
+    if method not in SUPPORTED_METHODS:
+        raise QPCError(f"Unsupported request method {method}")
+    log_command = None
+    if parser is not None:
+        log_command = parser.prog
+    if method == GET and mirror.is_enabled():
+        mirrored = await _run_blocking(mirror.lookup, path, params)
+        if mirrored is not None:
+            response = AsyncResponse.from_response(mirrored)
+            return await _run_blocking(check_response, response, min_server_version)
+    if method != GET:
+        await _run_blocking(invalidate_changes, method, path)
+    req_headers = build_request_headers(headers)
+    base_url = get_server_location() + path
+    url = base_url
+    if params:
+        query = {key: value for key, value in params.items() if value is not None}
+        url += "?" + urlencode(query, doseq=True)
+    cached = None
+    if method == GET:
+        cached = await _run_blocking(cache.lookup, base_url, params, req_headers)
+        if cached is not None:
+            req_headers.update(cache.conditional_headers(cached))
+    body = None
+    if payload is not None and method != GET and method != DELETE:
+        body = json.dumps(payload).encode("utf-8")
+        req_headers["Content-Type"] = "application/json"
+
+    transport = transport or get_transport()
+    max_retries = get_max_retries(method)
+    retry = 0
+    while True:
+        retry += 1
+        try:
+            response = await transport.send(
+                method, url, req_headers, body=body, verify=get_ssl_verify()
+            )
+        except ssl.SSLError as error:
+            raise QPCConnectionError(connection_error_message()) from error
+        except (OSError, EOFError) as error:
+            if not should_retry(method, url, retry, max_retries):
+                raise QPCConnectionError(connection_error_message()) from error
+            delay = get_retry_delay(retry)
+            log_retry(method, url, retry, max_retries, delay, error)
+            await asyncio.sleep(delay)
+            continue
+        if response.status_code in RETRY_STATUS_CODES and should_retry(
+            method, url, retry, max_retries
+        ):
+            delay = get_retry_delay(retry, response)
+            log_retry(method, url, retry, max_retries, delay, response.status_code)
+            await asyncio.sleep(delay)
+            continue
+        break
+    if method == GET:
+        if cached is not None and response.status_code == codes.not_modified:
+            response = AsyncResponse.from_response(
+                await _run_blocking(
+                    cache.response_from_cache,
+                    cached,
+                    response,
+                    base_url,
+                    params,
+                    req_headers,
+                )
+            )
+        else:
+            await _run_blocking(cache.store, base_url, params, req_headers, response)
+    result = await _run_blocking(check_response, response, min_server_version)
+    log_request_info(method, log_command, url, result)
+    return result
@@ -0,0 +1,6 @@
+"""Constants for the batch command."""
+
+SUBCOMMAND = "batch"
+
+# read the command lines from stdin
+STDIN = "-"
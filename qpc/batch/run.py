@@ -0,0 +1,281 @@
+"""BatchCommand is used to run many qpc command lines in one process."""
+
+import io
+import shlex
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from logging import StreamHandler, getLogger
+
+from qpc import agent, batch, messages, utils
+from qpc.cli import CLI
+from qpc.clicommand import CliCommand, set_paging
+from qpc.release import PKG_NAME
+from qpc.translation import _
+from qpc.utils import (
+    get_exit_code,
+    pretty_print,
+    read_in_file,
+    validate_positive_int,
+    validate_write_file,
+    write_file,
+)
+
+logger = getLogger(__name__)
+
+# subcommands that can not run from a batch line
+NESTED_SUBCOMMANDS = (agent.SUBCOMMAND, batch.SUBCOMMAND)
+
+# stdout and stderr buffers of the batch line being run, if any; threads
+# started by run_concurrently for the line see them too
+_line_output = ContextVar("line_output", default=None)
+
+
+class _LineOutput(io.TextIOBase):
+    """Text stream writing to the buffer of the current batch line, if any."""
+
+    def __init__(self, stream, index):
+        """Create stream.
+
+        :param stream: stream written to outside of batch lines
+        :param index: 0 to write to the stdout buffer of lines, 1 for stderr
+        """
+        super().__init__()
+        self.stream = stream
+        self.index = index
+
+    def writable(self):
+        """Streams are write only."""
+        return True
+
+    def write(self, text):
+        """Write text to the buffer of the current line."""
+        buffers = _line_output.get()
+        return (self.stream if buffers is None else buffers[self.index]).write(text)
+
+    def flush(self):
+        """Flush the underlying stream; buffers are written when a line ends."""
+        if _line_output.get() is None:
+            self.stream.flush()
+
+
+@contextmanager
+def _captured_output():
+    """Let every batch line collect its own stdout and stderr.
+
+    Log messages shown on the console are collected with stderr.
+    """
+    stdout, stderr = sys.stdout, sys.stderr
+    line_stderr = _LineOutput(stderr, 1)
+    handlers = [
+        handler
+        for handler in utils.logger.handlers
+        if isinstance(handler, StreamHandler) and handler.stream is stderr
+    ]
+    sys.stdout, sys.stderr = _LineOutput(stdout, 0), line_stderr
+    for handler in handlers:
+        handler.setStream(line_stderr)
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        for handler in handlers:
+            handler.setStream(stderr)
+
+
+# pylint: disable=too-few-public-methods
+class BatchCommand(CliCommand):
+    """Defines the batch command.
+
+    This command runs qpc command lines read from a file in this process,
+    sharing its configuration, HTTP session and global options, and
+    reports the exit status of every line. With --parallel, several lines
+    run at a time on threads of this process.
+    """
+
+    SUBCOMMAND = batch.SUBCOMMAND
+    ACTION = None
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.SUBCOMMAND),
+            None,
+            None,
+            [],
+        )
+        self.parser.add_argument(
+            "-f",
+            "--file",
+            dest="file",
+            metavar="FILE",
+            default=batch.STDIN,
+            help=_(messages.BATCH_FILE_HELP),
+        )
+        self.parser.add_argument(
+            "--parallel",
+            dest="parallel",
+            metavar="N",
+            type=validate_positive_int,
+            default=1,
+            help=_(messages.BATCH_PARALLEL_HELP),
+        )
+        self.parser.add_argument(
+            "--status-file",
+            dest="status_file",
+            metavar="PATH",
+            help=_(messages.BATCH_STATUS_FILE_HELP),
+        )
+        self.lines = []
+
+    def _validate_args(self):
+        CliCommand._validate_args(self)
+        try:
+            if self.args.status_file:
+                validate_write_file(self.args.status_file, "status-file")
+            if self.args.file == batch.STDIN:
+                self.lines = sys.stdin.read().splitlines()
+            else:
+                self.lines = read_in_file(self.args.file)
+        except ValueError as error:
+            logger.error(error)
+            sys.exit(1)
+        if self.lines is None:
+            sys.exit(1)
+
+    def _commands(self):
+        """List the command lines to run, as (line number, text) tuples."""
+        return [
+            (number, line.strip())
+            for number, line in enumerate(self.lines, start=1)
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+    @staticmethod
+    def _line_argv(cli, number, text):
+        """Split a command line, checking it can run from a batch.
+
+        :param cli: CLI used to look at the line
+        :param number: line number, for error messages
+        :param text: the command line, with or without the program name
+        :returns: the arguments, without the program name, or None if the
+            line can not run
+        """
+        try:
+            argv = shlex.split(text)
+        except ValueError as error:
+            logger.error(
+                _(messages.BATCH_INVALID_LINE), {"line": number, "error": error}
+            )
+            return None
+        if argv and argv[0] == PKG_NAME:
+            argv = argv[1:]
+        subcommand = cli.requested_command(argv)[0]
+        if subcommand in NESTED_SUBCOMMANDS:
+            logger.error(
+                _(messages.BATCH_NESTED_COMMAND),
+                {"line": number, "subcommand": subcommand},
+            )
+            return None
+        # the batch already applied them; they can not change for one line
+        if cli.given_global_options(argv):
+            logger.error(_(messages.BATCH_GLOBAL_OPTIONS), {"line": number})
+            return None
+        return argv
+
+    def _run_line(self, number, text):
+        """Run a command line through the qpc dispatcher, in this process.
+
+        :param number: line number, for error messages
+        :param text: the command line, with or without the program name
+        :returns: exit status of the command
+        """
+        cli = CLI(name=PKG_NAME)
+        try:
+            argv = self._line_argv(cli, number, text)
+            if argv is None:
+                return 2
+            cli.parse_args(argv)
+            cli.run()
+        except SystemExit as error:
+            return get_exit_code(error.code)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            return 1
+        return 0
+
+    def _run_buffered(self, number, text):
+        """Run a command line, collecting its output.
+
+        :returns: tuple of exit status, stdout and stderr of the line
+        """
+        buffers = (io.StringIO(), io.StringIO())
+        _line_output.set(buffers)
+        code = self._run_line(number, text)
+        return code, buffers[0].getvalue(), buffers[1].getvalue()
+
+    def _run_parallel(self, commands):
+        """Run the command lines on --parallel threads at a time.
+
+        Lines may not change the global options, so the settings the lines
+        share in this process are the same for all of them. The output of
+        each line is written once the line and the lines before it are
+        done, so it is never interleaved.
+
+        :returns: list of exit statuses, in the order of commands
+        """
+        codes = []
+        with _captured_output(), ThreadPoolExecutor(
+            max_workers=self.args.parallel, thread_name_prefix=batch.SUBCOMMAND
+        ) as executor:
+            futures = [
+                executor.submit(copy_context().run, self._run_buffered, number, text)
+                for number, text in commands
+            ]
+            for future in futures:
+                code, stdout, stderr = future.result()
+                sys.stdout.write(stdout)
+                sys.stdout.flush()
+                sys.stderr.write(stderr)
+                codes.append(code)
+        return codes
+
+    def _do_command(self):
+        """Run every command line and report their exit status."""
+        commands = self._commands()
+        # no one answers the prompt for the next page, and stdin may be the
+        # batch itself
+        set_paging(False)
+        try:
+            if self.args.parallel > 1 and len(commands) > 1:
+                codes = self._run_parallel(commands)
+            else:
+                codes = [self._run_line(number, text) for number, text in commands]
+        finally:
+            set_paging()
+        status = pretty_print(
+            [
+                {"line": number, "command": text, "exit_code": code}
+                for (number, text), code in zip(commands, codes)
+            ]
+        )
+        if self.args.status_file:
+            try:
+                write_file(self.args.status_file, status)
+                logger.info(_(messages.BATCH_STATUS_WRITTEN), self.args.status_file)
+            except EnvironmentError as err:
+                logger.error(
+                    _(messages.WRITE_FILE_ERROR),
+                    {"path": self.args.status_file, "error": err},
+                )
+                sys.exit(1)
+        else:
+            print(status)
+        if any(codes):
+            sys.exit(1)
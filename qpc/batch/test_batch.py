@@ -0,0 +1,150 @@
+"""Test the batch command."""
+
+import json
+import sys
+import threading
+
+import pytest
+import requests_mock
+
+from qpc.batch.run import BatchCommand
+from qpc.cli import CLI
+from qpc.cred import CREDENTIAL_URI
+from qpc.request import run_concurrently
+from qpc.scan import SCAN_URI
+from qpc.source import SOURCE_URI
+from qpc.utils import get_server_location
+
+COMMANDS = """\
+# lists everything
+qpc cred list
+
+source list
+scan list
+cred bogus
+batch -f other.txt
+"""
+
+
+@pytest.fixture
+def batch_file(tmp_path, server_config):
+    """Write the command lines and mock the endpoints they use."""
+    path = tmp_path / "commands.txt"
+    path.write_text(COMMANDS)
+    with requests_mock.Mocker() as mocker:
+        for uri, name in (
+            (CREDENTIAL_URI, "cred1"),
+            (SOURCE_URI, "source1"),
+            (SCAN_URI, "scan1"),
+        ):
+            mocker.get(
+                get_server_location() + uri,
+                json={"count": 1, "next": None, "results": [{"name": name}]},
+            )
+        yield path
+
+
+def run_batch(monkeypatch, *args):
+    """Run qpc batch and return its exit code."""
+    monkeypatch.setattr(sys, "argv", ["qpc", "batch", *args])
+    with pytest.raises(SystemExit) as error:
+        CLI().main()
+    return error.value.code
+
+
+def test_batch(batch_file, tmp_path, monkeypatch, capsys):
+    """Test every line runs and its output comes in file order."""
+    status_file = tmp_path / "status.json"
+    code = run_batch(
+        monkeypatch, "-f", str(batch_file), "--status-file", str(status_file)
+    )
+    assert code == 1
+    status = json.loads(status_file.read_text())
+    assert [(line["line"], line["exit_code"]) for line in status] == [
+        (2, 0),
+        (4, 0),
+        (5, 0),
+        (6, 2),
+        (7, 2),
+    ]
+    out, err = capsys.readouterr()
+    assert out.index("cred1") < out.index("source1") < out.index("scan1")
+    assert "invalid choice: 'bogus'" in err
+
+
+def test_batch_parallel(batch_file, monkeypatch, capsys):
+    """Test --parallel runs the lines in this process, printed in file order."""
+    stdout, stderr = sys.stdout, sys.stderr
+    code = run_batch(monkeypatch, "-f", str(batch_file), "--parallel", "3")
+    assert code == 1
+    out, err = capsys.readouterr()
+    assert out.index("cred1") < out.index("source1") < out.index("scan1")
+    status = json.loads(out[out.index('[\n    {\n        "command"') :])
+    assert [line["exit_code"] for line in status] == [0, 0, 0, 2, 2]
+    assert "invalid choice: 'bogus'" in err
+    assert (sys.stdout, sys.stderr) == (stdout, stderr)
+
+
+def test_batch_global_options_refused(server_config, tmp_path, monkeypatch, caplog):
+    """Test lines may not change the options given before batch."""
+    path = tmp_path / "commands.txt"
+    path.write_text("--no-cache cred list\nqpc --server other scan list\n")
+    assert run_batch(monkeypatch, "-f", str(path)) == 1
+    assert [record.getMessage() for record in caplog.records] == [
+        "Line 1: options for all commands, such as -v or --server, must be given"
+        " before batch.",
+        "Line 2: options for all commands, such as -v or --server, must be given"
+        " before batch.",
+    ]
+
+
+def test_batch_prints_every_page(server_config, tmp_path, monkeypatch, capsys):
+    """Test list commands do not prompt, as stdin may be the batch itself."""
+    location = get_server_location()
+    path = tmp_path / "commands.txt"
+    path.write_text("cred list\n")
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            location + CREDENTIAL_URI,
+            json={"count": 2, "next": "?page=2", "results": [{"name": "cred1"}]},
+        )
+        mocker.get(
+            location + CREDENTIAL_URI + "?page=2",
+            json={"count": 2, "next": None, "results": [{"name": "cred2"}]},
+        )
+        monkeypatch.setattr("builtins.input", pytest.fail)
+        monkeypatch.setattr(sys, "argv", ["qpc", "batch", "-f", str(path)])
+        CLI().main()
+    out = capsys.readouterr().out
+    assert out.index("cred1") < out.index("cred2")
+
+
+def test_batch_stdin(batch_file, monkeypatch, capsys):
+    """Test lines are read from stdin and the status printed last."""
+    monkeypatch.setattr(sys, "stdin", open(batch_file, encoding="utf-8"))
+    run_batch(monkeypatch)
+    out = capsys.readouterr().out
+    status = json.loads(out[out.index('[\n    {\n        "command"') :])
+    assert status[0] == {"command": "qpc cred list", "exit_code": 0, "line": 2}
+
+
+def test_batch_parallel_threads_output(tmp_path, monkeypatch, capsys):
+    """Test the threads a line starts write to the output of the line."""
+    second_done = threading.Event()
+
+    def run_line(_, number, text):
+        # the first line prints after the second one
+        if number == 1:
+            second_done.wait(5)
+        run_concurrently(print, [f"{number}a", f"{number}b"])
+        second_done.set()
+        return 0
+
+    monkeypatch.setattr(BatchCommand, "_run_line", run_line)
+    path = tmp_path / "commands.txt"
+    path.write_text("completion bash\ncompletion zsh\n")
+    monkeypatch.setattr(
+        sys, "argv", ["qpc", "--jobs", "2", "batch", "-f", str(path), "--parallel", "2"]
+    )
+    CLI().main()
+    assert capsys.readouterr().out.startswith("1a\n1b\n2a\n2b\n")
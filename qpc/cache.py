@@ -0,0 +1,245 @@
+"""On-disk cache of GET responses revalidated with conditional requests.
+
+Responses carrying an ETag or Last-Modified header are stored under the
+qpc data directory. The next GET of the same url, query parameters and
+credentials sends If-None-Match / If-Modified-Since, and a 304 answer is
+served from the stored body.
+
+Cached bodies may hold credential and source details, so the cache
+directory is only readable by its owner.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from http import HTTPStatus
+from logging import getLogger
+
+from qpc import utils
+from qpc.utils import (
+    CONFIG_CACHE_MAX_AGE,
+    CONFIG_CACHE_MAX_SIZE,
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_CACHE_MAX_SIZE,
+    read_server_config,
+)
+
+logger = getLogger(__name__)
+
+# response headers kept with a cached body
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "X-Server-Version")
+
+# permissions of the cache directory and of its entries
+CACHE_DIR_MODE = 0o700
+CACHE_FILE_MODE = 0o600
+
+# cleared by the --no-cache option
+_enabled = True
+_evict_lock = threading.Lock()
+
+
+def set_cache_enabled(enabled):
+    """Enable or disable the response cache for this invocation.
+
+    :param enabled: False to neither read nor store cached responses
+    """
+    global _enabled  # pylint: disable=global-statement
+    _enabled = enabled
+
+
+def get_cache_limits():
+    """Return the configured cache limits.
+
+    :returns: tuple of maximum total size in bytes and maximum entry age
+        in seconds; the cache is disabled when either is 0
+    """
+    config = read_server_config()
+    if config is None:
+        return DEFAULT_CACHE_MAX_SIZE, DEFAULT_CACHE_MAX_AGE
+    return (
+        config.get(CONFIG_CACHE_MAX_SIZE, DEFAULT_CACHE_MAX_SIZE),
+        config.get(CONFIG_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE),
+    )
+
+
+def is_cache_enabled():
+    """Check whether responses may be read from and stored in the cache."""
+    if not _enabled:
+        return False
+    max_size, max_age = get_cache_limits()
+    return max_size > 0 and max_age > 0
+
+
+def _entry_path(url, params, headers):
+    """Return the cache file of a request.
+
+    The key covers the url, the query parameters and the credentials, so
+    users sharing a data directory never see each other's responses. The
+    token itself is only hashed, never written.
+    """
+    identity = (headers or {}).get("Authorization", "")
+    key = json.dumps(
+        [url, sorted((params or {}).items()), identity], sort_keys=True, default=str
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(utils.QPC_HTTP_CACHE, f"{digest}.json")
+
+
+def lookup(url, params=None, headers=None):
+    """Find the cached response of a GET request.
+
+    Entries older than the configured maximum age are removed.
+
+    :param url: the request url
+    :param params: the query parameters
+    :param headers: the request headers
+    :returns: the cache entry dictionary, or None
+    """
+    if not is_cache_enabled():
+        return None
+    path = _entry_path(url, params, headers)
+    try:
+        with open(path, encoding="utf-8") as entry_file:
+            entry = json.load(entry_file)
+        age = time.time() - os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None
+    if age > get_cache_limits()[1]:
+        _remove(path)
+        return None
+    return entry
+
+
+def conditional_headers(entry):
+    """Return the validators to send for a cached entry.
+
+    :param entry: dictionary returned by lookup
+    :returns: dictionary of If-None-Match / If-Modified-Since headers
+    """
+    # pylint: disable=import-outside-toplevel
+    from requests.structures import CaseInsensitiveDict
+
+    headers = {}
+    stored = CaseInsensitiveDict(entry["headers"])
+    if stored.get("ETag"):
+        headers["If-None-Match"] = stored["ETag"]
+    if stored.get("Last-Modified"):
+        headers["If-Modified-Since"] = stored["Last-Modified"]
+    return headers
+
+
+def response_from_cache(entry, not_modified, url, params=None, headers=None):
+    """Build the response served for a 304 answer.
+
+    :param entry: dictionary returned by lookup
+    :param not_modified: the 304 response sent by the server
+    :param url: the request url
+    :param params: the query parameters
+    :param headers: the request headers
+    :returns: requests.Response with the cached status and body
+    """
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = entry["status_code"]
+    response.reason = entry.get("reason", "OK")
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    for name in CACHED_HEADERS:
+        if name in not_modified.headers:
+            response.headers[name] = not_modified.headers[name]
+    # pylint: disable=protected-access
+    response._content = entry["content"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = not_modified.url
+    response.request = getattr(not_modified, "request", None)
+    # mark the entry as fresh again
+    try:
+        os.utime(_entry_path(url, params, headers))
+    except OSError:
+        pass
+    logger.debug("Response for %s served from cache", url)
+    return response
+
+
+def store(url, params, headers, response):
+    """Save a GET response if the server sent validators for it.
+
+    :param url: the request url
+    :param params: the query parameters
+    :param headers: the request headers
+    :param response: the server response
+    """
+    if response.status_code != HTTPStatus.OK or not is_cache_enabled():
+        return
+    if "ETag" not in response.headers and "Last-Modified" not in response.headers:
+        return
+    try:
+        content = response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        return
+    entry = {
+        "status_code": response.status_code,
+        "reason": response.reason,
+        "headers": {
+            name: response.headers[name]
+            for name in CACHED_HEADERS
+            if name in response.headers
+        },
+        "content": content,
+    }
+    path = _entry_path(url, params, headers)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(utils.QPC_HTTP_CACHE, mode=CACHE_DIR_MODE, exist_ok=True)
+        os.chmod(utils.QPC_HTTP_CACHE, CACHE_DIR_MODE)
+        entry_fd = os.open(
+            tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, CACHE_FILE_MODE
+        )
+        with os.fdopen(entry_fd, "w", encoding="utf-8") as entry_file:
+            json.dump(entry, entry_file)
+        os.replace(tmp_path, path)
+    except OSError as error:
+        logger.debug("Could not cache response for %s: %s", url, error)
+        _remove(tmp_path)
+        return
+    evict(get_cache_limits()[0])
+
+
+def evict(max_size):
+    """Remove the least recently used entries above max_size bytes.
+
+    :param max_size: maximum total size of the cache in bytes
+    """
+    with _evict_lock:
+        entries = []
+        try:
+            names = os.listdir(utils.QPC_HTTP_CACHE)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(utils.QPC_HTTP_CACHE, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+            _remove(path)
+            total -= size
+
+
+def _remove(path):
+    """Delete a file that may already be gone."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -2,66 +2,144 @@
 
 import sys
 from argparse import ArgumentParser
+from importlib import import_module
 
-from qpc import cred, insights, messages, report, scan, server, source
-from qpc.cred.commands import (
-    CredAddCommand,
-    CredClearCommand,
-    CredEditCommand,
-    CredListCommand,
-    CredShowCommand,
-)
-from qpc.insights.commands import (
-    InsightsAddLoginCommand,
-    InsightsConfigureCommand,
-    InsightsPublishCommand,
+from qpc import (
+    agent,
+    batch,
+    completion,
+    cred,
+    insights,
+    messages,
+    report,
+    scan,
+    server,
+    source,
+    sync,
 )
 from qpc.release import PKG_NAME, VERSION
-from qpc.report.commands import (
-    ReportDeploymentsCommand,
-    ReportDetailsCommand,
-    ReportDownloadCommand,
-    ReportInsightsCommand,
-    ReportMergeCommand,
-    ReportMergeStatusCommand,
-    ReportUploadCommand,
-)
-from qpc.scan.commands import (
-    ScanAddCommand,
-    ScanCancelCommand,
-    ScanClearCommand,
-    ScanEditCommand,
-    ScanJobCommand,
-    ScanListCommand,
-    ScanPauseCommand,
-    ScanRestartCommand,
-    ScanShowCommand,
-    ScanStartCommand,
-)
-from qpc.server.commands import (
-    ConfigureHostCommand,
-    LoginHostCommand,
-    LogoutHostCommand,
-    ServerStatusCommand,
-)
-from qpc.source.commands import (
-    SourceAddCommand,
-    SourceClearCommand,
-    SourceEditCommand,
-    SourceListCommand,
-    SourceShowCommand,
-)
 from qpc.translation import _
 from qpc.utils import (
+    DEFAULT_JOBS,
     ensure_config_dir_exists,
     ensure_data_dir_exists,
     get_server_location,
     logger,
     read_client_token,
     read_require_auth,
+    set_server_profile,
     setup_logging,
+    validate_positive_int,
+    validate_server_profile,
+    validate_server_profiles,
 )
 
+# Commands by (subcommand, action), in the order listed by --help; the
+# action is None for subcommands that have none. Only the module of the
+# command being run is imported.
+COMMANDS = {
+    (server.SUBCOMMAND, server.CONFIG): (
+        "qpc.server.configure_host.ConfigureHostCommand"
+    ),
+    (server.SUBCOMMAND, server.LOGIN): "qpc.server.login_host.LoginHostCommand",
+    (server.SUBCOMMAND, server.LOGOUT): "qpc.server.logout_host.LogoutHostCommand",
+    (server.SUBCOMMAND, server.STATUS): "qpc.server.status.ServerStatusCommand",
+    (cred.SUBCOMMAND, cred.ADD): "qpc.cred.add.CredAddCommand",
+    (cred.SUBCOMMAND, cred.LIST): "qpc.cred.list.CredListCommand",
+    (cred.SUBCOMMAND, cred.EDIT): "qpc.cred.edit.CredEditCommand",
+    (cred.SUBCOMMAND, cred.SHOW): "qpc.cred.show.CredShowCommand",
+    (cred.SUBCOMMAND, cred.CLEAR): "qpc.cred.clear.CredClearCommand",
+    (source.SUBCOMMAND, source.ADD): "qpc.source.add.SourceAddCommand",
+    (source.SUBCOMMAND, source.LIST): "qpc.source.list.SourceListCommand",
+    (source.SUBCOMMAND, source.SHOW): "qpc.source.show.SourceShowCommand",
+    (source.SUBCOMMAND, source.CLEAR): "qpc.source.clear.SourceClearCommand",
+    (source.SUBCOMMAND, source.EDIT): "qpc.source.edit.SourceEditCommand",
+    (scan.SUBCOMMAND, scan.ADD): "qpc.scan.add.ScanAddCommand",
+    (scan.SUBCOMMAND, scan.START): "qpc.scan.start.ScanStartCommand",
+    (scan.SUBCOMMAND, scan.LIST): "qpc.scan.list.ScanListCommand",
+    (scan.SUBCOMMAND, scan.SHOW): "qpc.scan.show.ScanShowCommand",
+    (scan.SUBCOMMAND, scan.PAUSE): "qpc.scan.pause.ScanPauseCommand",
+    (scan.SUBCOMMAND, scan.CANCEL): "qpc.scan.cancel.ScanCancelCommand",
+    (scan.SUBCOMMAND, scan.RESTART): "qpc.scan.restart.ScanRestartCommand",
+    (scan.SUBCOMMAND, scan.EDIT): "qpc.scan.edit.ScanEditCommand",
+    (scan.SUBCOMMAND, scan.CLEAR): "qpc.scan.clear.ScanClearCommand",
+    (scan.SUBCOMMAND, scan.JOB): "qpc.scan.job.ScanJobCommand",
+    (report.SUBCOMMAND, report.DEPLOYMENTS): (
+        "qpc.report.deployments.ReportDeploymentsCommand"
+    ),
+    (report.SUBCOMMAND, report.DETAILS): "qpc.report.details.ReportDetailsCommand",
+    (report.SUBCOMMAND, report.INSIGHTS): "qpc.report.insights.ReportInsightsCommand",
+    (report.SUBCOMMAND, report.DOWNLOAD): "qpc.report.download.ReportDownloadCommand",
+    (report.SUBCOMMAND, report.MERGE): "qpc.report.merge.ReportMergeCommand",
+    (report.SUBCOMMAND, report.MERGE_STATUS): (
+        "qpc.report.merge_status.ReportMergeStatusCommand"
+    ),
+    (report.SUBCOMMAND, report.UPLOAD): "qpc.report.upload.ReportUploadCommand",
+    (insights.SUBCOMMAND, insights.CONFIG): (
+        "qpc.insights.configure.InsightsConfigureCommand"
+    ),
+    (insights.SUBCOMMAND, insights.ADD_LOGIN): (
+        "qpc.insights.login.InsightsAddLoginCommand"
+    ),
+    (insights.SUBCOMMAND, insights.PUBLISH): (
+        "qpc.insights.publish.InsightsPublishCommand"
+    ),
+    (agent.SUBCOMMAND, agent.START): "qpc.agent.start.AgentStartCommand",
+    (agent.SUBCOMMAND, agent.STOP): "qpc.agent.stop.AgentStopCommand",
+    (agent.SUBCOMMAND, agent.STATUS): "qpc.agent.status.AgentStatusCommand",
+    (batch.SUBCOMMAND, None): "qpc.batch.run.BatchCommand",
+    (completion.SUBCOMMAND, completion.BASH): (
+        "qpc.completion.script.CompletionBashCommand"
+    ),
+    (completion.SUBCOMMAND, completion.ZSH): (
+        "qpc.completion.script.CompletionZshCommand"
+    ),
+    (completion.SUBCOMMAND, completion.REFRESH): (
+        "qpc.completion.refresh.CompletionRefreshCommand"
+    ),
+    (sync.SUBCOMMAND, None): "qpc.sync.run.SyncCommand",
+}
+
+# commands that only use the server through the commands they run, or not
+# at all; the action is None for subcommands named without one
+NO_SERVER_COMMANDS = (
+    (agent.SUBCOMMAND, None),
+    (agent.SUBCOMMAND, agent.START),
+    (agent.SUBCOMMAND, agent.STOP),
+    (agent.SUBCOMMAND, agent.STATUS),
+    (batch.SUBCOMMAND, None),
+    (completion.SUBCOMMAND, None),
+    (completion.SUBCOMMAND, completion.BASH),
+    (completion.SUBCOMMAND, completion.ZSH),
+)
+
+
+def load_command(path):
+    """Import the command class at the given dotted path.
+
+    :param path: module path followed by the class name
+    :returns: the CliCommand subclass
+    """
+    module_name, class_name = path.rsplit(".", 1)
+    return getattr(import_module(module_name), class_name)
+
+
+class _ActionParsers:  # pylint: disable=too-few-public-methods
+    """Hand the parsers created by CLI to a command being built.
+
+    Commands create their parser with subparsers.add_parser(ACTION), or
+    subparsers.add_parser(SUBCOMMAND) for those without an action; this
+    returns the parser CLI already registered under that name instead.
+    """
+
+    def __init__(self, parsers):
+        """Create object."""
+        self.parsers = parsers
+
+    def add_parser(self, name, **kwargs):  # pylint: disable=unused-argument
+        """Return the existing parser of an action."""
+        return self.parsers[name]
+
 
 # pylint: disable=too-few-public-methods
 class CLI:
@@ -76,128 +154,234 @@ class CLI:
         self.shortdesc = shortdesc
         if shortdesc is not None and description is None:
             description = shortdesc
-        self.parser = ArgumentParser(usage=usage, description=description)
-        self.parser.add_argument("--version", action="version", version=VERSION)
-        self.parser.add_argument(
+        # --servers and --all-servers are removed from the command line run
+        # on every server by their full name; see qpc.fanout
+        self.parser = ArgumentParser(
+            usage=usage, description=description, allow_abbrev=False
+        )
+        self._add_global_arguments(self.parser)
+        self.subparsers = self.parser.add_subparsers(dest="subcommand")
+        self.name = name
+        self.args = None
+        self.subcommands = {}
+        # empty parsers for every action; a command only adds its arguments
+        # to its own parser, when it is the one being run
+        self.action_parsers = {}
+        action_subparsers = {}
+        for subcommand, action in COMMANDS:
+            if action is None:
+                self.action_parsers[subcommand] = {
+                    subcommand: self.subparsers.add_parser(subcommand)
+                }
+                self.subcommands[subcommand] = {}
+                continue
+            if subcommand not in action_subparsers:
+                subcommand_parser = self.subparsers.add_parser(subcommand)
+                action_subparsers[subcommand] = subcommand_parser.add_subparsers(
+                    dest="action"
+                )
+                self.action_parsers[subcommand] = {}
+                self.subcommands[subcommand] = {}
+            self.action_parsers[subcommand][action] = action_subparsers[
+                subcommand
+            ].add_parser(action)
+
+        ensure_data_dir_exists()
+        ensure_config_dir_exists()
+
+    @staticmethod
+    def _add_global_arguments(parser):
+        """Add the options accepted before the subcommand."""
+        parser.add_argument("--version", action="version", version=VERSION)
+        parser.add_argument(
             "-v",
             dest="verbosity",
             action="count",
             default=0,
             help=_(messages.VERBOSITY_HELP),
         )
-        self.subparsers = self.parser.add_subparsers(dest="subcommand")
-        self.name = name
-        self.args = None
-        self.subcommands = {}
-        self._add_subcommand(
-            server.SUBCOMMAND,
-            [
-                ConfigureHostCommand,
-                LoginHostCommand,
-                LogoutHostCommand,
-                ServerStatusCommand,
-            ],
+        parser.add_argument(
+            "--jobs",
+            dest="jobs",
+            metavar="JOBS",
+            type=validate_positive_int,
+            default=DEFAULT_JOBS,
+            help=_(messages.JOBS_HELP),
         )
-        self._add_subcommand(
-            cred.SUBCOMMAND,
-            [
-                CredAddCommand,
-                CredListCommand,
-                CredEditCommand,
-                CredShowCommand,
-                CredClearCommand,
-            ],
+        parser.add_argument(
+            "--no-cache",
+            dest="use_cache",
+            action="store_false",
+            help=_(messages.NO_CACHE_HELP),
         )
-        self._add_subcommand(
-            source.SUBCOMMAND,
-            [
-                SourceAddCommand,
-                SourceListCommand,
-                SourceShowCommand,
-                SourceClearCommand,
-                SourceEditCommand,
-            ],
+        parser.add_argument(
+            "--offline",
+            dest="offline",
+            action="store_true",
+            help=_(messages.OFFLINE_HELP),
         )
-
-        self._add_subcommand(
-            scan.SUBCOMMAND,
-            [
-                ScanAddCommand,
-                ScanStartCommand,
-                ScanListCommand,
-                ScanShowCommand,
-                ScanPauseCommand,
-                ScanCancelCommand,
-                ScanRestartCommand,
-                ScanEditCommand,
-                ScanClearCommand,
-                ScanJobCommand,
-            ],
+        parser.add_argument(
+            "--max-staleness",
+            dest="max_staleness",
+            metavar="SECONDS",
+            type=validate_positive_int,
+            help=_(messages.MAX_STALENESS_HELP),
         )
-        self._add_subcommand(
-            report.SUBCOMMAND,
-            [
-                ReportDeploymentsCommand,
-                ReportDetailsCommand,
-                ReportInsightsCommand,
-                ReportDownloadCommand,
-                ReportMergeCommand,
-                ReportMergeStatusCommand,
-                ReportUploadCommand,
-            ],
+        servers_group = parser.add_mutually_exclusive_group()
+        servers_group.add_argument(
+            "--server",
+            dest="server",
+            metavar="PROFILE",
+            type=validate_server_profile,
+            help=_(messages.SERVER_PROFILE_HELP),
         )
-        self._add_subcommand(
-            insights.SUBCOMMAND,
-            [
-                InsightsConfigureCommand,
-                InsightsAddLoginCommand,
-                InsightsPublishCommand,
-            ],
+        servers_group.add_argument(
+            "--servers",
+            dest="servers",
+            metavar="PROFILE,...",
+            type=validate_server_profiles,
+            help=_(messages.SERVERS_HELP),
+        )
+        servers_group.add_argument(
+            "--all-servers",
+            dest="all_servers",
+            action="store_true",
+            help=_(messages.ALL_SERVERS_HELP),
         )
 
-        ensure_data_dir_exists()
-        ensure_config_dir_exists()
+    def requested_command(self, argv):
+        """Find the subcommand and action named on the command line.
 
-    def _add_subcommand(self, subcommand, actions):
-        subcommand_parser = self.subparsers.add_parser(subcommand)
-        action_subparsers = subcommand_parser.add_subparsers(dest="action")
-        self.subcommands[subcommand] = {}
-        for action in actions:
-            action_inst = action(action_subparsers)
-            action_dic = self.subcommands[action.SUBCOMMAND]
-            action_dic[action.ACTION] = action_inst
+        Only the global options are known at this point; everything else
+        is left for the full parser.
 
-    def main(self):
-        """Execute of subcommand operation.
+        :param argv: command line arguments, without the program name
+        :returns: tuple of subcommand and action, either may be None
+        """
+        probe = ArgumentParser(add_help=False, allow_abbrev=False)
+        self._add_global_arguments(probe)
+        probe.add_argument("subcommand", nargs="?")
+        probe.add_argument("action", nargs="?")
+        args = probe.parse_known_args(argv)[0]
+        if (args.subcommand, None) in COMMANDS:
+            return args.subcommand, None
+        return args.subcommand, args.action
 
-        Method determine whether to display usage or pass input
-        to find the best command match. If no match is found the
-        usage is displayed
+    def given_global_options(self, argv):
+        """List the global options given on a command line.
+
+        :param argv: command line arguments, without the program name
+        :returns: sorted list of the destinations of the options given
+            (i.e. "jobs")
+        """
+        probe = ArgumentParser(add_help=False, allow_abbrev=False)
+        self._add_global_arguments(probe)
+        # every option given sets a value other than None
+        dests = vars(probe.parse_known_args([])[0])
+        probe.set_defaults(**dict.fromkeys(dests))
+        probe.add_argument("subcommand", nargs="?")
+        probe.add_argument("action", nargs="?")
+        args = vars(probe.parse_known_args(argv)[0])
+        return sorted(dest for dest in dests if args[dest] is not None)
+
+    def _add_command(self, subcommand, action):
+        """Import a command and add its arguments to its parser."""
+        command_class = load_command(COMMANDS[(subcommand, action)])
+        parsers = _ActionParsers(self.action_parsers[subcommand])
+        self.subcommands[subcommand][action] = command_class(parsers)
+
+    def command_parser(self, subcommand, action):
+        """Return the parser of a command.
+
+        :param subcommand: the subcommand
+        :param action: the action, None for subcommands without one
+        :returns: the ArgumentParser of the command
+        """
+        return self.action_parsers[subcommand][subcommand if action is None else action]
+
+    def add_all_commands(self):
+        """Import every command and add its arguments to its parser.
+
+        Used to describe the whole command line, i.e. for shell completion.
+        """
+        for subcommand, action in COMMANDS:
+            if action not in self.subcommands[subcommand]:
+                self._add_command(subcommand, action)
+
+    def parse_args(self, argv=None):
+        """Parse a command line, importing only the command it names.
+
+        :param argv: command line arguments, without the program name;
+            defaults to sys.argv[1:]
+        :returns: the parsed arguments
+        """
+        if argv is None:
+            argv = sys.argv[1:]
+        command = self.requested_command(argv)
+        if command in COMMANDS:
+            self._add_command(*command)
+        self.args = self.parser.parse_args(argv)
+        return self.args
+
+    def run(self):
+        """Run the command named by the parsed arguments.
+
+        Global options are left to main, so that commands run by another
+        one (i.e. qpc batch) share its logging and settings.
         """
-        self.args = self.parser.parse_args()
-        setup_logging(self.args.verbosity)
         is_server_cmd = self.args.subcommand == server.SUBCOMMAND
-        is_server_logout = is_server_cmd and self.args.action == server.LOGOUT
-        is_server_config = is_server_cmd and self.args.action == server.CONFIG
+        action_name = getattr(self.args, "action", None)
+        is_server_logout = is_server_cmd and action_name == server.LOGOUT
+        is_server_config = is_server_cmd and action_name == server.CONFIG
+        needs_server = (self.args.subcommand, action_name) not in NO_SERVER_COMMANDS
 
-        if not is_server_config:
+        if not is_server_config and needs_server:
             # Before attempting to run command, check server location
             server_location = get_server_location()
             if server_location is None or server_location == "":
                 logger.error(_(messages.SERVER_CONFIG_REQUIRED), PKG_NAME)
                 sys.exit(1)
 
-        if read_require_auth():
+        # the mirror answers offline commands without a login
+        offline = getattr(self.args, "offline", False)
+        if needs_server and not offline and read_require_auth():
             if (not is_server_cmd or is_server_logout) and not read_client_token():
                 logger.error(_(messages.SERVER_LOGIN_REQUIRED), PKG_NAME)
                 sys.exit(1)
 
         if self.args.subcommand in self.subcommands:
             subcommand = self.subcommands[self.args.subcommand]
-            if self.args.action in subcommand:
-                action = subcommand[self.args.action]
+            if action_name in subcommand:
+                action = subcommand[action_name]
                 action.main(self.args)
             else:
                 self.parser.print_help()
         else:
             self.parser.print_help()
+
+    def main(self):
+        """Execute of subcommand operation.
+
+        Method determine whether to display usage or pass input
+        to find the best command match. If no match is found the
+        usage is displayed
+        """
+        argv = sys.argv[1:]
+        self.parse_args(argv)
+        # the http modules pull in requests; --help and --version go without
+        # pylint: disable=import-outside-toplevel
+        from qpc.cache import set_cache_enabled
+        from qpc.mirror import set_mirror_mode
+        from qpc.request import set_jobs
+
+        setup_logging(self.args.verbosity)
+        if self.args.servers or self.args.all_servers:
+            from qpc.fanout import run_on_servers, select_profiles
+
+            profiles = select_profiles(self.args.servers, self.args.all_servers)
+            sys.exit(run_on_servers(profiles, argv))
+        set_server_profile(self.args.server)
+        set_jobs(self.args.jobs)
+        set_cache_enabled(self.args.use_cache)
+        set_mirror_mode(self.args.offline, self.args.max_staleness)
+        self.run()
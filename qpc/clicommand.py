@@ -1,9 +1,66 @@
 """Base CLI Command Class."""
 
+import json
+import math
+import os
 import sys
+import urllib.parse as urlparse
 
-from qpc.request import request
-from qpc.utils import QPC_MIN_SERVER_VERSION, handle_error_response, log_args
+from requests import codes
+
+from qpc import api, messages, names
+from qpc.exceptions import QPCError, QPCRequestError
+from qpc.request import (
+    get_executor,
+    get_jobs,
+    report_error,
+    request,
+    run_concurrently,
+)
+from qpc.server_info import (
+    CAPABILITY_PAGE_SIZE,
+    check_server_version,
+    get_capability,
+    set_capability,
+)
+from qpc.translation import _
+from qpc.utils import (
+    NO_PAGING_ENV,
+    OUTPUT_FORMATS,
+    OUTPUT_JSON,
+    OUTPUT_NDJSON,
+    QPC_MIN_SERVER_VERSION,
+    handle_error_response,
+    log_args,
+    print_json,
+    validate_field_list,
+    validate_filter,
+    validate_positive_int,
+)
+
+# query parameter of the server setting how many results a page holds
+PAGE_SIZE_PARAM = "page_size"
+# page size asked for when every page is fetched, once the server is known
+# to honor the page_size parameter
+BULK_PAGE_SIZE = 1000
+
+# False while no one can answer the prompt for the next page (i.e. for the
+# lines of qpc batch); list commands then print every page, as with --all
+_paging = True
+
+
+def set_paging(enabled=True):
+    """Choose whether list commands prompt before showing the next page.
+
+    :param enabled: False to print every page, as with --all
+    """
+    global _paging  # pylint: disable=global-statement
+    _paging = enabled
+
+
+def is_paging():
+    """Check whether list commands prompt before showing the next page."""
+    return _paging and not os.environ.get(NO_PAGING_ENV)
 
 
 # pylint: disable=too-few-public-methods, too-many-instance-attributes
@@ -23,12 +80,87 @@ class CliCommand:
         self.req_payload = None
         self.req_params = None
         self.req_headers = None
+        self.req_stream = False
+        self.req_compress = False
         self.response = None
+        # object looked up by name with _resolve_name, to look it up again
+        # if the server does not know its cached id
+        self._named = None
 
         # If you add or change API, you must update these versions
         # this includes self.min_server_version
         self.min_server_version = QPC_MIN_SERVER_VERSION
 
+    def _add_output_argument(self):
+        """Add the --output option, for commands printing server objects."""
+        self.parser.add_argument(
+            "--output",
+            dest="output",
+            choices=OUTPUT_FORMATS,
+            default=OUTPUT_JSON,
+            help=_(messages.OUTPUT_FORMAT_HELP),
+        )
+
+    def _print_json(self, json_data):
+        """Print json data in the format selected with --output."""
+        print_json(json_data, getattr(self.args, "output", OUTPUT_JSON))
+
+    def _resolve_name(self, path, name, suffix="", sole=False):
+        """Point the request path to the object with the given name.
+
+        The id of the object comes from the name cache (see qpc.names), or
+        from a list request filtered on the name.
+
+        :param path: list path of the object (i.e. /api/v1/credentials/)
+        :param name: the object name
+        :param suffix: path appended after the object id (i.e. "jobs/")
+        :param sole: True to also accept the only object listed for the
+            name, whatever its name (see find_by_name)
+        :returns: the cached fields of the object, or None if there is none
+        """
+        fields, cached = names.resolve(
+            path,
+            name,
+            lambda obj_name: find_by_name(self.parser, path, obj_name, sole),
+        )
+        if fields is not None:
+            self._named = (self.req_path, path, name, suffix, sole, cached)
+            self.req_path = f"{self.req_path}{fields['id']}/{suffix}"
+        return fields
+
+    def _retry_stale_name(self, response):
+        """Look the object of the request up again after a 404 answer.
+
+        :param response: the answer to the request sent to self.req_path
+        :returns: True if the id came from the name cache, and was replaced
+            by the one the server has now; the request is then sent again
+        """
+        if self._named is None or response.status_code != codes.not_found:
+            return False
+        req_path, path, name, suffix, sole, cached = self._named
+        self._named = None
+        if not cached:
+            return False
+        names.forget(path, name)
+        self.req_path = req_path
+        if self._resolve_name(path, name, suffix, sole) is None:
+            return False
+        self._named = None
+        return True
+
+    def _check_server_version(self):
+        """Refuse to run against a server already known to be too old.
+
+        The version cached by qpc.server_info is used, so no request is
+        sent; responses are still checked as they arrive.
+        """
+        if self.req_method is None:
+            return
+        try:
+            check_server_version(self.min_server_version)
+        except QPCError as error:
+            report_error(error)
+
     def _validate_args(self):
         """Sub-commands can override."""
 
@@ -46,6 +178,19 @@ class CliCommand:
     def _handle_response_success(self):
         """Sub-commands can override to perform success handling."""
 
+    def _handle_api_error(self, error):
+        """Report an error raised by qpc.api and exit.
+
+        An unexpected answer is handled as a response error of the command,
+        anything else is logged as is.
+
+        :param error: QPCError instance
+        """
+        if isinstance(error, QPCRequestError):
+            self.response = error.response
+            self._handle_response_error()
+        report_error(error)
+
     def _do_command(self):
         """Execute command flow.
 
@@ -54,7 +199,42 @@ class CliCommand:
         """
         self._build_req_params()
         self._build_data()
-        self.response = request(
+        while True:
+            self.response = request(
+                method=self.req_method,
+                path=self.req_path,
+                params=self.req_params,
+                payload=self.req_payload,
+                headers=self.req_headers,
+                parser=self.parser,
+                min_server_version=self.min_server_version,
+                stream=self.req_stream,
+                compress=self.req_compress,
+            )
+            if not self._retry_stale_name(self.response):
+                break
+
+        # pylint: disable=no-member
+        if self.response.status_code not in self.success_codes:
+            # handle error cases
+            self._handle_response_error()
+        else:
+            self._handle_response_success()
+
+    async def _do_command_async(self, transport=None):
+        """Execute command flow without blocking the event loop.
+
+        Counterpart of _do_command for commands that only send the single
+        request described by their req_* attributes.
+
+        :param transport: AsyncTransport to use instead of the default one
+        """
+        # pylint: disable=import-outside-toplevel
+        from qpc.async_request import async_request
+
+        self._build_req_params()
+        self._build_data()
+        self.response = await async_request(
             method=self.req_method,
             path=self.req_path,
             params=self.req_params,
@@ -62,11 +242,10 @@ class CliCommand:
             headers=self.req_headers,
             parser=self.parser,
             min_server_version=self.min_server_version,
+            transport=transport,
         )
 
-        # pylint: disable=no-member
         if self.response.status_code not in self.success_codes:
-            # handle error cases
             self._handle_response_error()
         else:
             self._handle_response_success()
@@ -78,7 +257,330 @@ class CliCommand:
         validity and set's the process in motion.
         """
         self.args = args
+        self._check_server_version()
         self._validate_args()
         log_args(self.args)
 
-        self._do_command()
+        try:
+            self._do_command()
+        except QPCError as error:
+            self._handle_api_error(error)
+
+    async def main_async(self, args, transport=None):
+        """Trigger main command flow from a running event loop.
+
+        Argument validation is shared with main; sub-commands that look up
+        names on the server while validating still block during that step.
+
+        :param args: parsed arguments, as given to main
+        :param transport: AsyncTransport to use instead of the default one
+        """
+        self.args = args
+        self._check_server_version()
+        self._validate_args()
+        log_args(self.args)
+
+        try:
+            await self._do_command_async(transport)
+        except QPCError as error:
+            self._handle_api_error(error)
+
+
+def find_by_name(parser, path, name, sole=False):
+    """Return the object with the given name from a list endpoint.
+
+    The object is looked up with qpc.api.find_by_name. Errors shared by
+    every command are logged and exit.
+
+    :param parser: the parser of the command, for the request log
+    :param path: list path of the object (i.e. /api/v1/credentials/)
+    :param name: the object name
+    :param sole: True to also accept the only object listed for the name,
+        whatever its name, as the credential and source commands always did
+    :returns: the object dictionary, or None if there is none
+    """
+    try:
+        return api.find_by_name(path, name, sole=sole, log_command=parser.prog)
+    except QPCRequestError:
+        return None
+    except QPCError as error:
+        report_error(error)
+    return None
+
+
+def get_next_page(json_data):
+    """Return the page number of the next link of a list response, if any.
+
+    :param json_data: decoded list response
+    :returns: the page parameter of the next link, or None on the last page
+    """
+    next_link = json_data.get("next")
+    if not next_link:
+        return None
+    params = urlparse.parse_qs(urlparse.urlparse(next_link).query)
+    return params.get("page", ["1"])[0]
+
+
+def _filter_value(value):
+    """Return a field value as the text a --filter value is compared to."""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def compile_filters(filters):
+    """Compile --filter expressions into a predicate on results.
+
+    A result matches a filter if its field equals the value, or if the
+    field is a list holding the value. Values other than strings are
+    compared in their JSON form, i.e. "true" or "22".
+
+    :param filters: list of (key, value) tuples
+    :returns: callable taking a result and returning True if it matches
+    """
+    if not filters:
+        return lambda result: True
+    checks = tuple(filters)
+
+    def matches(result):
+        for key, value in checks:
+            field = result.get(key)
+            if isinstance(field, list):
+                if value not in map(_filter_value, field):
+                    return False
+            elif field is None or _filter_value(field) != value:
+                return False
+        return True
+
+    return matches
+
+
+def project_fields(result, fields):
+    """Keep the given fields of a result, in the given order.
+
+    :param result: dictionary of a server object
+    :param fields: list of field names; fields the result lacks are skipped
+    :returns: dictionary with only the given fields
+    """
+    return {field: result[field] for field in fields if field in result}
+
+
+class CliListCommand(CliCommand):
+    """Base class for the commands listing paginated results.
+
+    Pages are shown one at a time, prompting before the next one. With
+    --all or --output ndjson, or when paging is off (see is_paging), every
+    page is fetched without prompting: the count and size of the first page
+    tell which pages remain, and they are fetched --jobs at a time with
+    run_concurrently. ndjson prints each page as it arrives; otherwise every
+    result is printed at once, in order.
+
+    When prompting, the next page is requested in the background while the
+    current one is printed, so it is ready once the user presses enter.
+
+    --filter expressions on a key of FILTER_PARAMS are sent as its query
+    parameter; the others, and --fields, are applied to each page as it
+    is received.
+
+    Sub-commands override _handle_results instead of
+    _handle_response_success.
+    """
+
+    # --filter keys the server filters on, and their query parameter
+    FILTER_PARAMS = {}
+
+    def __init__(self, subcommand, action, parser, req_method, req_path, success_codes):
+        """Create cli list command base object."""
+        # pylint: disable=too-many-arguments
+        CliCommand.__init__(
+            self, subcommand, action, parser, req_method, req_path, success_codes
+        )
+        self.parser.add_argument(
+            "--all",
+            dest="all_pages",
+            action="store_true",
+            help=_(messages.LIST_ALL_HELP),
+        )
+        self.parser.add_argument(
+            "--page-size",
+            dest="page_size",
+            type=validate_positive_int,
+            metavar="PAGE_SIZE",
+            help=_(messages.LIST_PAGE_SIZE_HELP),
+        )
+        self.parser.add_argument(
+            "--fields",
+            dest="fields",
+            type=validate_field_list,
+            metavar="FIELDS",
+            help=_(messages.LIST_FIELDS_HELP),
+        )
+        self.parser.add_argument(
+            "--filter",
+            dest="filters",
+            action="append",
+            type=validate_filter,
+            metavar="KEY=VALUE",
+            help=_(messages.LIST_FILTER_HELP),
+        )
+        self.result_filter = compile_filters(None)
+        self._add_output_argument()
+
+    def _handle_results(self, json_data):
+        """Sub-commands define this method to print a page of results."""
+
+    def _handle_response_success(self):
+        self._handle_results(self._select(self.response.json()))
+
+    def _fetches_all_pages(self):
+        """Check whether every page is fetched without prompting."""
+        return (
+            not is_paging()
+            or getattr(self.args, "all_pages", False)
+            or getattr(self.args, "output", OUTPUT_JSON) == OUTPUT_NDJSON
+        )
+
+    def _build_list_params(self):
+        """Add the page size and the server side filters to the parameters.
+
+        The page size is the one given with --page-size; when every page is
+        fetched from a server known to honor it, BULK_PAGE_SIZE saves
+        requests. The filters the server does not support are compiled
+        into self.result_filter.
+        """
+        params = dict(self.req_params or {})
+        page_size = getattr(self.args, "page_size", None)
+        if not page_size and self._fetches_all_pages():
+            if get_capability(CAPABILITY_PAGE_SIZE, False):
+                page_size = BULK_PAGE_SIZE
+        if page_size:
+            params[PAGE_SIZE_PARAM] = page_size
+        client_filters = []
+        for key, value in getattr(self.args, "filters", None) or []:
+            if key in self.FILTER_PARAMS:
+                params[self.FILTER_PARAMS[key]] = value
+            else:
+                client_filters.append((key, value))
+        self.req_params = params
+        self.result_filter = compile_filters(client_filters)
+
+    def _record_page_size(self, json_data):
+        """Record whether the server honored the page size of the first page.
+
+        Only a page holding fewer results than the count tells it, so no
+        request is sent just to find out.
+        """
+        page_size = (self.req_params or {}).get(PAGE_SIZE_PARAM)
+        results = json_data.get("results")
+        if page_size is None or results is None:
+            return
+        if json_data.get("count", 0) > int(page_size):
+            set_capability(CAPABILITY_PAGE_SIZE, len(results) == int(page_size))
+
+    def _select(self, json_data):
+        """Apply the client side filters and --fields to a page.
+
+        :param json_data: decoded page, or a single object
+        :returns: the page with the selected results and fields, counting
+            the selected results, as when every page is fetched
+        """
+        fields = getattr(self.args, "fields", None)
+        if "results" not in json_data:
+            return project_fields(json_data, fields) if fields else json_data
+        results = filter(self.result_filter, json_data["results"])
+        if fields:
+            results = (project_fields(result, fields) for result in results)
+        results = list(results)
+        return dict(json_data, count=len(results), results=results)
+
+    def _get_page(self, page):
+        """Request a page of results."""
+        return request(
+            method=self.req_method,
+            path=self.req_path,
+            params=dict(self.req_params or {}, page=page),
+            headers=self.req_headers,
+            parser=self.parser,
+            min_server_version=self.min_server_version,
+        )
+
+    def _check_page(self, response):
+        """Handle an unsuccessful page response, which exits."""
+        if response.status_code not in self.success_codes:
+            self.response = response
+            self._handle_response_error()
+            sys.exit(1)
+        return response.json()
+
+    def _iter_pages(self, json_data):
+        """Fetch the pages after the first one.
+
+        Only --jobs pages are requested at a time, so no more than that
+        many are held in memory.
+
+        :param json_data: decoded first page
+        :returns: iterator of every decoded page, the first one included
+        """
+        yield json_data
+        page_size = len(json_data.get("results", []))
+        if not json_data.get("next") or not page_size:
+            return
+        pages = math.ceil(json_data.get("count", 0) / page_size)
+        page_data = json_data
+        for first in range(2, pages + 1, get_jobs()):
+            chunk = range(first, min(first + get_jobs(), pages + 1))
+            for item in run_concurrently(self._get_page, chunk):
+                if item.error is not None:
+                    report_error(item.error)
+                page_data = self._check_page(item.result)
+                yield page_data
+        # the count may have grown since the first page
+        next_page = get_next_page(page_data)
+        while next_page is not None:
+            page_data = self._check_page(self._get_page(next_page))
+            yield page_data
+            next_page = get_next_page(page_data)
+
+    def _do_command(self):
+        """Execute the command flow for every page of results."""
+        self._build_req_params()
+        self._build_data()
+        self._build_list_params()
+        while True:
+            self.response = request(
+                method=self.req_method,
+                path=self.req_path,
+                params=self.req_params,
+                payload=self.req_payload,
+                headers=self.req_headers,
+                parser=self.parser,
+                min_server_version=self.min_server_version,
+            )
+            if not self._retry_stale_name(self.response):
+                break
+        if self.response.status_code in self.success_codes:
+            self._record_page_size(self.response.json())
+        while True:
+            # pylint: disable=no-member
+            if self.response.status_code not in self.success_codes:
+                self._handle_response_error()
+                return
+            json_data = self.response.json()
+            if getattr(self.args, "output", OUTPUT_JSON) == OUTPUT_NDJSON:
+                for page_data in self._iter_pages(json_data):
+                    self._handle_results(self._select(page_data))
+                return
+            if self._fetches_all_pages() and json_data.get("next"):
+                results = []
+                for page_data in self._iter_pages(json_data):
+                    results.extend(self._select(page_data)["results"])
+                self._handle_results(
+                    dict(json_data, count=len(results), next=None, results=results)
+                )
+                return
+            next_page = get_next_page(json_data)
+            if next_page is not None:
+                prefetch = get_executor().submit(self._get_page, next_page)
+            self._handle_results(self._select(json_data))
+            if next_page is None:
+                return
+            input(_(messages.NEXT_RESULTS))
+            self.response = prefetch.result()
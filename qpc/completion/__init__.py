@@ -0,0 +1,35 @@
+"""Constants for the completion commands."""
+
+from qpc import cred, scan, source
+
+SUBCOMMAND = "completion"
+BASH = "bash"
+ZSH = "zsh"
+REFRESH = "refresh"
+
+# minutes the cached names are used before the completion script refreshes
+# them in the background
+CACHE_TTL_MINUTES = 5
+
+# file in the cache directory touched when a refresh is started
+REFRESH_STAMP = "refreshed"
+
+# options that take resource names, by (subcommand, action, option), and
+# the kind of resource they name; the cache has a file of names per kind
+NAME_OPTIONS = {
+    (cred.SUBCOMMAND, cred.EDIT, "--name"): cred.SUBCOMMAND,
+    (cred.SUBCOMMAND, cred.SHOW, "--name"): cred.SUBCOMMAND,
+    (cred.SUBCOMMAND, cred.CLEAR, "--name"): cred.SUBCOMMAND,
+    (source.SUBCOMMAND, source.ADD, "--cred"): cred.SUBCOMMAND,
+    (source.SUBCOMMAND, source.EDIT, "--cred"): cred.SUBCOMMAND,
+    (source.SUBCOMMAND, source.EDIT, "--name"): source.SUBCOMMAND,
+    (source.SUBCOMMAND, source.SHOW, "--name"): source.SUBCOMMAND,
+    (source.SUBCOMMAND, source.CLEAR, "--name"): source.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.ADD, "--sources"): source.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.EDIT, "--sources"): source.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.START, "--name"): scan.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.SHOW, "--name"): scan.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.EDIT, "--name"): scan.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.CLEAR, "--name"): scan.SUBCOMMAND,
+    (scan.SUBCOMMAND, scan.JOB, "--name"): scan.SUBCOMMAND,
+}
@@ -0,0 +1,4 @@
+"""Commands for import organization."""
+
+from qpc.completion.refresh import CompletionRefreshCommand
+from qpc.completion.script import CompletionBashCommand, CompletionZshCommand
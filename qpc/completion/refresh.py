@@ -0,0 +1,65 @@
+"""CompletionRefreshCommand is used to cache the names completed by the shell."""
+
+import os
+import threading
+from logging import getLogger
+
+from qpc import api, completion, cred, scan, source, utils
+from qpc.clicommand import CliCommand
+
+logger = getLogger(__name__)
+
+# functions listing the objects of each kind of name
+LISTERS = {
+    cred.SUBCOMMAND: api.list_credentials,
+    source.SUBCOMMAND: api.list_sources,
+    scan.SUBCOMMAND: api.list_scans,
+}
+
+
+def write_names(kind, names):
+    """Replace the cached names of a kind of resource.
+
+    :param kind: kind of resource (i.e. "scan")
+    :param names: iterable of names
+    """
+    os.makedirs(utils.QPC_COMPLETION_CACHE, exist_ok=True)
+    path = os.path.join(utils.QPC_COMPLETION_CACHE, kind)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as names_file:
+        names_file.writelines(f"{name}\n" for name in names)
+    os.replace(tmp_path, path)
+
+
+# pylint: disable=too-few-public-methods
+class CompletionRefreshCommand(CliCommand):
+    """Defines the completion refresh command.
+
+    This command caches the names of the credentials, sources and scans
+    for the completion scripts, which run it in the background.
+    """
+
+    SUBCOMMAND = completion.SUBCOMMAND
+    ACTION = completion.REFRESH
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.ACTION),
+            None,
+            None,
+            [],
+        )
+
+    def _do_command(self):
+        """Fetch the names of every kind of resource and cache them."""
+        for kind, lister in LISTERS.items():
+            names = sorted({entry["name"] for entry in lister()})
+            try:
+                write_names(kind, names)
+            except OSError as error:
+                logger.debug("Could not cache %s names: %s", kind, error)
@@ -0,0 +1,216 @@
+"""Commands printing the shell completion scripts of qpc.
+
+The scripts are generated from the parsers of every command. Resource
+names are read from the cache written by "qpc completion refresh"; when
+it is older than CACHE_TTL_MINUTES the script starts a refresh in the
+background and completes with the names it has, so completion never
+waits for the server.
+"""
+
+import shlex
+
+from qpc import completion, utils
+from qpc.cli import CLI, COMMANDS
+from qpc.clicommand import CliCommand
+from qpc.release import PKG_NAME
+
+BASH_SCRIPT = """\
+# bash completion for @PKG_NAME@, generated by "@PKG_NAME@ completion bash"
+
+_@PKG_NAME@_names() {
+    local dir=@CACHE_DIR@
+    if [ -z "$(find "$dir/@STAMP@" -mmin -@TTL@ 2>/dev/null)" ]; then
+        mkdir -p "$dir" && touch "$dir/@STAMP@"
+        (@PKG_NAME@ completion refresh >/dev/null 2>&1 &)
+    fi
+    cat "$dir/$1" 2>/dev/null
+}
+
+_@PKG_NAME@_words() {
+    case "$1" in
+@WORDS@
+    esac
+}
+
+_@PKG_NAME@_takes_value() {
+    case "$1" in
+@TAKES_VALUE@
+        *) return 1 ;;
+    esac
+}
+
+_@PKG_NAME@_multiple_values() {
+    case "$1" in
+@MULTIPLE_VALUES@
+        *) return 1 ;;
+    esac
+}
+
+_@PKG_NAME@_values() {
+    case "$1" in
+@VALUES@
+    esac
+}
+
+_@PKG_NAME@_complete() {
+    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"
+    local key="" actions=0 option="" word i
+    local IFS=$'\\n'
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        word="${COMP_WORDS[i]}"
+        case "$word" in
+            @GLOBAL_VALUE_OPTIONS@) [ -z "$key" ] && ((i++)) ;;
+            -*) option="$word" ;;
+            *)
+                if [ -z "$key" ]; then
+                    key="$word"
+                    case "$key" in @ACTIONLESS@) ;; *) actions=1 ;; esac
+                elif [ "$actions" = 1 ]; then
+                    key="$key $word"
+                    actions=0
+                fi
+                ;;
+        esac
+    done
+    if [[ "$cur" != -* ]] && [ -n "$option" ] &&
+        _@PKG_NAME@_takes_value "$key $option"; then
+        if [ "$prev" = "$option" ] ||
+            _@PKG_NAME@_multiple_values "$key $option"; then
+            COMPREPLY=($(compgen -W "$(_@PKG_NAME@_values "$key $option")" \\
+                -- "$cur"))
+            return
+        fi
+    fi
+    COMPREPLY=($(compgen -W "$(_@PKG_NAME@_words "$key")" -- "$cur"))
+}
+
+complete -o default -F _@PKG_NAME@_complete @PKG_NAME@
+"""
+
+ZSH_PREAMBLE = """\
+# zsh completion for @PKG_NAME@, generated by "@PKG_NAME@ completion zsh"
+autoload -U +X bashcompinit && bashcompinit
+
+"""
+
+
+def _case(patterns, command):
+    """Return a branch of a shell case statement."""
+    return f"        {'|'.join(shlex.quote(p) for p in patterns)}) {command} ;;"
+
+
+def _print_words(words):
+    """Return a shell command printing words, one per line."""
+    return "printf '%s\\n' " + " ".join(shlex.quote(word) for word in words)
+
+
+def _options(parser):
+    """List the options of a parser, as argparse actions."""
+    # pylint: disable=protected-access
+    return [action for action in parser._actions if action.option_strings]
+
+
+def generate_bash_script():
+    """Generate the bash completion script from the parsers of every command.
+
+    :returns: the script, as a string
+    """
+    cli = CLI(name=PKG_NAME)
+    cli.add_all_commands()
+    words = {"": []}
+    takes_value, multiple_values, values = [], [], []
+    global_value_options = []
+    for option in _options(cli.parser):
+        words[""].extend(option.option_strings)
+        if option.nargs != 0:
+            global_value_options.extend(option.option_strings)
+    for subcommand, action in COMMANDS:
+        if subcommand not in words[""]:
+            words[""].append(subcommand)
+        if action is None:
+            key = subcommand
+        else:
+            words.setdefault(subcommand, []).append(action)
+            key = f"{subcommand} {action}"
+        words[key] = []
+        for option in _options(cli.command_parser(subcommand, action)):
+            words[key].extend(option.option_strings)
+            if option.nargs == 0:
+                continue
+            patterns = [f"{key} {string}" for string in option.option_strings]
+            takes_value.append(_case(patterns, "return 0"))
+            if option.nargs in ("+", "*"):
+                multiple_values.append(_case(patterns, "return 0"))
+            kind = completion.NAME_OPTIONS.get(
+                (subcommand, action, option.option_strings[-1])
+            )
+            if kind:
+                values.append(_case(patterns, f"_{PKG_NAME}_names {kind}"))
+            elif option.choices:
+                values.append(_case(patterns, _print_words(option.choices)))
+    actionless = [subcommand for subcommand, action in COMMANDS if action is None]
+    replacements = {
+        "@CACHE_DIR@": shlex.quote(utils.QPC_COMPLETION_CACHE),
+        "@STAMP@": completion.REFRESH_STAMP,
+        "@TTL@": str(completion.CACHE_TTL_MINUTES),
+        "@WORDS@": "\n".join(
+            _case([key], _print_words(key_words)) for key, key_words in words.items()
+        ),
+        "@TAKES_VALUE@": "\n".join(takes_value),
+        "@MULTIPLE_VALUES@": "\n".join(multiple_values),
+        "@VALUES@": "\n".join(values),
+        "@GLOBAL_VALUE_OPTIONS@": "|".join(global_value_options),
+        "@ACTIONLESS@": "|".join(actionless),
+        "@PKG_NAME@": PKG_NAME,
+    }
+    script = BASH_SCRIPT
+    for placeholder, text in replacements.items():
+        script = script.replace(placeholder, text)
+    return script
+
+
+# pylint: disable=too-few-public-methods
+class CompletionBashCommand(CliCommand):
+    """Defines the completion bash command.
+
+    This command prints the bash completion script of qpc.
+    """
+
+    SUBCOMMAND = completion.SUBCOMMAND
+    ACTION = completion.BASH
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.ACTION),
+            None,
+            None,
+            [],
+        )
+
+    def _script(self):
+        """Return the completion script."""
+        return generate_bash_script()
+
+    def _do_command(self):
+        """Print the completion script."""
+        print(self._script(), end="")
+
+
+# pylint: disable=too-few-public-methods
+class CompletionZshCommand(CompletionBashCommand):
+    """Defines the completion zsh command.
+
+    This command prints the zsh completion script of qpc, which loads the
+    bash one with bashcompinit.
+    """
+
+    ACTION = completion.ZSH
+
+    def _script(self):
+        """Return the completion script."""
+        return ZSH_PREAMBLE.replace("@PKG_NAME@", PKG_NAME) + generate_bash_script()
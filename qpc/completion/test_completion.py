@@ -0,0 +1,99 @@
+"""Test the completion commands."""
+
+import os
+import shutil
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+
+import pytest
+
+from qpc import completion, utils
+from qpc.completion.refresh import CompletionRefreshCommand
+from qpc.completion.script import generate_bash_script
+from qpc.cred import CREDENTIAL_URI
+from qpc.scan import SCAN_URI
+from qpc.source import SOURCE_URI
+
+PARSER = ArgumentParser()
+SUBPARSER = PARSER.add_subparsers(dest="subcommand")
+
+needs_bash = pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+
+
+def complete(script_path, *words):
+    """Complete the last of words with the generated script, in bash."""
+    command = (
+        f'source "{script_path}"; COMP_WORDS=("$@"); COMP_CWORD=$(($# - 1));'
+        ' _qpc_complete; printf "%s\\n" "${COMPREPLY[@]}"'
+    )
+    output = subprocess.run(
+        ["bash", "-c", command, "bash", "qpc", *words],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return output.split()
+
+
+@pytest.fixture
+def script_path(tmp_path):
+    """Write the bash script and fresh cached names; return the script path."""
+    os.makedirs(utils.QPC_COMPLETION_CACHE)
+    with open(os.path.join(utils.QPC_COMPLETION_CACHE, "scan"), "w") as names:
+        names.write("nightly\nweekly\n")
+    stamp = os.path.join(utils.QPC_COMPLETION_CACHE, completion.REFRESH_STAMP)
+    open(stamp, "w").close()  # pylint: disable=consider-using-with
+    path = tmp_path / "qpc.bash"
+    path.write_text(generate_bash_script())
+    return path
+
+
+@needs_bash
+@pytest.mark.parametrize(
+    "words,expected",
+    (
+        (["sc"], ["scan"]),
+        (["scan", "st"], ["start"]),
+        (["scan", "start", "--n"], ["--name"]),
+        (["scan", "start", "--name", ""], ["nightly", "weekly"]),
+        (["--jobs", "2", "scan", "show", "--name", "w"], ["weekly"]),
+        (["cred", "list", "--type", "v"], ["vcenter"]),
+        (["batch", "--par"], ["--parallel"]),
+    ),
+)
+def test_bash_completion(script_path, words, expected):
+    """Commands, options, choices and cached names are completed."""
+    assert complete(script_path, *words) == expected
+
+
+def test_refresh_writes_names(server_config, requests_mock):
+    """Refresh caches the names of every kind of resource, sorted."""
+    location = utils.get_server_location()
+    for path, names in (
+        (CREDENTIAL_URI, ["cred b", "cred a"]),
+        (SOURCE_URI, ["source"]),
+        (SCAN_URI, []),
+    ):
+        requests_mock.get(
+            location + path, json={"results": [{"name": name} for name in names]}
+        )
+    CompletionRefreshCommand(SUBPARSER).main(Namespace())
+    for kind, content in (("cred", "cred a\ncred b\n"), ("source", "source\n")):
+        with open(os.path.join(utils.QPC_COMPLETION_CACHE, kind)) as names:
+            assert names.read() == content
+    assert os.path.getsize(os.path.join(utils.QPC_COMPLETION_CACHE, "scan")) == 0
+
+
+def test_script_needs_no_server(tmp_path):
+    """The script is printed without a server config, and is valid bash."""
+    env = dict(os.environ, HOME=str(tmp_path), QPC_NO_AGENT="1")
+    result = subprocess.run(
+        [sys.executable, "-m", "qpc", "completion", "zsh"],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    assert "bashcompinit" in result.stdout
+    assert "complete -o default -F _qpc_complete qpc" in result.stdout
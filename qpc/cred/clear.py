@@ -7,8 +7,8 @@ from requests import codes
 
 import qpc.cred as credential
 from qpc import messages
-from qpc.clicommand import CliCommand
-from qpc.request import DELETE, GET, request
+from qpc.clicommand import CliCommand, find_by_name
+from qpc.request import DELETE, GET, request, run_concurrently
 from qpc.translation import _
 from qpc.utils import handle_error_response
 
@@ -48,14 +48,14 @@ class CredClearCommand(CliCommand):
             help=_(messages.CRED_CLEAR_ALL_HELP),
         )
 
-    def _build_req_params(self):
-        if self.args.name:
-            self.req_params = {"name": self.args.name}
+    def _request_delete(self, credential_entry):
+        delete_uri = credential.CREDENTIAL_URI + str(credential_entry["id"]) + "/"
+        return request(DELETE, delete_uri, parser=self.parser)
 
-    def _delete_entry(self, credential_entry, print_out=True):
+    def _delete_entry(self, credential_entry, print_out=True, response=None):
         deleted = False
-        delete_uri = credential.CREDENTIAL_URI + str(credential_entry["id"]) + "/"
-        response = request(DELETE, delete_uri, parser=self.parser)
+        if response is None:
+            response = self._request_delete(credential_entry)
         name = credential_entry["name"]
         # pylint: disable=no-member
         if response.status_code == codes.no_content:
@@ -68,18 +68,31 @@ class CredClearCommand(CliCommand):
                 logger.error(_(messages.CRED_FAILED_TO_REMOVE), name)
         return deleted
 
+    def _clear_named(self):
+        """Delete the credential named with --name.
+
+        The credential is looked up on the server, never in the name cache,
+        so one renamed or replaced since the name was cached is not deleted.
+        """
+        entry = find_by_name(
+            self.parser, credential.CREDENTIAL_URI, self.args.name, sole=True
+        )
+        if entry is None:
+            logger.error(_(messages.CRED_NOT_FOUND), self.args.name)
+            sys.exit(1)
+        if self._delete_entry(entry) is False:
+            sys.exit(1)
+
+    def _do_command(self):
+        if self.args.name:
+            self._clear_named()
+        else:
+            CliCommand._do_command(self)
+
     def _handle_response_success(self):
         json_data = self.response.json()
         count = json_data.get("count", 0)
-        if self.args.name and count == 0:
-            logger.error(_(messages.CRED_NOT_FOUND), self.args.name)
-            sys.exit(1)
-        elif self.args.name and count == 1:
-            # delete single credential
-            entry = json_data.get("results")[0]
-            if self._delete_entry(entry) is False:
-                sys.exit(1)
-        elif count == 0:
+        if count == 0:
             logger.error(_(messages.CRED_NO_CREDS_TO_REMOVE))
             sys.exit(1)
         else:
@@ -87,8 +100,12 @@ class CredClearCommand(CliCommand):
             remove_error = []
             next_link = json_data.get("next")
             results = json_data.get("results")
-            for entry in results:
-                if self._delete_entry(entry, print_out=False) is False:
+            deletions = run_concurrently(self._request_delete, results)
+            for entry, response, error in deletions:
+                if error is not None:
+                    logger.error(error)
+                    remove_error.append(entry["name"])
+                elif not self._delete_entry(entry, print_out=False, response=response):
                     remove_error.append(entry["name"])
             if remove_error:
                 cred_err = ",".join(remove_error)
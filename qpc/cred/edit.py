@@ -9,7 +9,7 @@ import qpc.cred as credential
 from qpc import messages
 from qpc.clicommand import CliCommand
 from qpc.cred.utils import build_credential_payload
-from qpc.request import GET, PATCH, request
+from qpc.request import PATCH
 from qpc.translation import _
 
 logger = getLogger(__name__)
@@ -116,26 +116,13 @@ class CredEditCommand(CliCommand):
             sys.exit(1)
 
         # check for existence of credential
-        response = request(
-            parser=self.parser,
-            method=GET,
-            path=credential.CREDENTIAL_URI,
-            params={"name": self.args.name},
-            payload=None,
+        cred_entry = self._resolve_name(
+            credential.CREDENTIAL_URI, self.args.name, sole=True
         )
-        if response.status_code == codes.ok:  # pylint: disable=no-member
-            json_data = response.json()
-            count = json_data.get("count", 0)
-            if count == 1:
-                cred_entry = json_data.get("results")[0]
-                self.cred_type = cred_entry["cred_type"]
-                self.req_path = self.req_path + str(cred_entry["id"]) + "/"
-            else:
-                logger.error(_(messages.CRED_DOES_NOT_EXIST), self.args.name)
-                sys.exit(1)
-        else:
+        if cred_entry is None:
             logger.error(_(messages.CRED_DOES_NOT_EXIST), self.args.name)
             sys.exit(1)
+        self.cred_type = cred_entry["cred_type"]
 
     def _build_data(self):
         """Construct the dictionary credential given our arguments.
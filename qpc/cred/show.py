@@ -10,7 +10,6 @@ from qpc import messages
 from qpc.clicommand import CliCommand
 from qpc.request import GET
 from qpc.translation import _
-from qpc.utils import pretty_print
 
 logger = getLogger(__name__)
 
@@ -45,6 +44,7 @@ class CredShowCommand(CliCommand):
             help=_(messages.CRED_NAME_HELP),
             required=True,
         )
+        self._add_output_argument()
 
     def _build_req_params(self):
         self.req_params = {"name": self.args.name}
@@ -54,8 +54,7 @@ class CredShowCommand(CliCommand):
         count = json_data.get("count", 0)
         if count == 1:
             cred_entry = json_data.get("results")[0]
-            data = pretty_print(cred_entry)
-            print(data)
+            self._print_json(cred_entry)
         else:
             logger.error(_(messages.CRED_DOES_NOT_EXIST), self.args.name)
             sys.exit(1)
@@ -8,3 +8,45 @@ class QPCError(Exception):
         """Take message as mandatory attribute."""
         super().__init__(message, *args)
         self.message = message
+
+
+class QPCConnectionError(QPCError):
+    """The server is not configured or could not be reached."""
+
+
+class QPCServerVersionError(QPCError):
+    """The server is older than the operation requires."""
+
+
+class QPCResponseError(QPCError):
+    """Base class of the errors answered by the server."""
+
+    def __init__(self, message, response, *args):
+        """Keep the response, i.e. to report the errors it lists."""
+        super().__init__(message, *args)
+        self.response = response
+        self.status_code = response.status_code
+
+
+class QPCAuthenticationError(QPCResponseError):
+    """The client token is missing, invalid or expired."""
+
+
+class QPCServerError(QPCResponseError):
+    """The server failed with an internal error."""
+
+
+class QPCRequestError(QPCResponseError):
+    """The server did not answer a request with the expected status."""
+
+
+class QPCNotFoundError(QPCError):
+    """No object with the given name exists on the server."""
+
+
+class QPCOfflineError(QPCError):
+    """A request can not be answered from the mirror in offline mode."""
+
+
+class QPCTimeoutError(QPCError):
+    """An operation did not finish in the given time."""
@@ -0,0 +1,115 @@
+"""Run a qpc command against many server profiles at the same time.
+
+The command runs once per profile, each in its own qpc process started
+with "--server PROFILE", so the profiles share no configuration, token or
+connection. Their output is written in the order the profiles were given,
+every line prefixed with the profile name, followed by the exit code and
+time of every profile on stderr.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from qpc import agent, messages
+from qpc.translation import _
+from qpc.utils import NO_PAGING_ENV, list_server_profiles, logger
+
+SERVERS_OPTION = "--servers"
+ALL_SERVERS_OPTION = "--all-servers"
+
+
+def strip_servers_options(argv):
+    """Remove the options selecting many servers from a command line.
+
+    :param argv: command line arguments, without the program name
+    :returns: the arguments without --servers and --all-servers
+    """
+    stripped = []
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument == SERVERS_OPTION:
+            next(arguments, None)
+        elif argument != ALL_SERVERS_OPTION and not argument.startswith(
+            f"{SERVERS_OPTION}="
+        ):
+            stripped.append(argument)
+    return stripped
+
+
+def select_profiles(servers, all_servers):
+    """Return the server profiles a command runs against.
+
+    :param servers: list of profile names given with --servers, or None
+    :param all_servers: True if --all-servers was given
+    :returns: list of profile names; exits if one is not configured
+    """
+    configured = list_server_profiles()
+    if all_servers:
+        if not configured:
+            logger.error(_(messages.SERVER_PROFILES_NONE))
+            sys.exit(1)
+        return configured
+    for profile in servers:
+        if profile not in configured:
+            logger.error(_(messages.SERVER_PROFILE_NOT_FOUND), profile)
+            sys.exit(1)
+    return servers
+
+
+def _tag(profile, text):
+    """Prefix every line of text with the profile name."""
+    return "".join(f"{profile}: {line}\n" for line in text.splitlines())
+
+
+def run_on_server(profile, argv):
+    """Run a command line against one server profile, in a new process.
+
+    The process runs the command itself rather than in the agent, which
+    would run the profiles one at a time. As its stdin is closed, list
+    commands print every page, as with --all, instead of prompting.
+
+    :param profile: profile name
+    :param argv: command line arguments, without the program name
+    :returns: tuple of exit code, stdout, stderr and seconds taken
+    """
+    env = dict(os.environ, **{agent.NO_AGENT_ENV: "1", NO_PAGING_ENV: "1"})
+    start = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-m", "qpc", "--server", profile] + list(argv),
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    return result.returncode, result.stdout, result.stderr, time.monotonic() - start
+
+
+def run_on_servers(profiles, argv):
+    """Run a command line against many server profiles at the same time.
+
+    :param profiles: list of profile names
+    :param argv: command line arguments, without the program name; the
+        options selecting many servers are removed
+    :returns: 0 if the command succeeded for every profile, 1 otherwise
+    """
+    argv = strip_servers_options(argv)
+    summaries = []
+    with ThreadPoolExecutor(max_workers=len(profiles)) as executor:
+        futures = [
+            executor.submit(run_on_server, profile, argv) for profile in profiles
+        ]
+        for profile, future in zip(profiles, futures):
+            exit_code, stdout, stderr, seconds = future.result()
+            sys.stdout.write(_tag(profile, stdout))
+            sys.stdout.flush()
+            sys.stderr.write(_tag(profile, stderr))
+            summaries.append(
+                {"server": profile, "exit_code": exit_code, "seconds": seconds}
+            )
+    for summary in summaries:
+        print(_(messages.SERVERS_SUMMARY) % summary, file=sys.stderr)
+    return 1 if any(summary["exit_code"] for summary in summaries) else 0
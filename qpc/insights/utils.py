@@ -1,16 +1,12 @@
 """Utilities for the insights module."""
 
-
 import re
 from argparse import ArgumentTypeError
-
-# pylint: disable=no-name-in-module,import-error
-from distutils.version import LooseVersion  # noqa:I202
 from getpass import getpass
 
 from qpc import messages
 from qpc.translation import _
-from qpc.utils import check_if_prompt_is_not_empty
+from qpc.utils import check_if_prompt_is_not_empty, parse_version
 
 
 class InsightsCommands:
@@ -88,7 +84,7 @@ def check_insights_version(streamdata, required_client, required_core):
     for stream_type in required_types:
         stream_version = stream_info[stream_type]
         requirement = required_client if stream_type == "client" else required_core
-        if LooseVersion(stream_version) < LooseVersion(requirement):
+        if parse_version(stream_version) < parse_version(requirement):
             check[stream_type] = stream_version
             check["results"] = False
     return check
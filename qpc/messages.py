@@ -260,6 +260,10 @@ REPORT_SUCCESSFULLY_MERGED = (
 REPORT_UPLOAD_VALIDATE_JSON = "Checking file for valid JSON details report. %s"
 REPORT_UPLOAD_FILE_INVALID_JSON = "Failed: %s is not a JSON details report."
 REPORT_UPLOAD_JSON_FILE_HELP = "The path to the details report JSON file."
+REPORT_COMPRESS_HELP = (
+    "Send the details reports gzip-encoded to reduce upload time. "
+    "Enabled by default with 'server config --compress-requests'."
+)
 REPORT_UPLOAD_VALIDATE_JSON = "Checking %s for valid JSON details report."
 REPORT_SUCCESSFULLY_UPLOADED = (
     "Report uploaded. Job %(id)s created. "
@@ -276,8 +280,48 @@ DISABLE_OPT_PRODUCTS_HELP = (
 )
 
 VERBOSITY_HELP = "Verbose mode. Use up to -vvvv for more verbosity."
+JOBS_HELP = (
+    "Maximum number of requests sent to the server at the same time"
+    " by commands that act on many items; the default is 1."
+)
+NO_CACHE_HELP = "Neither use nor update the cache of server responses."
+OFFLINE_HELP = (
+    'Answer from the mirror written by "qpc sync" and never contact the'
+    " server; commands the mirror can not answer fail."
+)
+MAX_STALENESS_HELP = (
+    'Answer from the mirror written by "qpc sync" if it was synced at most'
+    " SECONDS ago, and from the server otherwise."
+)
+SERVER_PROFILE_HELP = (
+    "Name of the server profile to use. Each profile has its own server"
+    " configuration and login; the default profile is used if not given."
+)
+SERVERS_HELP = (
+    "Comma separated names of the server profiles to run the command against,"
+    " at the same time."
+)
+ALL_SERVERS_HELP = (
+    "Run the command against every configured server profile, at the same time."
+)
+SERVER_PROFILE_INVALID = (
+    '"%s" is not a valid server profile name. Use letters, digits, ".", "_" and "-".'
+)
+SERVER_PROFILE_NOT_FOUND = 'Server profile "%s" is not configured.'
+SERVER_PROFILES_NONE = "No server profile is configured."
+SERVERS_SUMMARY = "%(server)s: exit code %(exit_code)s in %(seconds).3f seconds"
 
 
+REQUEST_RETRY = (
+    "Retrying %(method)s %(url)s in %(delay).1f seconds "
+    "(retry %(retry)d of %(retries)d): %(reason)s"
+)
+REQUEST_RETRY_BUDGET_EXHAUSTED = (
+    "Not retrying %(method)s %(url)s: the retry budget of this command is spent."
+)
+REQUEST_COMPRESSION_REJECTED = (
+    "The server does not accept compressed requests; sending %s uncompressed."
+)
 CONNECTION_ERROR_MSG = (
     "A connection error occurred while attempting to "
     "communicate with the server. The server has been "
@@ -322,6 +366,32 @@ SERVER_CONFIG_PORT_HELP = "Port number for the server; the default is 9443."
 SERVER_CONFIG_SSL_CERT_HELP = (
     "File path to the SSL certificate to use for verification."
 )
+SERVER_CONFIG_POOL_SIZE_HELP = (
+    "Maximum number of connections kept open to the server; the default is 10."
+)
+VALUE_NOT_POSITIVE_INT = "Value %s should be a positive integer"
+VALUE_NOT_NON_NEGATIVE_INT = "Value %s should be a non-negative integer"
+SERVER_CONFIG_DISABLE_KEEP_ALIVE_HELP = (
+    "Close the connection to the server after each request."
+)
+SERVER_CONFIG_RETRIES_HELP = (
+    "Number of times a GET, PUT or DELETE request is retried when the "
+    "server is unavailable; the default is 3."
+)
+SERVER_CONFIG_RETRY_BUDGET_HELP = (
+    "Maximum number of retries for a single command; the default is 30."
+)
+SERVER_CONFIG_COMPRESS_REQUESTS_HELP = (
+    "Send the reports uploaded or merged from files gzip-encoded by default."
+)
+SERVER_CONFIG_CACHE_MAX_SIZE_HELP = (
+    "Maximum size in bytes of the cache of server responses; the default is "
+    "10485760. Use 0 to disable the cache."
+)
+SERVER_CONFIG_CACHE_MAX_AGE_HELP = (
+    "Number of seconds a cached server response is kept without being used; "
+    "the default is 86400. Use 0 to disable the cache."
+)
 SERVER_CONFIG_SUCCESS = (
     "Server connectivity was successfully configured. "
     'The server will be contacted via "%(protocol)s" at host "%(host)s"'
@@ -348,7 +418,81 @@ LOGIN_SUCCESS = "Login successful."
 
 LOGOUT_SUCCESS = "Logged out."
 
+AGENT_START_FOREGROUND_HELP = (
+    "Serve commands from this process instead of starting it in the background."
+)
+AGENT_STARTED = "Agent started with pid %s."
+AGENT_START_FAILED = "The agent did not start. See %s for details."
+AGENT_ALREADY_RUNNING = "An agent is already running with pid %s."
+AGENT_NOT_RUNNING = "No agent is running."
+AGENT_STOPPED = "Agent with pid %s stopped."
+AGENT_STATUS = (
+    "Agent is running with pid %(pid)s and has run %(commands)s commands"
+    " since %(started)s."
+)
+AGENT_CONNECTION_LOST = "Lost the connection to the agent."
+
+BATCH_FILE_HELP = (
+    "File with one qpc command line per line; blank lines and lines starting"
+    ' with "#" are skipped. Use "-", the default, to read standard input.'
+)
+BATCH_PARALLEL_HELP = (
+    "Number of command lines run at the same time in this process; the default"
+    " is 1. The output of each line is printed once it is done, in the order of"
+    " the file."
+)
+BATCH_STATUS_FILE_HELP = (
+    "File the exit status of every line is written to, as JSON. By default it"
+    " is printed after the output of the commands."
+)
+BATCH_INVALID_LINE = "Line %(line)s could not be parsed: %(error)s"
+BATCH_NESTED_COMMAND = "Line %(line)s: %(subcommand)s commands can not be batched."
+BATCH_GLOBAL_OPTIONS = (
+    "Line %(line)s: options for all commands, such as -v or --server, must be"
+    " given before batch."
+)
+BATCH_STATUS_WRITTEN = "Batch status written to %s."
+
+API_REQUEST_FAILED = (
+    "The server answered %(method)s %(path)s with status %(status)s: %(details)s"
+)
+API_JOB_TIMEOUT = (
+    'Scan job %(job_id)s did not finish in %(timeout)s seconds; it is "%(status)s".'
+)
+
 NEXT_RESULTS = "Press enter to see the next set of results."
+MIRROR_OFFLINE_UNAVAILABLE = (
+    'The request to %s can not be answered offline. Run "qpc sync" to mirror'
+    " credentials, sources, scans and scan jobs."
+)
+SYNC_SUMMARY = (
+    "%(kind)s: %(count)s mirrored, %(changed)s new or changed, %(removed)s removed."
+)
+SYNC_DONE = "Server inventory mirrored in %s."
+OUTPUT_FORMAT_HELP = (
+    'Output format. "json" prints each page as an indented JSON list;'
+    ' "ndjson" prints one compact JSON object per line, as each page'
+    " arrives, and fetches every page without prompting."
+)
+LIST_PAGE_SIZE_HELP = (
+    "Number of results per page. Defaults to the page size of the server."
+)
+LIST_FIELDS_HELP = (
+    "Comma separated list of the fields to print for each result, for"
+    ' example "id,name".'
+)
+LIST_FIELDS_INVALID = '"%s" does not name any field.'
+LIST_FILTER_HELP = (
+    "Only list the results whose KEY field equals VALUE. May be repeated;"
+    " results must match every filter. Filters the server supports are"
+    " sent with the request, the others are applied to each result."
+)
+LIST_FILTER_INVALID = '"%s" is not a KEY=VALUE filter.'
+LIST_ALL_HELP = (
+    "Print the results of every page as a single list instead of prompting"
+    " for the next page. Pages are fetched with up to --jobs requests at a"
+    " time."
+)
 BAD_INSIGHTS_INSTALL = (
     "Insights installation check failed. Checked if "
     'Insights was installed and configured with command "%s"'
@@ -418,6 +562,8 @@ DOWNLOAD_PATH_HELP = (
 )
 DOWNLOAD_SUCCESSFULLY_WRITTEN = "Report %(report)s successfully written to %(path)s."
 DOWNLOAD_SJ_DOES_NOT_EXIST = "Scan Job %s does not exist."
+DOWNLOAD_PROGRESS = "%d bytes downloaded"
+DOWNLOAD_PROGRESS_HELP = "Show the number of bytes downloaded while writing the file."
 
 SERVER_TOO_OLD_FOR_CLI = (
     "The CLI requires a minimum server version of %(min_version)s.  "
@@ -0,0 +1,381 @@
+"""Local SQLite mirror of the credentials, sources, scans and scan jobs.
+
+"qpc sync" copies these objects from the server into a database under the
+qpc data directory, one database per server profile and server location;
+configuring the server of a profile drops its databases. With the
+--offline or --max-staleness options, GET requests the mirror can answer
+(the list and detail paths of these objects, filtered on their name, type
+or status) are answered from it the way the server would, without a
+request.
+
+Later syncs are incremental: list pages the server did not change are
+revalidated through the response cache (see qpc.cache), only objects whose
+content changed are written, and scan jobs are only fetched again for the
+scans that changed, as a scan embeds its most recent job.
+
+Requests qpc sends to change one of these objects mark its kind as not
+synced, so the mirror never answers with data older than the change.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from contextlib import closing, contextmanager
+from http import HTTPStatus
+from logging import getLogger
+
+from qpc import cred, messages, scan, source, utils
+from qpc.exceptions import QPCOfflineError
+from qpc.translation import _
+
+logger = getLogger(__name__)
+
+CREDENTIAL = "credential"
+SOURCE = "source"
+SCAN = "scan"
+SCAN_JOB = "scan_job"
+
+# field of each kind of object kept in the type column
+TYPE_FIELDS = {
+    CREDENTIAL: "cred_type",
+    SOURCE: "source_type",
+    SCAN: "scan_type",
+    SCAN_JOB: "scan_type",
+}
+
+# list paths answered from the mirror: kind of object, and the query
+# parameters that can be answered with the column they filter on
+LIST_PATHS = {
+    cred.CREDENTIAL_URI: (CREDENTIAL, {"name": "name", "cred_type": "type"}),
+    source.SOURCE_URI: (SOURCE, {"name": "name", "source_type": "type"}),
+    scan.SCAN_URI: (SCAN, {"name": "name", "scan_type": "type"}),
+}
+SCAN_JOBS_PARAMS = {"status": "status"}
+
+# paging parameters; the mirror answers with a single page
+PAGE_PARAMS = ("page", "page_size")
+
+DETAIL_PATH = re.compile(
+    r"^(?P<base>/api/v1/(credentials|sources|scans|jobs)/)(?P<id>\d+)/?"
+    r"(?P<jobs>jobs/)?$"
+)
+DETAIL_KINDS = {
+    cred.CREDENTIAL_URI: CREDENTIAL,
+    source.SOURCE_URI: SOURCE,
+    scan.SCAN_URI: SCAN,
+    scan.SCAN_JOB_URI: SCAN_JOB,
+}
+
+# kinds of object changed by a request to a path starting with the key
+CHANGED_KINDS = {
+    cred.CREDENTIAL_URI: (CREDENTIAL,),
+    source.SOURCE_URI: (SOURCE,),
+    scan.SCAN_URI: (SCAN, SCAN_JOB),
+    scan.SCAN_JOB_URI: (SCAN, SCAN_JOB),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT,
+    type TEXT,
+    status TEXT,
+    parent_id INTEGER,
+    digest TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS objects_name ON objects (kind, name);
+CREATE INDEX IF NOT EXISTS objects_type ON objects (kind, type);
+CREATE INDEX IF NOT EXISTS objects_status ON objects (kind, status);
+CREATE INDEX IF NOT EXISTS objects_parent ON objects (kind, parent_id);
+CREATE TABLE IF NOT EXISTS syncs (
+    kind TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+"""
+
+# set by the --offline and --max-staleness options
+_offline = False
+_max_staleness = None
+
+
+def set_mirror_mode(offline=False, max_staleness=None):
+    """Choose when requests are answered from the mirror.
+
+    :param offline: True to answer from the mirror however old it is,
+        and fail the requests it can not answer
+    :param max_staleness: answer from the mirror if it was synced at most
+        this many seconds ago; None to always ask the server
+    """
+    global _offline, _max_staleness  # pylint: disable=global-statement
+    _offline = offline
+    _max_staleness = max_staleness
+
+
+def is_enabled():
+    """Check whether GET requests may be answered from the mirror."""
+    return _offline or _max_staleness is not None
+
+
+def is_offline():
+    """Check whether requests must be answered from the mirror only."""
+    return _offline
+
+
+@contextmanager
+def mirror_disabled():
+    """Send every request to the server while in this context, i.e. to sync."""
+    mode = (_offline, _max_staleness)
+    set_mirror_mode()
+    try:
+        yield
+    finally:
+        set_mirror_mode(*mode)
+
+
+def _get_profile_dir():
+    """Return the directory of the databases of the current server profile."""
+    return os.path.join(utils.QPC_MIRROR_DIR, utils.get_server_profile())
+
+
+def get_mirror_path():
+    """Return the database file of the current server profile and location."""
+    location = utils.get_server_location() or ""
+    digest = hashlib.sha256(location.encode("utf-8")).hexdigest()
+    return os.path.join(_get_profile_dir(), f"{digest}.sqlite3")
+
+
+def clear():
+    """Drop the databases of the current server profile."""
+    try:
+        shutil.rmtree(_get_profile_dir())
+    except FileNotFoundError:
+        pass
+    except OSError as error:
+        logger.debug("Could not clear the mirror: %s", error)
+
+
+def connect(create=False):
+    """Open the database of the current server profile and location.
+
+    :param create: True to create the database if it does not exist
+    :returns: sqlite3.Connection, or None if there is no database
+    """
+    path = get_mirror_path()
+    if not create and not os.path.exists(path):
+        return None
+    import sqlite3  # pylint: disable=import-outside-toplevel
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _route(path, params):
+    """Find what a GET request asks for.
+
+    :returns: tuple of the kind, the object id (None for a list) and the
+        column filters, or None if the mirror can not answer it
+    """
+    params = {
+        key: value
+        for key, value in (params or {}).items()
+        if key not in PAGE_PARAMS and value is not None
+    }
+    if path in LIST_PATHS:
+        kind, columns = LIST_PATHS[path]
+        object_id = None
+    else:
+        match = DETAIL_PATH.match(path)
+        if match is None or DETAIL_KINDS[match["base"]] == SCAN_JOB and match["jobs"]:
+            return None
+        if match["jobs"]:
+            kind, columns = SCAN_JOB, dict(SCAN_JOBS_PARAMS)
+            params["parent_id"] = int(match["id"])
+            columns["parent_id"] = "parent_id"
+            object_id = None
+        else:
+            kind, columns, object_id = DETAIL_KINDS[match["base"]], {}, match["id"]
+    if any(key not in columns for key in params):
+        return None
+    return kind, object_id, {columns[key]: value for key, value in params.items()}
+
+
+def _is_fresh(connection, kind):
+    """Check whether a kind of object may be answered from the mirror."""
+    row = connection.execute(
+        "SELECT synced_at FROM syncs WHERE kind = ?", (kind,)
+    ).fetchone()
+    if row is None:
+        return False
+    return _offline or time.time() - row[0] <= _max_staleness
+
+
+def _response(path, status_code, json_data):
+    """Build the response the server would have sent."""
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    status = HTTPStatus(status_code)
+    response = requests.Response()
+    response.status_code = status.value
+    response.reason = status.phrase
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    # pylint: disable=protected-access
+    response._content = json.dumps(json_data).encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = path
+    return response
+
+
+def _answer(connection, path, params, kind, object_id, filters):
+    """Answer a request from the objects of the mirror."""
+    if object_id is not None:
+        row = connection.execute(
+            "SELECT data FROM objects WHERE kind = ? AND id = ?", (kind, object_id)
+        ).fetchone()
+        if row is None:
+            return _response(path, HTTPStatus.NOT_FOUND, {"detail": "Not found."})
+        return _response(path, HTTPStatus.OK, json.loads(row[0]))
+    if str((params or {}).get("page") or 1) != "1":
+        return _response(path, HTTPStatus.NOT_FOUND, {"detail": "Invalid page."})
+    query = "SELECT data FROM objects WHERE kind = ?"
+    values = [kind]
+    for column, value in filters.items():
+        query += f" AND {column} = ?"
+        values.append(value)
+    results = [
+        json.loads(data)
+        for (data,) in connection.execute(query + " ORDER BY id", values)
+    ]
+    return _response(
+        path,
+        HTTPStatus.OK,
+        {"count": len(results), "next": None, "previous": None, "results": results},
+    )
+
+
+def lookup(path, params=None):
+    """Answer a GET request from the mirror, if it may.
+
+    :param path: path after server and port (i.e. /api/v1/credentials/)
+    :param params: the query parameters
+    :returns: requests.Response, or None to send the request to the server
+    :raises: QPCOfflineError if offline and the mirror can not answer
+    """
+    if not is_enabled():
+        return None
+    response = None
+    route = _route(path, params)
+    connection = connect() if route is not None else None
+    if connection is not None:
+        with closing(connection):
+            if _is_fresh(connection, route[0]):
+                response = _answer(connection, path, params, *route)
+    if response is None and _offline:
+        raise QPCOfflineError(_(messages.MIRROR_OFFLINE_UNAVAILABLE) % path)
+    if response is not None:
+        logger.debug("Response for %s served from the mirror", path)
+    return response
+
+
+def invalidate(path):
+    """Mark the kinds of object a request to path may change as not synced.
+
+    :param path: path after server and port of a request that is not a GET
+    """
+    kinds = [
+        kind
+        for base, changed in CHANGED_KINDS.items()
+        if path.startswith(base)
+        for kind in changed
+    ]
+    if not kinds or not os.path.exists(get_mirror_path()):
+        return
+    import sqlite3  # pylint: disable=import-outside-toplevel
+
+    try:
+        connection = connect()
+        if connection is None:
+            return
+        with closing(connection), connection:
+            connection.executemany(
+                "DELETE FROM syncs WHERE kind = ?", [(kind,) for kind in kinds]
+            )
+    except sqlite3.Error as error:
+        logger.debug("Could not invalidate the mirror: %s", error)
+
+
+def _digest(data):
+    """Return the fingerprint of an object, to tell whether it changed."""
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def store(connection, kind, objects, parent_id=None):
+    """Replace the mirrored objects of a kind with the given ones.
+
+    Only the objects that are new or whose content changed are written;
+    the mirrored objects missing from objects are removed.
+
+    :param connection: sqlite3.Connection returned by connect
+    :param kind: kind of the objects
+    :param objects: list of object dictionaries, as sent by the server
+    :param parent_id: id of the scan of scan jobs, None for other kinds
+    :returns: tuple of the ids of the changed objects and of the removed ones
+    """
+    existing = dict(
+        connection.execute(
+            "SELECT id, digest FROM objects WHERE kind = ? AND parent_id IS ?",
+            (kind, parent_id),
+        )
+    )
+    changed = []
+    for entry in objects:
+        data = json.dumps(entry, sort_keys=True)
+        digest = _digest(data)
+        if existing.pop(entry["id"], None) == digest:
+            continue
+        connection.execute(
+            "INSERT OR REPLACE INTO objects"
+            " (kind, id, name, type, status, parent_id, digest, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                kind,
+                entry["id"],
+                entry.get("name"),
+                entry.get(TYPE_FIELDS[kind]),
+                entry.get("status"),
+                parent_id,
+                digest,
+                data,
+            ),
+        )
+        changed.append(entry["id"])
+    connection.executemany(
+        "DELETE FROM objects WHERE kind = ? AND id = ?",
+        [(kind, object_id) for object_id in existing],
+    )
+    return changed, list(existing)
+
+
+def remove_children(connection, kind, parent_ids):
+    """Remove the mirrored objects of a kind belonging to the given parents."""
+    connection.executemany(
+        "DELETE FROM objects WHERE kind = ? AND parent_id = ?",
+        [(kind, parent_id) for parent_id in parent_ids],
+    )
+
+
+def mark_synced(connection, kind):
+    """Record that a kind of object was just synced."""
+    connection.execute(
+        "INSERT OR REPLACE INTO syncs (kind, synced_at) VALUES (?, ?)",
+        (kind, time.time()),
+    )
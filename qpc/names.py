@@ -0,0 +1,198 @@
+"""Persistent cache of the ids of credentials, sources and scans by name.
+
+Commands naming an object (i.e. "qpc cred edit --name NAME") need its id
+before doing any real work, which costs a list request filtered on the
+name. The ids found are kept for NAME_CACHE_TTL seconds in a file under
+the qpc data directory, one per server profile, so later commands skip
+that request.
+
+Entries are keyed by the server location and the list path of the object,
+and configuring the server of a profile drops them (see clear). Requests qpc sends to
+create, change or delete an object drop the entries it may affect, and a
+404 answer for a cached id makes the caller look the name up again (see
+with_id). The --no-cache option bypasses the cache.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from http import HTTPStatus
+from logging import getLogger
+
+from qpc import cache, utils
+
+logger = getLogger(__name__)
+
+# seconds an id is used without asking the server
+NAME_CACHE_TTL = 5 * 60
+
+# fields of an object kept with its id
+KEPT_FIELDS = ("id", "cred_type", "source_type", "scan_type")
+
+DETAIL_PATH = re.compile(r"^(?P<base>/api/v1/\w+/)(?P<id>\d+)/?$")
+UPDATE_METHODS = ("PUT", "PATCH", "DELETE")
+CREATE_METHOD = "POST"
+
+_lock = threading.Lock()
+
+
+def _cache_path():
+    """Return the cache file of the current server profile."""
+    return os.path.join(utils.QPC_NAME_CACHE, f"{utils.get_server_profile()}.json")
+
+
+def _load():
+    """Read the cached entries of the configured server, by list path and name."""
+    try:
+        with open(_cache_path(), encoding="utf-8") as cache_file:
+            servers = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(servers, dict):
+        return {}
+    return servers.get(utils.get_server_location()) or {}
+
+
+def _save(entries):
+    """Replace the cached entries, dropping those of any other server."""
+    path = _cache_path()
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(utils.QPC_NAME_CACHE, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({utils.get_server_location(): entries}, cache_file)
+        os.replace(tmp_path, path)
+    except OSError as error:
+        logger.debug("Could not cache names: %s", error)
+
+
+def _kept_fields(entry):
+    """Return the fields of an object dictionary kept with its id."""
+    return {field: entry[field] for field in KEPT_FIELDS if field in entry}
+
+
+def lookup(path, name):
+    """Return the cached fields of the object with the given name.
+
+    :param path: list path of the object (i.e. /api/v1/credentials/)
+    :param name: the object name
+    :returns: dictionary with the id of the object, or None
+    """
+    if not cache.is_cache_enabled():
+        return None
+    with _lock:
+        entry = _load().get(path, {}).get(name)
+    if entry is None or time.time() - entry["time"] > NAME_CACHE_TTL:
+        return None
+    return entry["fields"]
+
+
+def store(path, name, entry):
+    """Cache the id of an object.
+
+    :param path: list path of the object
+    :param name: the object name
+    :param entry: the object dictionary, as sent by the server
+    """
+    if not cache.is_cache_enabled():
+        return
+    with _lock:
+        entries = _load()
+        entries.setdefault(path, {})[name] = {
+            "fields": _kept_fields(entry),
+            "time": time.time(),
+        }
+        _save(entries)
+
+
+def forget(path, name=None, object_id=None):
+    """Drop cached entries of a list path.
+
+    :param path: list path of the objects
+    :param name: only drop the entry of this name
+    :param object_id: only drop the entries with this id
+    """
+    with _lock:
+        entries = _load()
+        names = entries.get(path)
+        if not names:
+            return
+        for cached_name, entry in list(names.items()):
+            if name is not None and cached_name != name:
+                continue
+            if object_id is not None and str(entry["fields"]["id"]) != str(object_id):
+                continue
+            del names[cached_name]
+        _save(entries)
+
+
+def clear():
+    """Drop every cached entry of the current server profile."""
+    with _lock:
+        try:
+            os.remove(_cache_path())
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            logger.debug("Could not clear the name cache: %s", error)
+
+
+def invalidate(method, path):
+    """Drop the entries a request may make wrong.
+
+    :param method: the request method
+    :param path: path after server and port of the request
+    """
+    match = DETAIL_PATH.match(path)
+    if match is not None and method in UPDATE_METHODS:
+        forget(match["base"], object_id=match["id"])
+    elif match is None and method == CREATE_METHOD:
+        forget(path)
+
+
+def resolve(path, name, fetch):
+    """Return the cached fields of a named object, fetching them if needed.
+
+    :param path: list path of the object
+    :param name: the object name
+    :param fetch: callable taking the name and returning the object
+        dictionary from the server, or None if there is none
+    :returns: tuple of the fields (None if there is no such object) and
+        True if they came from the cache
+    """
+    fields = lookup(path, name)
+    if fields is not None:
+        return fields, True
+    entry = fetch(name)
+    if entry is None:
+        return None, False
+    store(path, name, entry)
+    return _kept_fields(entry), False
+
+
+def with_id(path, name, fetch, send):
+    """Send a request for a named object, by id.
+
+    If the server answers 404 for a cached id, the object was deleted or
+    renamed since: the name is looked up again and the request sent once
+    more with the new id.
+
+    :param path: list path of the object
+    :param name: the object name
+    :param fetch: callable looking the name up, as for resolve
+    :param send: callable taking the id and returning the response
+    :returns: the response, or None if there is no such object
+    """
+    fields, cached = resolve(path, name, fetch)
+    if fields is None:
+        return None
+    response = send(fields["id"])
+    if response.status_code == HTTPStatus.NOT_FOUND and cached:
+        forget(path, name)
+        fields, _ = resolve(path, name, fetch)
+        if fields is None:
+            return response
+        response = send(fields["id"])
+    return response
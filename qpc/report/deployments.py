@@ -1,6 +1,5 @@
 """ReportDeploymentsCommand is to show deployments report."""
 
-
 import sys
 from logging import getLogger
 
@@ -9,10 +8,14 @@ from requests import codes
 from qpc import messages, report, scan
 from qpc.clicommand import CliCommand
 from qpc.request import GET, request
+from qpc.server_info import FEATURE_MASKED_REPORTS, get_min_server_version
 from qpc.translation import _
 from qpc.utils import (
     check_extension,
     extract_json_from_tar,
+    extract_json_from_tar_stream,
+    iter_response_text,
+    print_progress,
     validate_write_file,
     write_file,
 )
@@ -83,8 +86,16 @@ class ReportDeploymentsCommand(CliCommand):
             help=_(messages.REPORT_MASK_HELP),
             required=False,
         )
+        self.parser.add_argument(
+            "--progress",
+            dest="progress",
+            action="store_true",
+            help=_(messages.DOWNLOAD_PROGRESS_HELP),
+            required=False,
+        )
         self.report_id = None
-        self.min_server_version = "0.9.2"
+        self.min_server_version = get_min_server_version(FEATURE_MASKED_REPORTS)
+        self.req_stream = True
 
     def _validate_args(self):
         CliCommand._validate_args(self)
@@ -127,13 +138,12 @@ class ReportDeploymentsCommand(CliCommand):
                 else:
                     logger.error(
                         _(messages.REPORT_NO_DEPLOYMENTS_REPORT_FOR_SJ),
-                        self.args.scan_job_id
+                        self.args.scan_job_id,
                     )
                     sys.exit(1)
             else:
                 logger.error(
-                    _(messages.REPORT_SJ_DOES_NOT_EXIST),
-                    self.args.scan_job_id
+                    _(messages.REPORT_SJ_DOES_NOT_EXIST), self.args.scan_job_id
                 )
                 sys.exit(1)
         else:
@@ -144,18 +154,26 @@ class ReportDeploymentsCommand(CliCommand):
 
     def _handle_response_success(self):
         file_content = None
-        if self.args.output_json:
+        progress = None
+        if self.args.output_json and self.args.path:
+            # decompress the tarball as it arrives instead of buffering it
+            self.response.raw.decode_content = True
+            file_content = extract_json_from_tar_stream(self.response.raw)
+        elif self.args.output_json:
             file_content = extract_json_from_tar(self.response.content)
+        elif self.args.path:
+            file_content = iter_response_text(self.response)
+            if getattr(self.args, "progress", False):
+                progress = print_progress
         else:
             file_content = self.response.text
 
         try:
-            write_file(self.args.path, file_content)
+            write_file(self.args.path, file_content, progress=progress)
             logger.info(_(messages.REPORT_SUCCESSFULLY_WRITTEN))
         except EnvironmentError as err:
             logger.error(
-                _(messages.WRITE_FILE_ERROR),
-                {"path": self.args.path, "error": err}
+                _(messages.WRITE_FILE_ERROR), {"path": self.args.path, "error": err}
             )
             sys.exit(1)
 
@@ -168,17 +186,17 @@ class ReportDeploymentsCommand(CliCommand):
             else:
                 logger.error(
                     _(messages.REPORT_NO_DEPLOYMENTS_REPORT_FOR_SJ),
-                    self.args.scan_job_id
+                    self.args.scan_job_id,
                 )
         else:
             if self.response.status_code == 428:
                 logger.error(
                     _(messages.REPORT_COULD_NOT_BE_MASKED_REPORT_ID),
-                    self.args.report_id
+                    self.args.report_id,
                 )
             else:
                 logger.error(
                     _(messages.REPORT_NO_DEPLOYMENTS_REPORT_FOR_REPORT_ID),
-                    self.args.report_id
+                    self.args.report_id,
                 )
         sys.exit(1)
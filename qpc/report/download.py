@@ -5,11 +5,13 @@ from logging import getLogger
 
 from requests import codes
 
-from qpc import messages, report, scan
+from qpc import api, messages, report
 from qpc.clicommand import CliCommand
-from qpc.request import GET, request
+from qpc.exceptions import QPCRequestError
+from qpc.request import GET
+from qpc.server_info import FEATURE_MASKED_REPORTS, get_min_server_version
 from qpc.translation import _
-from qpc.utils import check_extension, validate_write_file, write_file
+from qpc.utils import check_extension, print_progress, validate_write_file
 
 logger = getLogger(__name__)
 
@@ -63,72 +65,62 @@ class ReportDownloadCommand(CliCommand):
             help=_(messages.REPORT_MASK_HELP),
             required=False,
         )
-        self.min_server_version = "0.9.2"
+        self.parser.add_argument(
+            "--progress",
+            dest="progress",
+            action="store_true",
+            help=_(messages.DOWNLOAD_PROGRESS_HELP),
+            required=False,
+        )
+        self.min_server_version = get_min_server_version(FEATURE_MASKED_REPORTS)
         self.report_id = None
+        self.req_stream = True
 
     def _validate_args(self):
-        self.req_headers = {"Accept": "application/gzip"}
-        if self.args.mask:
-            self.req_params = {"mask": True}
         try:
             validate_write_file(self.args.path, "output-file")
         except ValueError as error:
             logger.error(error)
             sys.exit(1)
         check_extension("tar.gz", self.args.path)
-        if self.args.report_id is None:
-            # Lookup scan job id
-            response = request(
-                parser=self.parser,
-                method=GET,
-                path=f"{scan.SCAN_JOB_URI}{self.args.scan_job_id}",
-                payload=None,
-            )
-            if response.status_code == codes.ok:  # pylint: disable=no-member
-                json_data = response.json()
-                self.report_id = json_data.get("report_id")
-                if self.report_id:
-                    self.req_path = f"{self.req_path}{self.report_id}"
-                else:
-                    logger.error(
-                        _(messages.DOWNLOAD_NO_REPORT_FOR_SJ),
-                        self.args.scan_job_id
-                    )
-                    sys.exit(1)
-            else:
-                logger.error(
-                    _(messages.DOWNLOAD_SJ_DOES_NOT_EXIST),
-                    self.args.scan_job_id
-                )
-                sys.exit(1)
-        else:
-            self.report_id = self.args.report_id
-            self.req_path = f"{self.req_path}{self.report_id}"
 
-    def _handle_response_success(self):
-        file_content = self.response.content
+    def _get_report_id(self):
+        """Return the report of the requested scan job or the given report."""
+        if self.args.report_id is not None:
+            return self.args.report_id
         try:
-            write_file(self.args.path, file_content, True)
-            logger.info(
-                _(messages.DOWNLOAD_SUCCESSFULLY_WRITTEN),
-                {"report": self.report_id, "path": self.args.path}
+            report_id = api.get_scan_job(self.args.scan_job_id).get("report_id")
+        except QPCRequestError:
+            logger.error(_(messages.DOWNLOAD_SJ_DOES_NOT_EXIST), self.args.scan_job_id)
+            sys.exit(1)
+        if not report_id:
+            logger.error(_(messages.DOWNLOAD_NO_REPORT_FOR_SJ), self.args.scan_job_id)
+            sys.exit(1)
+        return report_id
+
+    def _do_command(self):
+        self.report_id = self._get_report_id()
+        progress = print_progress if getattr(self.args, "progress", False) else None
+        try:
+            api.download_report(
+                self.args.path,
+                report_id=self.report_id,
+                mask=self.args.mask,
+                progress=progress,
             )
         except EnvironmentError as err:
             logger.error(
-                _(messages.WRITE_FILE_ERROR),
-                {"path": self.args.path, "error": err}
+                _(messages.WRITE_FILE_ERROR), {"path": self.args.path, "error": err}
             )
             sys.exit(1)
+        logger.info(
+            _(messages.DOWNLOAD_SUCCESSFULLY_WRITTEN),
+            {"report": self.report_id, "path": self.args.path},
+        )
 
     def _handle_response_error(self):  # pylint: disable=arguments-differ
         if self.response.status_code == 428:
-            logger.error(
-                _(messages.DOWNLOAD_NO_MASK_REPORT),
-                self.args.report_id
-            )
+            logger.error(_(messages.DOWNLOAD_NO_MASK_REPORT), self.args.report_id)
         else:
-            logger.error(
-                _(messages.DOWNLOAD_NO_REPORT_FOUND),
-                self.args.report_id
-            )
+            logger.error(_(messages.DOWNLOAD_NO_REPORT_FOUND), self.args.report_id)
         sys.exit(1)
@@ -8,8 +8,15 @@ from requests import codes
 from qpc import messages, report, scan
 from qpc.clicommand import CliCommand
 from qpc.request import GET, request
+from qpc.server_info import FEATURE_INSIGHTS_REPORT, get_min_server_version
 from qpc.translation import _
-from qpc.utils import check_extension, validate_write_file, write_file
+from qpc.utils import (
+    STREAM_CHUNK_SIZE,
+    check_extension,
+    print_progress,
+    validate_write_file,
+    write_file,
+)
 
 logger = getLogger(__name__)
 
@@ -56,9 +63,16 @@ class ReportInsightsCommand(CliCommand):
             metavar="PATH",
             help=_(messages.REPORT_PATH_HELP),
         )
-        # Don't change this when you upgrade versions
-        self.min_server_version = "0.9.0"
+        self.parser.add_argument(
+            "--progress",
+            dest="progress",
+            action="store_true",
+            help=_(messages.DOWNLOAD_PROGRESS_HELP),
+            required=False,
+        )
+        self.min_server_version = get_min_server_version(FEATURE_INSIGHTS_REPORT)
         self.report_id = None
+        self.req_stream = True
 
     def _validate_args(self):
         CliCommand._validate_args(self)
@@ -93,13 +107,12 @@ class ReportInsightsCommand(CliCommand):
                 else:
                     logger.error(
                         _(messages.REPORT_NO_INSIGHTS_REPORT_FOR_SJ),
-                        self.args.scan_job_id
+                        self.args.scan_job_id,
                     )
                     sys.exit(1)
             else:
                 logger.error(
-                    _(messages.REPORT_SJ_DOES_NOT_EXIST),
-                    self.args.scan_job_id
+                    _(messages.REPORT_SJ_DOES_NOT_EXIST), self.args.scan_job_id
                 )
                 sys.exit(1)
         else:
@@ -109,29 +122,27 @@ class ReportInsightsCommand(CliCommand):
             )
 
     def _handle_response_success(self):
+        progress = print_progress if getattr(self.args, "progress", False) else None
         try:
             if self.args.path:
-                file_content = self.response.content
+                file_content = self.response.iter_content(STREAM_CHUNK_SIZE)
             else:
                 file_content = self.response.text
-            write_file(self.args.path, file_content, binary=True)
+            write_file(self.args.path, file_content, binary=True, progress=progress)
             logger.info(_(messages.REPORT_SUCCESSFULLY_WRITTEN))
         except EnvironmentError as err:
             logger.error(
-                _(messages.WRITE_FILE_ERROR),
-                {"path": self.args.path, "error": err}
+                _(messages.WRITE_FILE_ERROR), {"path": self.args.path, "error": err}
             )
             sys.exit(1)
 
     def _handle_response_error(self):  # pylint: disable=arguments-differ
         if self.args.report_id is None:
             logger.error(
-                _(messages.REPORT_NO_INSIGHTS_REPORT_FOR_SJ),
-                self.args.scan_job_id
+                _(messages.REPORT_NO_INSIGHTS_REPORT_FOR_SJ), self.args.scan_job_id
             )
         else:
             logger.error(
-                _(messages.REPORT_NO_INSIGHTS_REPORT_FOR_REPORT_ID),
-                self.args.report_id
+                _(messages.REPORT_NO_INSIGHTS_REPORT_FOR_REPORT_ID), self.args.report_id
             )
         sys.exit(1)
@@ -12,8 +12,9 @@ from qpc import messages, report
 from qpc.clicommand import CliCommand
 from qpc.release import PKG_NAME
 from qpc.report import utils
-from qpc.request import GET, POST, PUT, request
+from qpc.request import GET, POST, PUT, request, run_concurrently
 from qpc.scan import SCAN_JOB_URI
+from qpc.server_info import use_compressed_requests
 from qpc.translation import _
 
 logger = getLogger(__name__)
@@ -80,6 +81,13 @@ class ReportMergeCommand(CliCommand):
             nargs="+",
             help=_(messages.REPORT_JSON_DIR_HELP),
         )
+        self.parser.add_argument(
+            "--compress",
+            dest="compress",
+            action="store_true",
+            help=_(messages.REPORT_COMPRESS_HELP),
+            required=False,
+        )
         self.json = None
         self.report_ids = None
 
@@ -93,13 +101,14 @@ class ReportMergeCommand(CliCommand):
         report_ids = []
         job_not_found = []
         report_not_found = []
-        for scan_job_id in set(self.args.scan_job_ids):
-            # check for existence of scan_job
-            path = SCAN_JOB_URI + str(scan_job_id) + "/"
-            response = request(
-                parser=self.parser, method=GET, path=path, params=None, payload=None
-            )
-            if response.status_code == codes.ok:  # pylint: disable=no-member
+        # drop duplicates while keeping the order given on the command line
+        scan_job_ids = list(dict.fromkeys(self.args.scan_job_ids))
+        results = run_concurrently(self._get_scan_job, scan_job_ids)
+        for scan_job_id, response, error in results:
+            if error is not None:
+                logger.error(error)
+            # pylint: disable=no-member
+            if error is None and response.status_code == codes.ok:
                 json_data = response.json()
                 report_id = json_data.get("report_id", None)
                 if report_id:
@@ -113,6 +122,14 @@ class ReportMergeCommand(CliCommand):
                 not_found = True
         return not_found, report_ids, job_not_found, report_not_found
 
+    def _get_scan_job(self, scan_job_id):
+        """Request the scan job with the given id."""
+        # check for existence of scan_job
+        path = SCAN_JOB_URI + str(scan_job_id) + "/"
+        return request(
+            parser=self.parser, method=GET, path=path, params=None, payload=None
+        )
+
     def _validate_create_json(self, files):
         """Validate the set of files to be merged.
 
@@ -198,6 +215,9 @@ class ReportMergeCommand(CliCommand):
         if self.args.json_files or self.args.json_dir:
             self.req_method = POST
             self.req_payload = self.json
+            self.req_compress = use_compressed_requests(
+                getattr(self.args, "compress", False)
+            )
         else:
             self.req_method = PUT
             self.req_payload = {
@@ -68,7 +68,8 @@ class ReportDownloadTests(unittest.TestCase):
             with self.assertLogs(level="INFO") as log:
                 nac.main(args)
                 expected_msg = messages.DOWNLOAD_SUCCESSFULLY_WRITTEN % {
-                    "report": "1", "path": self.test_tar_filename
+                    "report": "1",
+                    "path": self.test_tar_filename,
                 }
                 self.assertIn(expected_msg, log.output[-1])
 
@@ -92,7 +93,8 @@ class ReportDownloadTests(unittest.TestCase):
             with self.assertLogs(level="INFO") as log:
                 nac.main(args)
                 expected_msg = messages.DOWNLOAD_SUCCESSFULLY_WRITTEN % {
-                    "report": "1", "path": self.test_tar_filename
+                    "report": "1",
+                    "path": self.test_tar_filename,
                 }
                 self.assertIn(expected_msg, log.output[-1])
 
@@ -174,13 +176,12 @@ class ReportDownloadTests(unittest.TestCase):
             with self.assertLogs(level="ERROR") as log:
                 with self.assertRaises(SystemExit):
                     nac.main(args)
-                err_msg = (
-                    messages.REPORT_DIRECTORY_DOES_NOT_EXIST
-                    % os.path.dirname(fake_dir)
+                err_msg = messages.REPORT_DIRECTORY_DOES_NOT_EXIST % os.path.dirname(
+                    fake_dir
                 )
                 self.assertIn(err_msg, log.output[0])
 
-    @patch("qpc.report.download.write_file")
+    @patch("qpc.api.write_file")
     def test_file_fails_to_write(self, file):
         """Testing download failure while writing to file."""
         err = "Mock Fail"
@@ -204,7 +205,8 @@ class ReportDownloadTests(unittest.TestCase):
                 with self.assertRaises(SystemExit):
                     nac.main(args)
                 err_msg = messages.WRITE_FILE_ERROR % {
-                    "path": self.test_tar_filename, "error": err
+                    "path": self.test_tar_filename,
+                    "error": err,
                 }
                 self.assertIn(err_msg, log.output[0])
 
@@ -249,7 +251,7 @@ class ReportDownloadTests(unittest.TestCase):
                     nac.main(args)
                 err_msg = messages.SERVER_TOO_OLD_FOR_CLI % {
                     "min_version": "0.9.2",
-                    "current_version": "0.0.45"
+                    "current_version": "0.0.45",
                 }
                 self.assertIn(err_msg, log.output[-1])
 
@@ -296,7 +298,8 @@ class ReportDownloadTests(unittest.TestCase):
             with self.assertLogs(level="INFO") as log:
                 nac.main(args)
                 expected_msg = messages.DOWNLOAD_SUCCESSFULLY_WRITTEN % {
-                    "report": "1", "path": self.test_tar_filename
+                    "report": "1",
+                    "path": self.test_tar_filename,
                 }
                 self.assertIn(expected_msg, log.output[-1])
 
@@ -320,3 +323,29 @@ class ReportDownloadTests(unittest.TestCase):
                     nac.main(args)
                 err_msg = messages.DOWNLOAD_NO_MASK_REPORT % 1
                 self.assertIn(err_msg, log.output[0])
+
+
+def test_download_streams_to_file(tmp_path, capsys, requests_mock):
+    """Testing download writes the streamed body and reports progress."""
+    get_report_url = get_server_location() + REPORT_URI + "1"
+    buffer_content = create_tar_buffer({"test.json": {"id": 1}})
+    requests_mock.get(
+        get_report_url,
+        status_code=200,
+        headers={"X-Server-Version": VERSION},
+        content=buffer_content,
+    )
+    output_path = tmp_path / "report.tar.gz"
+    nac = ReportDownloadCommand(SUBPARSER)
+    args = Namespace(
+        scan_job_id=None,
+        report_id="1",
+        path=str(output_path),
+        mask=False,
+        progress=True,
+    )
+    nac.main(args)
+    assert requests_mock.last_request.stream
+    assert output_path.read_bytes() == buffer_content
+    captured = capsys.readouterr()
+    assert messages.DOWNLOAD_PROGRESS % len(buffer_content) in captured.err
@@ -1,5 +1,7 @@
 """Test the CLI module."""
 
+import gzip
+import json
 import os
 import sys
 import unittest
@@ -64,7 +66,8 @@ class ReportUploadTests(unittest.TestCase):
             with self.assertLogs(level="INFO") as log:
                 nac.main(args)
                 expected_message = messages.REPORT_SUCCESSFULLY_UPLOADED % {
-                    "id": "1", "pkg_name": PKG_NAME
+                    "id": "1",
+                    "pkg_name": PKG_NAME,
                 }
 
                 self.assertIn(expected_message, log.output[-1])
@@ -80,8 +83,8 @@ class ReportUploadTests(unittest.TestCase):
             with self.assertLogs(level="ERROR") as log:
                 with self.assertRaises(SystemExit):
                     nac.main(args)
-                err_msg = (
-                    messages.REPORT_UPLOAD_FILE_INVALID_JSON % (TMP_BADDETAILS1[0])
+                err_msg = messages.REPORT_UPLOAD_FILE_INVALID_JSON % (
+                    TMP_BADDETAILS1[0]
                 )
                 self.assertIn(err_msg, log.output[-1])
 
@@ -98,7 +101,20 @@ class ReportUploadTests(unittest.TestCase):
             with self.assertLogs(level="ERROR") as log:
                 with self.assertRaises(SystemExit):
                     nac.main(args)
-                err_msg = (
-                    messages.REPORT_FAILED_TO_UPLOADED % (put_report_data.get("error"))
+                err_msg = messages.REPORT_FAILED_TO_UPLOADED % (
+                    put_report_data.get("error")
                 )
                 self.assertIn(err_msg, log.output[-1])
+
+    def test_upload_compressed_details_report(self):
+        """Test the details report is sent gzip-encoded with --compress."""
+        put_merge_url = get_server_location() + ASYNC_MERGE_URI
+        with requests_mock.Mocker() as mocker:
+            mocker.post(put_merge_url, status_code=201, json={"id": 1})
+            nac = ReportUploadCommand(SUBPARSER)
+            args = Namespace(json_file=TMP_GOODDETAILS[0], compress=True)
+            nac.main(args)
+            sent = mocker.last_request
+            self.assertEqual(sent.headers["Content-Encoding"], "gzip")
+            payload = json.loads(gzip.decompress(sent.body))
+            self.assertEqual(payload["sources"][0]["facts"], ["A"])
@@ -11,6 +11,7 @@ from qpc.clicommand import CliCommand
 from qpc.release import PKG_NAME
 from qpc.report import utils
 from qpc.request import POST
+from qpc.server_info import use_compressed_requests
 from qpc.translation import _
 
 logger = getLogger(__name__)
@@ -53,6 +54,13 @@ class ReportUploadCommand(CliCommand):
             help=_(messages.REPORT_UPLOAD_JSON_FILE_HELP),
             required=True,
         )
+        self.parser.add_argument(
+            "--compress",
+            dest="compress",
+            action="store_true",
+            help=_(messages.REPORT_COMPRESS_HELP),
+            required=False,
+        )
         self.json = None
 
     def _validate_create_json(self, file):
@@ -82,13 +90,16 @@ class ReportUploadCommand(CliCommand):
         """
         self.req_method = POST
         self.req_payload = self.json
+        self.req_compress = use_compressed_requests(
+            getattr(self.args, "compress", False)
+        )
 
     def _handle_response_success(self):
         json_data = self.response.json()
         if json_data.get("id"):
             logger.info(
                 _(messages.REPORT_SUCCESSFULLY_UPLOADED),
-                {"id": json_data.get("id"), "pkg_name": PKG_NAME}
+                {"id": json_data.get("id"), "pkg_name": PKG_NAME},
             )
 
     def _handle_response_error(self):  # pylint: disable=arguments-differ
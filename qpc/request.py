@@ -1,20 +1,50 @@
 """Common module for handling request calls to the server."""
 
 import json
+import random
 import sys
-
-# pylint: disable=no-name-in-module,import-error
-from distutils.version import LooseVersion
-
-import requests
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
 
 from qpc import messages
+from qpc.exceptions import (
+    QPCAuthenticationError,
+    QPCConnectionError,
+    QPCError,
+    QPCOfflineError,
+    QPCResponseError,
+    QPCServerError,
+    QPCServerVersionError,
+)
 from qpc.release import PKG_NAME
+from qpc.server_info import (
+    CAPABILITY_COMPRESSED_REQUESTS,
+    check_server_version,
+    get_capability,
+    get_server_version,
+    record_server_version,
+    set_capability,
+)
 from qpc.translation import _
 from qpc.utils import (
     CONFIG_HOST_KEY,
+    CONFIG_KEEP_ALIVE,
+    CONFIG_POOL_SIZE,
     CONFIG_PORT_KEY,
+    CONFIG_RETRIES,
+    CONFIG_RETRY_BUDGET,
     CONFIG_USE_HTTP,
+    DEFAULT_JOBS,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BUDGET,
     QPC_MIN_SERVER_VERSION,
     get_server_location,
     get_ssl_verify,
@@ -32,6 +62,23 @@ GET = "GET"
 PATCH = "PATCH"
 DELETE = "DELETE"
 PUT = "PUT"
+SUPPORTED_METHODS = (POST, GET, PATCH, DELETE, PUT)
+
+# methods that may safely be sent again after a transient failure
+RETRY_METHODS = (GET, PUT, DELETE)
+# statuses returned by an overloaded or restarting server
+RETRY_STATUS_CODES = (
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+)
+# the n-th retry waits about RETRY_BACKOFF_FACTOR * 2 ** n seconds
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_MAX_DELAY = 60
+
+# JSON text is handed to the compressor in pieces of about this size
+COMPRESS_CHUNK_SIZE = 64 * 1024
 
 CONNECTION_ERROR_MSG = messages.CONNECTION_ERROR_MSG
 
@@ -41,71 +88,451 @@ try:
 except AttributeError:
     exception_class = ValueError
 
+# process-wide session shared by every request made through this module
+_session = None
+_session_lock = threading.Lock()
 
-def handle_general_errors(response, min_server_version):
-    """Handle general errors.
+# process-wide executor used by run_concurrently, sized with --jobs
+_jobs = DEFAULT_JOBS
+_executor = None
+_executor_lock = threading.Lock()
+
+# retries left for this invocation, shared by every request and thread
+_retry_budget = None
+_retry_lock = threading.Lock()
+
+# outcome of run_concurrently for a single item; error is the exception
+# raised by the callable, if any
+ItemResult = namedtuple("ItemResult", ["item", "result", "error"])
+
+
+def get_session():
+    """Return the requests session shared by all qpc calls.
+
+    The session is created on first use, with a connection pool sized
+    according to the server configuration, so consecutive requests reuse
+    the same TCP/TLS connection instead of opening a new one each time.
+
+    :returns: requests.Session object
+    """
+    global _session  # pylint: disable=global-statement
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _session_lock:
+        if _session is None:
+            pool_size = DEFAULT_POOL_SIZE
+            keep_alive = True
+            config = read_server_config()
+            if config is not None:
+                pool_size = config.get(CONFIG_POOL_SIZE, DEFAULT_POOL_SIZE)
+                keep_alive = config.get(CONFIG_KEEP_ALIVE, True)
+            # concurrent requests must not wait on each other for a connection
+            pool_size = max(pool_size, _jobs)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if not keep_alive:
+                session.headers["Connection"] = "close"
+            _session = session
+    return _session
+
+
+def close_session():
+    """Close the shared session and release its pooled connections."""
+    global _session  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def set_jobs(jobs):
+    """Set how many requests run_concurrently may send at the same time.
+
+    :param jobs: maximum number of concurrent requests (the --jobs option)
+    """
+    global _jobs, _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+        _jobs = jobs
+
+
+def get_jobs():
+    """Return how many requests run_concurrently may send at the same time."""
+    return _jobs
+
+
+def get_executor():
+    """Return the thread pool shared by all run_concurrently calls.
+
+    The pool is bounded by the --jobs option. Callables submitted to it
+    must not call run_concurrently themselves, as they could wait forever
+    for a free worker.
+
+    :returns: concurrent.futures.ThreadPoolExecutor object
+    """
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_jobs, thread_name_prefix=PKG_NAME
+            )
+    return _executor
+
+
+def _call_for_item(func, item):
+    """Call func with item, capturing any error in the returned ItemResult."""
+    try:
+        return ItemResult(item, func(item), None)
+    except Exception as error:  # pylint: disable=broad-except
+        return ItemResult(item, None, error)
+
+
+def run_concurrently(func, items):
+    """Call func for every item, running up to --jobs calls at a time.
+
+    func is usually a small wrapper around request(). Errors raised by func
+    are collected per item instead of aborting the remaining calls; a
+    SystemExit (i.e. raised by request() on connection errors) still stops
+    the command once it is reached in item order.
+
+    :param func: callable taking a single item
+    :param items: iterable of items to call func with
+    :returns: list of ItemResult, in the same order as items
+    """
+    items = list(items)
+    if _jobs == 1 or len(items) <= 1:
+        return [_call_for_item(func, item) for item in items]
+    # calls see the context variables of the caller, i.e. where a batch
+    # line writes its output
+    futures = [
+        get_executor().submit(copy_context().run, _call_for_item, func, item)
+        for item in items
+    ]
+    try:
+        return [future.result() for future in futures]
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def get_max_retries(method):
+    """Return how many times a request with the given method may be retried.
+
+    :param method: the request method (i.e. GET)
+    :returns: the configured number of retries, or 0 for unsafe methods
+    """
+    if method not in RETRY_METHODS:
+        return 0
+    config = read_server_config()
+    if config is None:
+        return DEFAULT_RETRIES
+    return config.get(CONFIG_RETRIES, DEFAULT_RETRIES)
+
+
+def take_retry():
+    """Consume one retry from the budget of this invocation.
+
+    The budget keeps a bulk run against an overloaded server from turning
+    into a retry storm.
+
+    :returns: True if a retry may be attempted
+    """
+    global _retry_budget  # pylint: disable=global-statement
+    with _retry_lock:
+        if _retry_budget is None:
+            config = read_server_config()
+            _retry_budget = DEFAULT_RETRY_BUDGET
+            if config is not None:
+                _retry_budget = config.get(CONFIG_RETRY_BUDGET, DEFAULT_RETRY_BUDGET)
+        if _retry_budget < 1:
+            return False
+        _retry_budget -= 1
+        return True
+
+
+def reset_retry_budget():
+    """Restore the full retry budget, as at the start of an invocation."""
+    global _retry_budget  # pylint: disable=global-statement
+    with _retry_lock:
+        _retry_budget = None
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header value to a number of seconds.
+
+    :param value: delay in seconds or HTTP date, as sent by the server
+    :returns: seconds to wait, or None if value can not be parsed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def get_retry_delay(retry, response=None):
+    """Return how long to wait before the given retry.
+
+    The server Retry-After header wins when present; otherwise the delay
+    grows exponentially, with jitter so that concurrent clients do not
+    retry in lockstep. Either way it is capped at RETRY_MAX_DELAY.
+
+    :param retry: number of the retry about to be made, starting at 1
+    :param response: the response that triggered the retry, if any
+    :returns: delay in seconds
+    """
+    delay = None
+    if response is not None:
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+    if delay is None:
+        backoff = RETRY_BACKOFF_FACTOR * 2 ** (retry - 1)
+        delay = random.uniform(backoff / 2, backoff)
+    return min(delay, RETRY_MAX_DELAY)
+
+
+def should_retry(method, url, retry, max_retries):
+    """Check whether a failed request may be sent again.
+
+    :param method: the request method (i.e. GET)
+    :param url: the request url, for logging
+    :param retry: number of the retry that would be made, starting at 1
+    :param max_retries: value returned by get_max_retries
+    :returns: True if the request should be retried
+    """
+    if retry > max_retries:
+        return False
+    if not take_retry():
+        logger.info(
+            _(messages.REQUEST_RETRY_BUDGET_EXHAUSTED), {"method": method, "url": url}
+        )
+        return False
+    return True
+
+
+def log_retry(method, url, retry, max_retries, delay, reason):
+    """Log that a request is about to be retried."""
+    logger.info(
+        _(messages.REQUEST_RETRY),
+        {
+            "method": method,
+            "url": url,
+            "delay": delay,
+            "retry": retry,
+            "retries": max_retries,
+            "reason": reason,
+        },
+    )
+
+
+class QPCResponse:
+    """Wrap a requests.Response so its JSON body is decoded only once.
+
+    Every other attribute is delegated to the wrapped response, so the
+    wrapper can be used anywhere a requests.Response is expected.
+    """
+
+    def __init__(self, response):
+        """Wrap the given requests.Response object."""
+        self._response = response
+        self._json_data = None
+        self._json_error = None
+        self._json_decoded = False
+
+    def __getattr__(self, name):
+        """Delegate everything else to the wrapped response."""
+        return getattr(self._response, name)
+
+    def json(self, **kwargs):
+        """Decode the response body on first call and return the cached result.
+
+        :raises: ValueError (JSONDecodeError) if the body is not valid JSON,
+            on this and every subsequent call.
+        """
+        if not self._json_decoded:
+            try:
+                self._json_data = self._response.json(**kwargs)
+            except ValueError as error:
+                self._json_error = error
+            self._json_decoded = True
+        if self._json_error is not None:
+            raise self._json_error
+        return self._json_data
+
+
+def check_response(response, min_server_version):
+    """Raise the errors that are handled the same way for every request.
 
     :param response: The response object.
+    :param min_server_version: min qpc server version allowed
     :returns: The response object.
+    :raises: QPCServerVersionError, QPCAuthenticationError or QPCServerError
     """
     server_version = response.headers.get("X-Server-Version")
-    if not server_version:
-        server_version = QPC_MIN_SERVER_VERSION
+    if server_version:
+        record_server_version(server_version)
+    else:
+        # i.e. a response served from the mirror
+        server_version = get_server_version() or QPC_MIN_SERVER_VERSION
+    check_server_version(min_server_version, server_version)
 
-    if "0.0.0" not in server_version and LooseVersion(server_version) < LooseVersion(
-        min_server_version
+    token_expired = {"detail": "Token has expired"}
+    response_data = None
+    if response.status_code == 400:
+        # only bad requests may carry the token expired payload
+        try:
+            response_data = response.json()
+        except exception_class:
+            pass
+
+    if response.status_code == 401 or (
+        response.status_code == 400 and response_data == token_expired
     ):
-        logger.error(
-            _(messages.SERVER_TOO_OLD_FOR_CLI),
-            {"min_version": min_server_version, "current_version": server_version}
+        raise QPCAuthenticationError(
+            _(messages.SERVER_LOGIN_REQUIRED) % PKG_NAME, response
         )
-        sys.exit(1)
+    if response.status_code == 500:
+        raise QPCServerError(_(messages.SERVER_INTERNAL_ERROR), response)
 
-    token_expired = {"detail": "Token has expired"}
-    response_data = None
+    return response
+
+
+def report_error(error):
+    """Log an error raised by send_request() or qpc.api and exit.
+
+    :param error: QPCError instance
+    """
+    if isinstance(error, QPCConnectionError):
+        handle_connection_error()
+    if isinstance(error, QPCResponseError):
+        handle_error_response(error.response)
+    logger.error(error.message)
+    sys.exit(1)
+
+
+def handle_general_errors(response, min_server_version):
+    """Handle general errors.
+
+    :param response: The response object.
+    :returns: The response object.
+    """
     try:
-        response_data = response.json()
-    except exception_class:
-        pass
+        return check_response(response, min_server_version)
+    except QPCError as error:
+        report_error(error)
+    return None
+
+
+def connection_error_message():
+    """Describe why the server could not be reached."""
+    config = read_server_config()
+    if config is None:
+        return _(messages.SERVER_CONFIG_REQUIRED) % PKG_NAME
+    protocol = "https"
+    if config.get(CONFIG_USE_HTTP):
+        protocol = "http"
+    return _(CONNECTION_ERROR_MSG) % {
+        "protocol": protocol,
+        "host": config.get(CONFIG_HOST_KEY),
+        "port": config.get(CONFIG_PORT_KEY),
+    }
+
+
+def handle_connection_error():
+    """Report that the server could not be reached and exit."""
+    logger.error(connection_error_message())
+    if read_server_config() is not None:
+        logger.error(_(messages.SERVER_CONFIG_REQUIRED), PKG_NAME)
+    sys.exit(1)
+
+
+def build_request_headers(headers=None):
+    """Build the headers sent with every request to the server.
+
+    :param headers: extra headers to include
+    :returns: dictionary of headers, including the client token if any
+    """
+    req_headers = {}
+    token = read_client_token()
+    if headers:
+        req_headers.update(headers)
+    if token:
+        req_headers["Authorization"] = f"Token {token}"
+    return req_headers
 
-    if response.status_code == 401:
-        handle_error_response(response)
-        logger.error(_(messages.SERVER_LOGIN_REQUIRED), PKG_NAME)
-        sys.exit(1)
-    elif response.status_code == 400 and response_data == token_expired:
-        handle_error_response(response)
-        logger.error(_(messages.SERVER_LOGIN_REQUIRED), PKG_NAME)
-        sys.exit(1)
-    elif response.status_code == 500:
-        handle_error_response(response)
-        logger.error(_(messages.SERVER_INTERNAL_ERROR))
-        sys.exit(1)
 
-    return response
+def gzip_json(payload):
+    """Encode payload as gzip-compressed JSON.
 
+    The JSON text is compressed while it is generated, so only the
+    compressed bytes, not the whole document, are held in memory.
 
-def post(url, payload, headers=None):
+    :param payload: JSON serializable object
+    :returns: bytes in gzip format
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    compressed = []
+    pending = []
+    pending_size = 0
+    for piece in json.JSONEncoder().iterencode(payload):
+        pending.append(piece)
+        pending_size += len(piece)
+        if pending_size >= COMPRESS_CHUNK_SIZE:
+            compressed.append(compressor.compress("".join(pending).encode("utf-8")))
+            pending = []
+            pending_size = 0
+    compressed.append(compressor.compress("".join(pending).encode("utf-8")))
+    compressed.append(compressor.flush())
+    return b"".join(compressed)
+
+
+def post(url, payload, headers=None, compress=False):
     """Post JSON payload to the given url.
 
     :param url: the server, port, and path
     (i.e. http://127.0.0.1:8000/api/v1/scans/)
     :param payload: dictionary of payload to be posted
+    :param compress: if True, send the payload gzip-encoded
     :returns: reponse object
     """
     ssl_verify = get_ssl_verify()
-    return requests.post(url, json=payload, headers=headers, verify=ssl_verify)
+    if compress:
+        headers = dict(headers or {})
+        headers["Content-Type"] = "application/json"
+        headers["Content-Encoding"] = "gzip"
+        return get_session().post(
+            url, data=gzip_json(payload), headers=headers, verify=ssl_verify
+        )
+    return get_session().post(url, json=payload, headers=headers, verify=ssl_verify)
 
 
-def get(url, params=None, headers=None):
+def get(url, params=None, headers=None, stream=False):
     """Get JSON data from the given url.
 
     :param url: the server, port, and path
     (i.e. http://127.0.0.1:8000/api/v1/credentials)
     :param params: uri encoding params (i.e. ?param1=hello&param2=world)
+    :param stream: if True, the body is not downloaded until it is read
     :returns: reponse object
     """
     ssl_verify = get_ssl_verify()
-    return requests.get(url, params=params, headers=headers, verify=ssl_verify)
+    return get_session().get(
+        url, params=params, headers=headers, verify=ssl_verify, stream=stream
+    )
 
 
 def patch(url, payload, headers=None):
@@ -117,7 +544,7 @@ def patch(url, payload, headers=None):
     :returns: reponse object
     """
     ssl_verify = get_ssl_verify()
-    return requests.patch(url, json=payload, headers=headers, verify=ssl_verify)
+    return get_session().patch(url, json=payload, headers=headers, verify=ssl_verify)
 
 
 def delete(url, headers=None):
@@ -128,7 +555,7 @@ def delete(url, headers=None):
     :returns: reponse object
     """
     ssl_verify = get_ssl_verify()
-    return requests.delete(url, headers=headers, verify=ssl_verify)
+    return get_session().delete(url, headers=headers, verify=ssl_verify)
 
 
 def put(url, payload, headers=None):
@@ -140,10 +567,140 @@ def put(url, payload, headers=None):
     :returns: reponse object
     """
     ssl_verify = get_ssl_verify()
-    return requests.put(url, json=payload, headers=headers, verify=ssl_verify)
+    return get_session().put(url, json=payload, headers=headers, verify=ssl_verify)
 
 
 # pylint: disable=too-many-arguments, too-many-branches, too-many-locals
+# pylint: disable=too-many-statements
+def invalidate_changes(method, path):
+    """Drop the mirrored data and cached names a request may change.
+
+    :param method: the request method, other than GET
+    :param path: path after server and port of the request
+    """
+    # pylint: disable=import-outside-toplevel
+    from qpc import mirror, names
+
+    mirror.invalidate(path)
+    names.invalidate(method, path)
+
+
+def send_request(
+    method,
+    path,
+    params=None,
+    payload=None,
+    headers=None,
+    min_server_version=QPC_MIN_SERVER_VERSION,
+    stream=False,
+    compress=False,
+    log_command=None,
+):
+    """Send a request to the server, raising the errors every caller shares.
+
+    GET, PUT and DELETE requests that fail to connect or get a 429, 502,
+    503 or 504 response are retried with backoff, within the configured
+    retries and retry budget. Non-streamed GET responses are revalidated
+    against the on-disk cache (see qpc.cache), or answered from the mirror
+    of "qpc sync" with --offline or --max-staleness (see qpc.mirror).
+
+    :param method: the request method to execute
+    :param path: path after server and port (i.e. /api/v1/credentials)
+    :param params: uri encoding params (i.e. ?param1=hello&param2=world)
+    :param payload: dictionary of payload to be posted
+    :param headers: headers to include
+    :param min_server_version: min qpc server version allowed
+    :param stream: if True, a GET response body is left unread so the caller
+        can consume it in chunks (i.e. with iter_content())
+    :param compress: if True, a POST payload is sent gzip-encoded; it is
+        sent again uncompressed if the server answers 415, and sent
+        uncompressed from then on (see qpc.server_info)
+    :param log_command: command name written to the log with the request
+    :returns: QPCResponse object wrapping the server response
+    :raises: QPCConnectionError if the server can not be reached,
+        QPCOfflineError if offline and the mirror can not answer, and the
+        errors raised by check_response
+    """
+    # requests and the cache and mirror modules load on the first request
+    # pylint: disable=import-outside-toplevel
+    import requests
+
+    from qpc import cache, mirror
+
+    if method == GET and mirror.is_enabled():
+        mirrored = mirror.lookup(path, params)
+        if mirrored is not None:
+            return check_response(QPCResponse(mirrored), min_server_version)
+    if method != GET:
+        invalidate_changes(method, path)
+    req_headers = build_request_headers(headers)
+    # create the url by adding the path to the configured server location
+    url = get_server_location() + path
+    use_cache = method == GET and not stream
+    cached = None
+    if use_cache:
+        cached = cache.lookup(url, params, req_headers)
+        if cached is not None:
+            req_headers.update(cache.conditional_headers(cached))
+
+    if compress and get_capability(CAPABILITY_COMPRESSED_REQUESTS) is False:
+        # the server already refused a compressed body; do not upload twice
+        compress = False
+
+    max_retries = get_max_retries(method)
+    retry = 0
+    while True:
+        retry += 1
+        try:
+            if method == POST:
+                response = post(url, payload, req_headers, compress)
+            elif method == GET:
+                response = get(url, params, req_headers, stream)
+            elif method == PATCH:
+                response = patch(url, payload, req_headers)
+            elif method == DELETE:
+                response = delete(url, req_headers)
+            else:
+                response = put(url, payload, req_headers)
+        except requests.exceptions.SSLError as error:
+            raise QPCConnectionError(connection_error_message()) from error
+        except requests.exceptions.ConnectionError as error:
+            if not should_retry(method, url, retry, max_retries):
+                raise QPCConnectionError(connection_error_message()) from error
+            delay = get_retry_delay(retry)
+            log_retry(method, url, retry, max_retries, delay, error)
+            time.sleep(delay)
+            continue
+        if compress and response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE:
+            logger.info(_(messages.REQUEST_COMPRESSION_REJECTED), url)
+            set_capability(CAPABILITY_COMPRESSED_REQUESTS, False)
+            compress = False
+            continue
+        if compress and response.ok:
+            set_capability(CAPABILITY_COMPRESSED_REQUESTS, True)
+        if response.status_code in RETRY_STATUS_CODES and should_retry(
+            method, url, retry, max_retries
+        ):
+            delay = get_retry_delay(retry, response)
+            log_retry(method, url, retry, max_retries, delay, response.status_code)
+            response.close()
+            time.sleep(delay)
+            continue
+        break
+
+    if use_cache:
+        if cached is not None and response.status_code == HTTPStatus.NOT_MODIFIED:
+            response = cache.response_from_cache(
+                cached, response, url, params, req_headers
+            )
+        else:
+            cache.store(url, params, req_headers, response)
+
+    result = check_response(QPCResponse(response), min_server_version)
+    log_request_info(method, log_command, url, result, streamed=stream)
+    return result
+
+
 def request(
     method,
     path,
@@ -152,9 +709,14 @@ def request(
     parser=None,
     headers=None,
     min_server_version=QPC_MIN_SERVER_VERSION,
+    stream=False,
+    compress=False,
 ):
     """Create a generic handler for passing to specific request methods.
 
+    Sends the request with send_request(); errors shared by every command,
+    such as connection errors or an expired token, are logged and exit.
+
     :param method: the request method to execute
     :param path: path after server and port (i.e. /api/v1/credentials)
     :param params: uri encoding params (i.e. ?param1=hello&param2=world)
@@ -162,65 +724,39 @@ def request(
     :param parser: parser for printing usage on failure
     :param headers: headers to include
     :param min_server_version: min qpc server version allowed
-    :returns: reponse object
+    :param stream: if True, a GET response body is left unread so the caller
+        can consume it in chunks (i.e. with iter_content())
+    :param compress: if True, a POST payload is sent gzip-encoded (see
+        send_request)
+    :returns: QPCResponse object wrapping the server response
     :raises: AssertionError error if method is not supported
     """
+    if method not in SUPPORTED_METHODS:
+        logger.error("Unsupported request method %s", method)
+        parser.print_help()
+        sys.exit(1)
     # grab the cli command for the log if the parser is provided
     log_command = None
     if parser is not None:
         log_command = parser.prog
-    req_headers = {}
-    token = read_client_token()
-    # create the url by adding the path to the configured server location
-    url = get_server_location() + path
-    if headers:
-        req_headers.update(headers)
-    if token:
-        req_headers["Authorization"] = f"Token {token}"
-
     try:
-        if method == POST:
-            result = handle_general_errors(
-                post(url, payload, req_headers), min_server_version
-            )
-        elif method == GET:
-            result = handle_general_errors(
-                get(url, params, req_headers), min_server_version
-            )
-        elif method == PATCH:
-            result = handle_general_errors(
-                patch(url, payload, req_headers), min_server_version
-            )
-        elif method == DELETE:
-            result = handle_general_errors(delete(url, req_headers), min_server_version)
-        elif method == PUT:
-            result = handle_general_errors(
-                put(url, payload, req_headers), min_server_version
-            )
-        else:
-            logger.error("Unsupported request method %s", method)
-            parser.print_help()
-            sys.exit(1)
-        try:
-            log_request_info(
-                method, log_command, url, result.json(), result.status_code
-            )
-        except ValueError:
-            log_request_info(method, log_command, url, result.text, result.status_code)
-        return result
-    except (requests.exceptions.ConnectionError, requests.exceptions.SSLError):
-        config = read_server_config()
-        if config is not None:
-            protocol = "https"
-            host = config.get(CONFIG_HOST_KEY)
-            port = config.get(CONFIG_PORT_KEY)
-            if config.get(CONFIG_USE_HTTP):
-                protocol = "http"
-            logger.error(
-                _(CONNECTION_ERROR_MSG),
-                {"protocol": protocol, "host": host, "port": port}
-            )
-            logger.error(_(messages.SERVER_CONFIG_REQUIRED), PKG_NAME)
-        else:
-            logger.error(_(messages.SERVER_CONFIG_REQUIRED), PKG_NAME)
-        sys.exit(1)
+        return send_request(
+            method,
+            path,
+            params=params,
+            payload=payload,
+            headers=headers,
+            min_server_version=min_server_version,
+            stream=stream,
+            compress=compress,
+            log_command=log_command,
+        )
+    except (
+        QPCConnectionError,
+        QPCServerVersionError,
+        QPCAuthenticationError,
+        QPCServerError,
+        QPCOfflineError,
+    ) as error:
+        report_error(error)
+    return None
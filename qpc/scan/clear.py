@@ -7,7 +7,7 @@ from requests import codes
 
 from qpc import messages, scan
 from qpc.clicommand import CliCommand
-from qpc.request import DELETE, GET, request
+from qpc.request import DELETE, GET, request, run_concurrently
 from qpc.translation import _
 from qpc.utils import handle_error_response
 
@@ -51,10 +51,14 @@ class ScanClearCommand(CliCommand):
         if self.args.name:
             self.req_params = {"name": self.args.name}
 
-    def _delete_entry(self, scan_entry, print_out=True):
-        deleted = False
+    def _request_delete(self, scan_entry):
         delete_uri = scan.SCAN_URI + str(scan_entry["id"]) + "/"
-        response = request(DELETE, delete_uri, parser=self.parser)
+        return request(DELETE, delete_uri, parser=self.parser)
+
+    def _delete_entry(self, scan_entry, print_out=True, response=None):
+        deleted = False
+        if response is None:
+            response = self._request_delete(scan_entry)
         name = scan_entry["name"]
         # pylint: disable=no-member
         if response.status_code == codes.no_content:
@@ -75,16 +79,15 @@ class ScanClearCommand(CliCommand):
         if self.args.name and count == 0:
             logger.error(_(messages.SCAN_NOT_FOUND), self.args.name)
             sys.exit(1)
-        elif self.args.name and count == 1:
-            # delete single scan
-            entry = results[0]
-            if self._delete_entry(entry) is False:
+        elif self.args.name:
+            # only delete the scan with exactly that name
+            matches = [result for result in results if result["name"] == self.args.name]
+            if not matches:
+                logger.error(_(messages.SCAN_NOT_FOUND), self.args.name)
                 sys.exit(1)
-        elif self.args.name and count > 1:
-            for result in results:
-                if result["name"] == self.args.name:
-                    if self._delete_entry(result) is False:
-                        sys.exit(1)
+            for result in matches:
+                if self._delete_entry(result) is False:
+                    sys.exit(1)
         elif count == 0:
             logger.error(_(messages.SCAN_NO_SCANS_TO_REMOVE))
             sys.exit(1)
@@ -92,11 +95,15 @@ class ScanClearCommand(CliCommand):
             # remove all scan entries
             remove_error = []
             next_link = json_data.get("next")
-            for entry in results:
-                if self._delete_entry(entry, print_out=False) is False:
+            deletions = run_concurrently(self._request_delete, results)
+            for entry, response, error in deletions:
+                if error is not None:
+                    logger.error(error)
+                    remove_error.append(entry["id"])
+                elif not self._delete_entry(entry, print_out=False, response=response):
                     remove_error.append(entry["id"])
             if remove_error:
-                scan_err = ",".join(str(remove_error))
+                scan_err = ",".join(str(scan_id) for scan_id in remove_error)
                 logger.error(_(messages.SCAN_PARTIAL_REMOVE), scan_err)
                 sys.exit(1)
             else:
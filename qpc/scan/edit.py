@@ -7,7 +7,7 @@ from requests import codes
 
 from qpc import messages, scan
 from qpc.clicommand import CliCommand
-from qpc.request import GET, PATCH, request
+from qpc.request import PATCH
 from qpc.scan.utils import (
     build_scan_payload,
     get_enabled_products,
@@ -118,28 +118,7 @@ class ScanEditCommand(CliCommand):
             sys.exit(1)
 
         # check for existence of scan
-        exists = False
-        response = request(
-            parser=self.parser,
-            method=GET,
-            path=scan.SCAN_URI,
-            params={"name": self.args.name},
-            payload=None,
-        )
-        if response.status_code == codes.ok:  # pylint: disable=no-member
-            json_data = response.json()
-            count = json_data.get("count", 0)
-            results = json_data.get("results", [])
-            if count >= 1:
-                for result in results:
-                    if result["name"] == self.args.name:
-                        scan_entry = result
-                        self.req_path = self.req_path + str(scan_entry["id"]) + "/"
-                        exists = True
-            if not exists or count == 0:
-                logger.error(_(messages.SCAN_DOES_NOT_EXIST), self.args.name)
-                sys.exit(1)
-        else:
+        if self._resolve_name(scan.SCAN_URI, self.args.name) is None:
             logger.error(_(messages.SCAN_DOES_NOT_EXIST), self.args.name)
             sys.exit(1)
 
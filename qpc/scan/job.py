@@ -1,23 +1,20 @@
 """ScanListCommand is used to list system scans."""
 
 import sys
-import urllib.parse as urlparse
 from logging import getLogger
 
 from requests import codes
 
 from qpc import messages, scan
-from qpc.clicommand import CliCommand
+from qpc.clicommand import CliListCommand
 from qpc.request import GET
-from qpc.scan.utils import get_scan_object_id
 from qpc.translation import _
-from qpc.utils import pretty_print
 
 logger = getLogger(__name__)
 
 
 # pylint: disable=too-few-public-methods
-class ScanJobCommand(CliCommand):
+class ScanJobCommand(CliListCommand):
     """Defines the job command.
 
     This command is for listing the existing scan jobs for each scan.
@@ -25,11 +22,12 @@ class ScanJobCommand(CliCommand):
 
     SUBCOMMAND = scan.SUBCOMMAND
     ACTION = scan.JOB
+    FILTER_PARAMS = {"status": "status"}
 
     def __init__(self, subparsers):
         """Create command."""
         # pylint: disable=no-member
-        CliCommand.__init__(
+        CliListCommand.__init__(
             self,
             self.SUBCOMMAND,
             self.ACTION,
@@ -64,7 +62,7 @@ class ScanJobCommand(CliCommand):
 
     def _validate_args(self):
         """Validate the scan job arguments."""
-        CliCommand._validate_args(self)
+        CliListCommand._validate_args(self)
         if self.args.id and self.args.name:
             self.parser.print_usage()
             sys.exit(1)
@@ -76,44 +74,24 @@ class ScanJobCommand(CliCommand):
     def _build_req_params(self):
         """Add filter by scan_type/state query param."""
         if "name" in self.args and self.args.name:
-            found, scan_object_id = get_scan_object_id(self.parser, self.args.name)
-            if found:
-                self.req_path += scan_object_id + "jobs/"
-            else:
+            if self._resolve_name(scan.SCAN_URI, self.args.name, "jobs/") is None:
+                logger.error(_(messages.SCAN_DOES_NOT_EXIST), self.args.name)
                 sys.exit(1)
         if "id" in self.args and self.args.id:
             self.req_path = scan.SCAN_JOB_URI + str(self.args.id) + "/"
         if "status" in self.args and self.args.status:
             self.req_params = {"status": self.args.status}
 
-    def _handle_response_success(self):
-        # pylint: disable=no-member
-        if self.response.status_code in [codes.ok]:
-            json_data = self.response.json()
-            count = json_data.get("count", 0)
-            results = json_data.get("results", [])
-            if count == 0:
-                # if GET is used for single scan job,
-                # count doesn't exist and will be 0
-                if "id" in self.args and self.args.id:
-                    data = pretty_print(json_data)
-                    print(data)
-                else:
-                    logger.error(_(messages.SCAN_LIST_NO_SCANS))
-                    sys.exit(1)
+    def _handle_results(self, json_data):
+        count = json_data.get("count", 0)
+        results = json_data.get("results", [])
+        if count == 0:
+            # if GET is used for single scan job,
+            # count doesn't exist and will be 0
+            if "id" in self.args and self.args.id:
+                self._print_json(json_data)
             else:
-                data = pretty_print(results)
-                print(data)
-            if json_data.get("next"):
-                next_link = json_data.get("next")
-                params = urlparse.parse_qs(urlparse.urlparse(next_link).query)
-                page = params.get("page", ["1"])[0]
-                if self.req_params:
-                    self.req_params["page"] = page
-                else:
-                    self.req_params = {"page": page}
-                input(_(messages.NEXT_RESULTS))
-                self._do_command()
+                logger.error(_(messages.SCAN_LIST_NO_SCANS))
+                sys.exit(1)
         else:
-            logger.error(_(messages.SCAN_LIST_NO_SCANS))
-            sys.exit(1)
+            self._print_json(results)
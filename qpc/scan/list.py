@@ -1,21 +1,19 @@
 """ScanListCommand is used to list system scans."""
 
-import urllib.parse as urlparse
 from logging import getLogger
 
 from requests import codes
 
 from qpc import messages, scan
-from qpc.clicommand import CliCommand
+from qpc.clicommand import CliListCommand
 from qpc.request import GET
 from qpc.translation import _
-from qpc.utils import pretty_print
 
 logger = getLogger(__name__)
 
 
 # pylint: disable=too-few-public-methods
-class ScanListCommand(CliCommand):
+class ScanListCommand(CliListCommand):
     """Defines the list command.
 
     This command is for listing sources scans used to gather system facts.
@@ -23,11 +21,12 @@ class ScanListCommand(CliCommand):
 
     SUBCOMMAND = scan.SUBCOMMAND
     ACTION = scan.LIST
+    FILTER_PARAMS = {"name": "name", "scan_type": "scan_type"}
 
     def __init__(self, subparsers):
         """Create command."""
         # pylint: disable=no-member
-        CliCommand.__init__(
+        CliListCommand.__init__(
             self,
             self.SUBCOMMAND,
             self.ACTION,
@@ -51,23 +50,10 @@ class ScanListCommand(CliCommand):
         if "type" in self.args and self.args.type:
             self.req_params["scan_type"] = self.args.type
 
-    def _handle_response_success(self):
-        json_data = self.response.json()
+    def _handle_results(self, json_data):
         count = json_data.get("count", 0)
         results = json_data.get("results", [])
         if count == 0:
             logger.error(_(messages.SCAN_LIST_NO_SCANS))
         else:
-            data = pretty_print(results)
-            print(data)
-
-        if json_data.get("next"):
-            next_link = json_data.get("next")
-            params = urlparse.parse_qs(urlparse.urlparse(next_link).query)
-            page = params.get("page", ["1"])[0]
-            if self.req_params:
-                self.req_params["page"] = page
-            else:
-                self.req_params = {"page": page}
-            input(_(messages.NEXT_RESULTS))
-            self._do_command()
+            self._print_json(results)
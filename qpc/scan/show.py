@@ -7,9 +7,8 @@ from requests import codes
 
 from qpc import messages, scan
 from qpc.clicommand import CliCommand
-from qpc.request import GET, request
+from qpc.request import GET
 from qpc.translation import _
-from qpc.utils import pretty_print
 
 logger = getLogger(__name__)
 
@@ -44,34 +43,17 @@ class ScanShowCommand(CliCommand):
             help=_(messages.SCAN_NAME_HELP),
             required=True,
         )
+        self._add_output_argument()
 
     def _validate_args(self):
         CliCommand._validate_args(self)
-        found = False
-        response = request(
-            parser=self.parser,
-            method=GET,
-            path=scan.SCAN_URI,
-            params={"name": self.args.name},
-            payload=None,
-        )
-        if response.status_code == codes.ok:  # pylint: disable=no-member
-            json_data = response.json()
-            count = json_data.get("count", 0)
-            results = json_data.get("results", [])
-            if count >= 1:
-                for result in results:
-                    if result["name"] == self.args.name:
-                        self.req_path = self.req_path + str(result["id"]) + "/"
-                        found = True
-            if not found or count == 0:
-                logger.error(_(messages.SCAN_DOES_NOT_EXIST), self.args.name)
-                sys.exit(1)
+        if self._resolve_name(scan.SCAN_URI, self.args.name) is None:
+            logger.error(_(messages.SCAN_DOES_NOT_EXIST), self.args.name)
+            sys.exit(1)
 
     def _handle_response_success(self):
         json_data = self.response.json()
-        data = pretty_print(json_data)
-        print(data)
+        self._print_json(json_data)
 
     def _handle_response_error(self):  # pylint: disable=arguments-differ
         logger.error(_(messages.SCAN_DOES_NOT_EXIST), self.args.name)
@@ -1,14 +1,12 @@
 """ScanStartCommand is used to trigger a host scan."""
 
-import sys
 from logging import getLogger
 
 from requests import codes
 
-from qpc import messages, scan
+from qpc import api, messages, scan
 from qpc.clicommand import CliCommand
 from qpc.request import POST
-from qpc.scan.utils import get_scan_object_id
 from qpc.translation import _
 
 logger = getLogger(__name__)
@@ -45,16 +43,6 @@ class ScanStartCommand(CliCommand):
             required=True,
         )
 
-    def _validate_args(self):
-        CliCommand._validate_args(self)
-        if self.args.name:
-            # check for existence of scan object
-            found, scan_object_id = get_scan_object_id(self.parser, self.args.name)
-            if found is False:
-                sys.exit(1)
-            else:
-                self.req_path = scan.SCAN_URI + scan_object_id + "jobs/"
-
-    def _handle_response_success(self):
-        json_data = self.response.json()
-        logger.info(_(messages.SCAN_STARTED), json_data.get("id"))
+    def _do_command(self):
+        job = api.start_scan(self.args.name)
+        logger.info(_(messages.SCAN_STARTED), job.get("id"))
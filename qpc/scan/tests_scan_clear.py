@@ -179,6 +179,20 @@ class ScanClearCliTests(unittest.TestCase):
                     )
                     self.assertTrue(expected in scan_out.getvalue())
 
+    def test_clear_all_with_errors_lists_ids(self):
+        """Testing the ids of every scan that failed to delete are logged."""
+        get_url = get_server_location() + SCAN_URI
+        results = [{"id": 1, "name": "scan1"}, {"id": 12, "name": "scan12"}]
+        with requests_mock.Mocker() as mocker:
+            mocker.get(get_url, status_code=200, json={"count": 2, "results": results})
+            mocker.delete(get_url + "1/", status_code=400, json={})
+            mocker.delete(get_url + "12/", status_code=400, json={})
+            ncc = ScanClearCommand(SUBPARSER)
+            with self.assertLogs(level="ERROR") as log:
+                with self.assertRaises(SystemExit):
+                    ncc.main(Namespace(name=None))
+            self.assertIn(messages.SCAN_PARTIAL_REMOVE % "1,12", log.output[-1])
+
     def test_clear_all(self):
         """Testing the clear scan command successfully with stubbed data."""
         get_url = get_server_location() + SCAN_URI
@@ -2,10 +2,9 @@
 
 from logging import getLogger
 
-from requests import codes
-
-from qpc import messages, scan, source
-from qpc.request import GET, request
+from qpc import messages, names, scan, source
+from qpc.clicommand import find_by_name
+from qpc.request import run_concurrently
 from qpc.translation import _
 
 logger = getLogger(__name__)
@@ -19,62 +18,29 @@ def get_source_ids(parser, source_names):
     """
     not_found = False
     source_ids = []
-    for source_name in set(source_names):
+
+    def get_source(source_name):
         # check for existence of source
-        response = request(
-            parser=parser,
-            method=GET,
-            path=source.SOURCE_URI,
-            params={"name": source_name},
-            payload=None,
+        fields, _cached = names.resolve(
+            source.SOURCE_URI,
+            source_name,
+            lambda name: find_by_name(parser, source.SOURCE_URI, name, sole=True),
         )
-        if response.status_code == codes.ok:  # pylint: disable=no-member
-            json_data = response.json()
-            count = json_data.get("count", 0)
-            results = json_data.get("results", [])
-            if count == 1:
-                source_entry = results[0]
-                source_ids.append(source_entry["id"])
-            else:
-                logger.error(_(messages.SOURCE_DOES_NOT_EXIST), source_name)
-                not_found = True
+        return fields
+
+    # drop duplicates while keeping the order given on the command line
+    source_names = list(dict.fromkeys(source_names))
+    for source_name, source_entry, error in run_concurrently(get_source, source_names):
+        if error is not None:
+            logger.error(error)
+        if error is None and source_entry is not None:
+            source_ids.append(source_entry["id"])
         else:
             logger.error(_(messages.SOURCE_DOES_NOT_EXIST), source_name)
             not_found = True
     return not_found, source_ids
 
 
-def get_scan_object_id(parser, name):
-    """Grab the scan id from the scan object if it exists.
-
-    :returns Boolean regarding the existence of the object &
-    the scan object id
-    """
-    found = False
-    scan_object_id = None
-    response = request(
-        parser=parser,
-        method=GET,
-        path=scan.SCAN_URI,
-        params={"name": name},
-        payload=None,
-    )
-    if response.status_code == codes.ok:  # pylint: disable=no-member
-        json_data = response.json()
-        count = json_data.get("count", 0)
-        results = json_data.get("results", [])
-        if count >= 1:
-            for result in results:
-                if result["name"] == name:
-                    scan_object_id = str(result["id"]) + "/"
-                    found = True
-        if not found or count == 0:
-            logger.error(_(messages.SCAN_DOES_NOT_EXIST), name)
-    else:
-        logger.error(_(messages.SCAN_DOES_NOT_EXIST), name)
-    return found, scan_object_id
-
-
 def get_optional_products(disabled_optional_products):
     """Construct a dictionary based on the disable-optional-products args.
 
@@ -4,11 +4,20 @@ from argparse import SUPPRESS
 from logging import getLogger
 
 import qpc.server as config
-from qpc import messages
+from qpc import messages, mirror, names
 from qpc.clicommand import CliCommand
 from qpc.source.utils import validate_port
 from qpc.translation import _
-from qpc.utils import write_server_config
+from qpc.utils import (
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_CACHE_MAX_SIZE,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BUDGET,
+    validate_non_negative_int,
+    validate_positive_int,
+    write_server_config,
+)
 
 logger = getLogger(__name__)
 
@@ -59,6 +68,65 @@ class ConfigureHostCommand(CliCommand):
             help=_(messages.SERVER_CONFIG_SSL_CERT_HELP),
             required=False,
         )
+        self.parser.add_argument(
+            "--pool-size",
+            dest="pool_size",
+            metavar="POOL_SIZE",
+            type=validate_positive_int,
+            default=DEFAULT_POOL_SIZE,
+            help=_(messages.SERVER_CONFIG_POOL_SIZE_HELP),
+            required=False,
+        )
+        self.parser.add_argument(
+            "--disable-keep-alive",
+            dest="keep_alive",
+            action="store_false",
+            help=_(messages.SERVER_CONFIG_DISABLE_KEEP_ALIVE_HELP),
+            required=False,
+        )
+        self.parser.add_argument(
+            "--retries",
+            dest="retries",
+            metavar="RETRIES",
+            type=validate_non_negative_int,
+            default=DEFAULT_RETRIES,
+            help=_(messages.SERVER_CONFIG_RETRIES_HELP),
+            required=False,
+        )
+        self.parser.add_argument(
+            "--retry-budget",
+            dest="retry_budget",
+            metavar="RETRY_BUDGET",
+            type=validate_non_negative_int,
+            default=DEFAULT_RETRY_BUDGET,
+            help=_(messages.SERVER_CONFIG_RETRY_BUDGET_HELP),
+            required=False,
+        )
+        self.parser.add_argument(
+            "--compress-requests",
+            dest="compress_requests",
+            action="store_true",
+            help=_(messages.SERVER_CONFIG_COMPRESS_REQUESTS_HELP),
+            required=False,
+        )
+        self.parser.add_argument(
+            "--cache-max-size",
+            dest="cache_max_size",
+            metavar="BYTES",
+            type=validate_non_negative_int,
+            default=DEFAULT_CACHE_MAX_SIZE,
+            help=_(messages.SERVER_CONFIG_CACHE_MAX_SIZE_HELP),
+            required=False,
+        )
+        self.parser.add_argument(
+            "--cache-max-age",
+            dest="cache_max_age",
+            metavar="SECONDS",
+            type=validate_non_negative_int,
+            default=DEFAULT_CACHE_MAX_AGE,
+            help=_(messages.SERVER_CONFIG_CACHE_MAX_AGE_HELP),
+            required=False,
+        )
         self.parser.add_argument(
             "--use-http",
             dest="use_http",
@@ -82,8 +150,19 @@ class ConfigureHostCommand(CliCommand):
             "use_http": self.args.use_http,
             "ssl_verify": self.args.ssl_verify,
             "require_token": self.args.require_token,
+            "pool_size": self.args.pool_size,
+            "keep_alive": self.args.keep_alive,
+            "retries": self.args.retries,
+            "retry_budget": self.args.retry_budget,
+            "cache_max_size": self.args.cache_max_size,
+            "cache_max_age": self.args.cache_max_age,
+            "compress_requests": self.args.compress_requests,
         }
         write_server_config(server_config)
+        # ids cached by name and mirrored objects belong to the server
+        # configured before
+        names.clear()
+        mirror.clear()
         protocol = "https"
         if self.args.use_http:
             protocol = "http"
@@ -93,5 +172,5 @@ class ConfigureHostCommand(CliCommand):
                 "protocol": protocol,
                 "host": self.args.host,
                 "port": self.args.port,
-            }
+            },
         )
@@ -0,0 +1,222 @@
+"""Cache of what qpc learned about the server between invocations.
+
+For each server location and client token, the server version announced
+in the X-Server-Version header and the capabilities detected while
+talking to the server (i.e. whether it accepts compressed requests) are
+kept in a small file under the qpc data directory. Entries expire after
+SERVER_INFO_TTL seconds, and capabilities are forgotten whenever the
+server version changes.
+
+Commands check the cached version before sending anything (see
+check_server_version), so a server known to be too old is refused without
+a request. The minimum versions of the features some commands need are
+named in FEATURE_VERSIONS instead of being spelled out by each command.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+
+from qpc import messages, utils
+from qpc.exceptions import QPCServerVersionError
+from qpc.translation import _
+from qpc.utils import (
+    get_compress_requests,
+    get_server_location,
+    parse_version,
+    read_client_token,
+)
+
+SERVER_INFO_TTL = 60 * 60
+
+# the server accepts request bodies sent with Content-Encoding: gzip
+CAPABILITY_COMPRESSED_REQUESTS = "compressed_requests"
+# the server returns as many results per page as the page_size parameter
+# asks for
+CAPABILITY_PAGE_SIZE = "page_size"
+
+# features of the server some commands need, and the server version that
+# introduced them; these do not change when QPC_MIN_SERVER_VERSION does
+FEATURE_INSIGHTS_REPORT = "insights_report"
+FEATURE_MASKED_REPORTS = "masked_reports"
+FEATURE_VERSIONS = {
+    FEATURE_INSIGHTS_REPORT: "0.9.0",
+    FEATURE_MASKED_REPORTS: "0.9.2",
+}
+
+# entries loaded from disk, keyed by server location and token digest
+_entries = None
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def is_version_supported(server_version, min_server_version):
+    """Check whether a server version satisfies a minimum version.
+
+    Development builds (version 0.0.0) are always accepted.
+
+    :param server_version: version announced by the server
+    :param min_server_version: minimum version required by the command
+    :returns: True if the server is recent enough
+    """
+    if "0.0.0" in server_version:
+        return True
+    return parse_version(server_version) >= parse_version(min_server_version)
+
+
+def get_min_server_version(feature):
+    """Return the minimum server version of a feature.
+
+    :param feature: feature name (i.e. FEATURE_MASKED_REPORTS)
+    :returns: version string
+    """
+    return FEATURE_VERSIONS[feature]
+
+
+def check_server_version(min_server_version, server_version=None):
+    """Check that the server is recent enough.
+
+    :param min_server_version: minimum version required by the command
+    :param server_version: version announced by a response; the cached
+        version of the configured server when None, in which case an
+        unknown version passes
+    :raises: QPCServerVersionError if the server is too old
+    """
+    if server_version is None:
+        server_version = get_server_version()
+        if server_version is None:
+            return
+    if not is_version_supported(server_version, min_server_version):
+        raise QPCServerVersionError(
+            _(messages.SERVER_TOO_OLD_FOR_CLI)
+            % {"min_version": min_server_version, "current_version": server_version}
+        )
+
+
+def _server_key():
+    """Identify the configured server and the credentials used with it."""
+    token = read_client_token() or ""
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return f"{get_server_location()}#{digest}"
+
+
+def _load():
+    """Return the cached entries, reading the file on first use."""
+    global _entries  # pylint: disable=global-statement
+    if _entries is None:
+        try:
+            with open(utils.QPC_SERVER_INFO, encoding="utf-8") as info_file:
+                _entries = json.load(info_file)
+        except (OSError, ValueError):
+            _entries = {}
+        if not isinstance(_entries, dict):
+            _entries = {}
+    return _entries
+
+
+def _save():
+    """Write the cached entries; failing to do so only costs a cache miss."""
+    tmp_path = f"{utils.QPC_SERVER_INFO}.{os.getpid()}.tmp"
+    try:
+        utils.ensure_data_dir_exists()
+        with open(tmp_path, "w", encoding="utf-8") as info_file:
+            json.dump(_entries, info_file)
+        os.replace(tmp_path, utils.QPC_SERVER_INFO)
+    except OSError:
+        pass
+
+
+def _fresh(entry):
+    """Check whether an entry was confirmed by the server recently."""
+    return entry is not None and time.time() - entry["checked_at"] <= SERVER_INFO_TTL
+
+
+def reset_server_info():
+    """Forget the entries read from disk, so the next call reads them again."""
+    global _entries  # pylint: disable=global-statement
+    with _lock:
+        _entries = None
+
+
+def get_server_version():
+    """Return the version of the configured server, if recently seen.
+
+    :returns: version string, or None
+    """
+    with _lock:
+        entry = _load().get(_server_key())
+        if _fresh(entry):
+            return entry["version"]
+    return None
+
+
+def record_server_version(version):
+    """Remember the version announced by the configured server.
+
+    The file is only written when the version changed or the entry is
+    about to expire, not for every response.
+
+    :param version: value of the X-Server-Version header
+    """
+    with _lock:
+        entries = _load()
+        key = _server_key()
+        entry = entries.get(key)
+        if entry is not None and entry["version"] == version:
+            if time.time() - entry["checked_at"] <= SERVER_INFO_TTL / 2:
+                return
+        else:
+            entry = {"version": version, "capabilities": {}}
+        entry["checked_at"] = time.time()
+        entries[key] = entry
+        _save()
+
+
+def get_capability(name, default=None):
+    """Return what is known about a capability of the configured server.
+
+    :param name: capability name (i.e. CAPABILITY_COMPRESSED_REQUESTS)
+    :param default: value returned when the capability is unknown
+    :returns: the recorded value, or default
+    """
+    with _lock:
+        entry = _load().get(_server_key())
+        if _fresh(entry):
+            return entry["capabilities"].get(name, default)
+    return default
+
+
+def set_capability(name, value):
+    """Record a capability of the configured server.
+
+    :param name: capability name (i.e. CAPABILITY_COMPRESSED_REQUESTS)
+    :param value: JSON serializable value
+    """
+    with _lock:
+        entries = _load()
+        key = _server_key()
+        entry = entries.get(key)
+        if entry is None:
+            entry = {"version": None, "capabilities": {}, "checked_at": time.time()}
+        if entry["capabilities"].get(name) == value and key in entries:
+            return
+        entry["capabilities"][name] = value
+        entries[key] = entry
+        _save()
+
+
+def use_compressed_requests(requested=False):
+    """Decide whether a large request body should be sent gzip-encoded.
+
+    :param requested: True if the user asked for compression (--compress)
+    :returns: True if requested, enabled in the server config, or known
+        to be supported by the server
+    """
+    return (
+        requested
+        or get_compress_requests()
+        or get_capability(CAPABILITY_COMPRESSED_REQUESTS, False)
+    )
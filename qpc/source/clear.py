@@ -7,7 +7,7 @@ from requests import codes
 
 from qpc import messages, source
 from qpc.clicommand import CliCommand
-from qpc.request import DELETE, GET, request
+from qpc.request import DELETE, GET, request, run_concurrently
 from qpc.translation import _
 from qpc.utils import handle_error_response
 
@@ -52,10 +52,14 @@ class SourceClearCommand(CliCommand):
         if self.args.name:
             self.req_params = {"name": self.args.name}
 
-    def _delete_entry(self, source_entry, print_out=True):
-        deleted = False
+    def _request_delete(self, source_entry):
         delete_uri = source.SOURCE_URI + str(source_entry["id"]) + "/"
-        response = request(DELETE, delete_uri, parser=self.parser)
+        return request(DELETE, delete_uri, parser=self.parser)
+
+    def _delete_entry(self, source_entry, print_out=True, response=None):
+        deleted = False
+        if response is None:
+            response = self._request_delete(source_entry)
         name = source_entry["name"]
         # pylint: disable=no-member
         if response.status_code == codes.no_content:
@@ -87,8 +91,12 @@ class SourceClearCommand(CliCommand):
             # remove all entries
             remove_error = []
             next_link = json_data.get("next")
-            for entry in results:
-                if self._delete_entry(entry, print_out=False) is False:
+            deletions = run_concurrently(self._request_delete, results)
+            for entry, response, error in deletions:
+                if error is not None:
+                    logger.error(error)
+                    remove_error.append(entry["name"])
+                elif not self._delete_entry(entry, print_out=False, response=response):
                     remove_error.append(entry["name"])
             if remove_error:
                 cred_err = ",".join(remove_error)
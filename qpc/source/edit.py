@@ -147,24 +147,7 @@ class SourceEditCommand(CliCommand):
                 pass
 
         # check for existence of source
-        response = request(
-            parser=self.parser,
-            method=GET,
-            path=source.SOURCE_URI,
-            params={"name": self.args.name},
-            payload=None,
-        )
-        if response.status_code == codes.ok:  # pylint: disable=no-member
-            json_data = response.json()
-            count = json_data.get("count", 0)
-            results = json_data.get("results", [])
-            if count == 1:
-                source_entry = results[0]
-                self.req_path = self.req_path + str(source_entry["id"]) + "/"
-            else:
-                logger.error(_(messages.SOURCE_DOES_NOT_EXIST), self.args.name)
-                sys.exit(1)
-        else:
+        if self._resolve_name(source.SOURCE_URI, self.args.name, sole=True) is None:
             logger.error(_(messages.SOURCE_DOES_NOT_EXIST), self.args.name)
             sys.exit(1)
 
@@ -194,8 +177,9 @@ class SourceEditCommand(CliCommand):
                     logger.error(
                         _(messages.SOURCE_EDIT_CREDS_NOT_FOUND),
                         {
-                            "reference": not_found_str, "source": self.args.name,
-                        }
+                            "reference": not_found_str,
+                            "source": self.args.name,
+                        },
                     )
                     sys.exit(1)
             else:
@@ -9,7 +9,6 @@ from qpc import messages, source
 from qpc.clicommand import CliCommand
 from qpc.request import GET
 from qpc.translation import _
-from qpc.utils import pretty_print
 
 logger = getLogger(__name__)
 
@@ -44,6 +43,7 @@ class SourceShowCommand(CliCommand):
             help=_(messages.SOURCE_NAME_HELP),
             required=True,
         )
+        self._add_output_argument()
 
     def _build_req_params(self):
         self.req_params = {"name": self.args.name}
@@ -54,8 +54,7 @@ class SourceShowCommand(CliCommand):
         results = json_data.get("results", [])
         if count == 1:
             cred_entry = results[0]
-            data = pretty_print(cred_entry)
-            print(data)
+            self._print_json(cred_entry)
         else:
             logger.error(_(messages.SOURCE_DOES_NOT_EXIST), self.args.name)
             sys.exit(1)
@@ -0,0 +1,3 @@
+"""Constants for the sync command."""
+
+SUBCOMMAND = "sync"
@@ -0,0 +1,96 @@
+"""SyncCommand is used to mirror the server inventory in a local database."""
+
+from contextlib import closing
+from logging import getLogger
+
+from qpc import api, messages, mirror, sync
+from qpc.clicommand import CliCommand
+from qpc.request import run_concurrently
+from qpc.translation import _
+
+logger = getLogger(__name__)
+
+# functions listing the objects of each kind without a parent
+LISTERS = {
+    mirror.CREDENTIAL: api.list_credentials,
+    mirror.SOURCE: api.list_sources,
+}
+
+
+# pylint: disable=too-few-public-methods
+class SyncCommand(CliCommand):
+    """Defines the sync command.
+
+    This command copies the credentials, sources, scans and scan jobs of
+    the server into the mirror used by the --offline and --max-staleness
+    options.
+    """
+
+    SUBCOMMAND = sync.SUBCOMMAND
+    ACTION = None
+
+    def __init__(self, subparsers):
+        """Create command."""
+        # pylint: disable=no-member
+        CliCommand.__init__(
+            self,
+            self.SUBCOMMAND,
+            self.ACTION,
+            subparsers.add_parser(self.SUBCOMMAND),
+            None,
+            None,
+            [],
+        )
+
+    @staticmethod
+    def _log_summary(kind, count, changed, removed):
+        """Log how many objects of a kind were synced."""
+        logger.info(
+            _(messages.SYNC_SUMMARY),
+            {
+                "kind": kind,
+                "count": count,
+                "changed": len(changed),
+                "removed": len(removed),
+            },
+        )
+
+    def _sync_scans(self, connection):
+        """Sync the scans, and the jobs of the scans that changed.
+
+        Scans and jobs are written in one transaction, so a scan is only
+        recorded as unchanged once its jobs are mirrored.
+        """
+        scans = api.list_scans()
+        with connection:
+            changed, removed = mirror.store(connection, mirror.SCAN, scans)
+            mirror.remove_children(connection, mirror.SCAN_JOB, removed)
+            self._log_summary(mirror.SCAN, len(scans), changed, removed)
+            jobs = 0
+            changed_jobs, removed_jobs = [], []
+            for scan_id, results, error in run_concurrently(
+                api.list_scan_jobs, changed
+            ):
+                if error is not None:
+                    raise error
+                job_changes = mirror.store(
+                    connection, mirror.SCAN_JOB, results, parent_id=scan_id
+                )
+                jobs += len(results)
+                changed_jobs.extend(job_changes[0])
+                removed_jobs.extend(job_changes[1])
+            self._log_summary(mirror.SCAN_JOB, jobs, changed_jobs, removed_jobs)
+            mirror.mark_synced(connection, mirror.SCAN)
+            mirror.mark_synced(connection, mirror.SCAN_JOB)
+
+    def _do_command(self):
+        """Mirror every kind of object."""
+        with mirror.mirror_disabled(), closing(mirror.connect(create=True)) as db:
+            for kind, lister in LISTERS.items():
+                objects = lister()
+                with db:
+                    changed, removed = mirror.store(db, kind, objects)
+                    mirror.mark_synced(db, kind)
+                self._log_summary(kind, len(objects), changed, removed)
+            self._sync_scans(db)
+        logger.info(_(messages.SYNC_DONE), mirror.get_mirror_path())
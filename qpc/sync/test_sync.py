@@ -0,0 +1,135 @@
+"""Test the sync command and the requests answered from the mirror."""
+
+import json
+import os
+import sys
+from argparse import ArgumentParser, Namespace
+
+import pytest
+
+from qpc import mirror, utils
+from qpc.cli import CLI
+from qpc.cred import CREDENTIAL_URI
+from qpc.request import DELETE, GET, request
+from qpc.scan import SCAN_JOB_URI, SCAN_URI
+from qpc.source import SOURCE_URI
+from qpc.sync.run import SyncCommand
+from qpc.utils import get_server_location, write_server_config
+
+CREDENTIALS = [{"id": 1, "name": "cred1", "cred_type": "network"}]
+SOURCES = [
+    {"id": 1, "name": "source1", "source_type": "network"},
+    {"id": 2, "name": "source2", "source_type": "vcenter"},
+]
+SCANS = [
+    {"id": 1, "name": "scan1", "scan_type": "inspect", "most_recent": {"id": 1}},
+    {"id": 2, "name": "scan2", "scan_type": "connect", "most_recent": {"id": 2}},
+]
+JOBS = {
+    1: [{"id": 1, "status": "completed", "scan_type": "inspect"}],
+    2: [{"id": 2, "status": "running", "scan_type": "connect"}],
+}
+
+
+def page(results):
+    """Return a single page list response."""
+    return {"count": len(results), "next": None, "results": results}
+
+
+@pytest.fixture
+def server(server_config, requests_mock):
+    """Answer the list requests of a sync; return the mocked job lists."""
+    location = get_server_location()
+    requests_mock.get(location + CREDENTIAL_URI, json=page(CREDENTIALS))
+    requests_mock.get(location + SOURCE_URI, json=page(SOURCES))
+    requests_mock.get(location + SCAN_URI, json=page(SCANS))
+    return {
+        scan_id: requests_mock.get(
+            f"{location}{SCAN_URI}{scan_id}/jobs/", json=page(jobs)
+        )
+        for scan_id, jobs in JOBS.items()
+    }
+
+
+def sync():
+    """Run qpc sync."""
+    SyncCommand(ArgumentParser().add_subparsers()).main(Namespace())
+
+
+def run_qpc(*argv):
+    """Run a qpc command line."""
+    sys.argv = ["/bin/qpc", *argv]
+    CLI().main()
+
+
+def test_sync_is_incremental(server, requests_mock):
+    """Jobs are only fetched again for the scans that changed."""
+    sync()
+    assert [jobs.call_count for jobs in server.values()] == [1, 1]
+    changed = [SCANS[0], dict(SCANS[1], most_recent={"id": 3})]
+    requests_mock.get(get_server_location() + SCAN_URI, json=page(changed))
+    sync()
+    assert [jobs.call_count for jobs in server.values()] == [1, 2]
+
+
+def test_offline_answers_from_mirror(server, requests_mock, capsys):
+    """List, show and scan job commands are answered without the server."""
+    sync()
+    capsys.readouterr()
+    calls = requests_mock.call_count
+    run_qpc("--offline", "source", "list", "--type", "vcenter")
+    assert json.loads(capsys.readouterr().out) == [SOURCES[1]]
+    run_qpc("--offline", "scan", "show", "--name", "scan2")
+    assert json.loads(capsys.readouterr().out) == SCANS[1]
+    run_qpc("--offline", "scan", "job", "--name", "scan1", "--status", "completed")
+    assert json.loads(capsys.readouterr().out) == JOBS[1]
+    assert requests_mock.call_count == calls
+
+
+def test_offline_without_mirror(server_config):
+    """Offline requests the mirror can not answer fail."""
+    with pytest.raises(SystemExit):
+        run_qpc("--offline", "cred", "list")
+
+
+def test_max_staleness(server, requests_mock):
+    """A fresh mirror answers, and a change made by qpc makes it stale."""
+    sync()
+    calls = requests_mock.call_count
+    mirror.set_mirror_mode(max_staleness=60)
+    assert request(GET, CREDENTIAL_URI).json()["results"] == CREDENTIALS
+    assert request(GET, f"{SCAN_JOB_URI}2/").json() == JOBS[2][0]
+    assert requests_mock.call_count == calls
+    requests_mock.delete(get_server_location() + CREDENTIAL_URI + "1/")
+    request(DELETE, CREDENTIAL_URI + "1/")
+    request(GET, CREDENTIAL_URI)
+    assert requests_mock.call_count == calls + 2
+
+
+def test_get_keeps_mirror_fresh(server, requests_mock, monkeypatch):
+    """GET requests, in a sync or after it, leave the mirror synced.
+
+    Sync sends the scan job requests while it holds the database write lock,
+    so a GET touching the database would wait for the lock to time out.
+    """
+    invalidated = []
+    with monkeypatch.context() as patch:
+        patch.setattr(mirror, "invalidate", invalidated.append)
+        sync()
+        request(GET, CREDENTIAL_URI)
+    assert not invalidated
+    calls = requests_mock.call_count
+    mirror.set_mirror_mode(max_staleness=60)
+    assert request(GET, CREDENTIAL_URI).json()["results"] == CREDENTIALS
+    assert requests_mock.call_count == calls
+
+
+def test_host_change(server, requests_mock):
+    """The mirror of a server never answers for another one."""
+    sync()
+    write_server_config({"host": "other", "port": 8000, "use_http": True})
+    mirror.set_mirror_mode(max_staleness=60)
+    requests_mock.get(get_server_location() + CREDENTIAL_URI, json=page([]))
+    assert request(GET, CREDENTIAL_URI).json()["results"] == []
+    run_qpc("server", "config", "--host", "new", "--use-http", "--disable-auth")
+    assert not os.listdir(utils.QPC_MIRROR_DIR)
@@ -0,0 +1,98 @@
+"""Test the qpc.api module."""
+
+import pytest
+
+from qpc import api
+from qpc.cred import CREDENTIAL_URI
+from qpc.exceptions import (
+    QPCConnectionError,
+    QPCNotFoundError,
+    QPCRequestError,
+    QPCTimeoutError,
+)
+from qpc.report import REPORT_URI
+from qpc.scan import SCAN_JOB_URI, SCAN_URI
+from qpc.source import SOURCE_URI
+from qpc.utils import get_server_location
+
+
+@pytest.fixture
+def url(server_config):  # pylint: disable=unused-argument
+    """Return the location of the configured test server."""
+    return get_server_location()
+
+
+def test_list_credentials_follows_pages(url, requests_mock):
+    """Every page of a list is returned."""
+    next_link = f"{url}{CREDENTIAL_URI}?cred_type=network&page=2"
+    requests_mock.get(
+        f"{url}{CREDENTIAL_URI}?cred_type=network",
+        [
+            {"json": {"next": next_link, "results": [{"id": 1}]}},
+            {"json": {"next": None, "results": [{"id": 2}]}},
+        ],
+    )
+    assert api.list_credentials("network") == [{"id": 1}, {"id": 2}]
+    assert requests_mock.last_request.qs == {"cred_type": ["network"], "page": ["2"]}
+
+
+def test_find_by_name(url, requests_mock):
+    """Only an exact name matches, unless the sole result is accepted."""
+    requests_mock.get(
+        f"{url}{SOURCE_URI}?name=source", json={"results": [{"name": "Source"}]}
+    )
+    assert api.find_by_name(SOURCE_URI, "source") is None
+    assert api.find_by_name(SOURCE_URI, "source", sole=True) == {"name": "Source"}
+
+
+def test_start_scan_not_found(url, requests_mock):
+    """A missing scan raises QPCNotFoundError."""
+    requests_mock.get(f"{url}{SCAN_URI}", json={"results": [{"id": 1, "name": "b"}]})
+    with pytest.raises(QPCNotFoundError):
+        api.start_scan("a")
+
+
+def test_start_scan_unexpected_status(url, requests_mock):
+    """An unexpected answer raises QPCRequestError with the response."""
+    requests_mock.get(f"{url}{SCAN_URI}", json={"results": [{"id": 1, "name": "a"}]})
+    requests_mock.post(f"{url}{SCAN_URI}1/jobs/", status_code=400, json={"x": 1})
+    with pytest.raises(QPCRequestError) as error:
+        api.start_scan("a")
+    assert error.value.status_code == 400
+    assert error.value.response.json() == {"x": 1}
+
+
+def test_wait_for_job(url, requests_mock, mocker):
+    """Jobs are polled until they finish."""
+    sleep = mocker.patch("qpc.api.time.sleep")
+    requests_mock.get(
+        f"{url}{SCAN_JOB_URI}4",
+        [{"json": {"status": "running"}}, {"json": {"status": "completed"}}],
+    )
+    assert api.wait_for_job(4, interval=2) == {"status": "completed"}
+    sleep.assert_called_once_with(2)
+
+
+def test_wait_for_job_timeout(url, requests_mock, mocker):
+    """A job still running after the timeout raises QPCTimeoutError."""
+    mocker.patch("qpc.api.time.sleep")
+    requests_mock.get(f"{url}{SCAN_JOB_URI}4", json={"status": "running"})
+    with pytest.raises(QPCTimeoutError):
+        api.wait_for_job(4, timeout=1, interval=2)
+
+
+def test_download_report_from_scan_job(url, requests_mock, tmp_path):
+    """The report of a scan job is written to the given path."""
+    requests_mock.get(f"{url}{SCAN_JOB_URI}4", json={"report_id": 9})
+    requests_mock.get(
+        f"{url}{REPORT_URI}9", content=b"tar", headers={"X-Server-Version": "1.0.0"}
+    )
+    path = tmp_path / "report.tar.gz"
+    assert api.download_report(str(path), scan_job_id=4) == 9
+    assert path.read_bytes() == b"tar"
+
+
+def test_connection_error_raised(server_config):  # pylint: disable=unused-argument
+    """Connection errors are raised instead of exiting."""
+    with pytest.raises(QPCConnectionError):
+        api.list_scans()
@@ -0,0 +1,298 @@
+"""Test the async_request module."""
+
+import asyncio
+import json
+import socket
+from argparse import ArgumentParser, Namespace
+
+import pytest
+
+from qpc import async_request, names
+from qpc.exceptions import (
+    QPCConnectionError,
+    QPCServerError,
+    QPCServerVersionError,
+)
+from qpc.request import GET, PATCH, POST
+from qpc.server import STATUS_URI
+from qpc.server.status import ServerStatusCommand
+from qpc.utils import write_server_config
+
+
+class StubServer:
+    """Minimal keep-alive HTTP/1.1 server answering from a route table."""
+
+    def __init__(self, routes, keep_alive=True):
+        """Create server; routes maps (method, path) to (status, headers, body).
+
+        A route mapped to None closes the connection without an answer, and
+        with keep_alive False every connection is closed after one answer,
+        without a Connection: close header.
+        """
+        self.routes = routes
+        self.keep_alive = keep_alive
+        self.requests = []
+        self.connections = 0
+        self.server = None
+        self.port = None
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode().split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            self.requests.append((method, target, headers, body))
+            route = self.routes[(method, target)]
+            if route is None:
+                break
+            status, resp_headers, content = route
+            head = [f"HTTP/1.1 {status} Stub"]
+            head += [f"{name}: {value}" for name, value in resp_headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + content)
+            await writer.drain()
+            if not self.keep_alive:
+                break
+        writer.close()
+
+    async def __aenter__(self):
+        """Start listening on a free local port and point qpc at it."""
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        write_server_config(
+            {
+                "host": "127.0.0.1",
+                "port": self.port,
+                "use_http": True,
+                "require_token": False,
+            }
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Stop the server."""
+        await async_request.get_transport().close()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def json_route(data, status=200, headers=None):
+    """Build a route answering with data encoded as JSON."""
+    content = json.dumps(data).encode()
+    resp_headers = {"Content-Type": "application/json", "Content-Length": len(content)}
+    resp_headers.update(headers or {})
+    return (status, resp_headers, content)
+
+
+def test_async_get_json():
+    """Test a GET request returns the decoded JSON body and sends params."""
+    routes = {(GET, "/api/v1/sources/?name=src1"): json_route({"count": 1})}
+
+    async def run():
+        async with StubServer(routes) as stub:
+            response = await async_request.async_request(
+                GET, "/api/v1/sources/", params={"name": "src1", "page": None}
+            )
+            return stub, response
+
+    stub, response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+    assert stub.requests[0][0] == GET
+
+
+def test_async_post_payload():
+    """Test a POST request sends the payload as JSON."""
+    routes = {(POST, "/api/v1/scans/"): json_route({"id": 1}, status=201)}
+
+    async def run():
+        async with StubServer(routes) as stub:
+            response = await async_request.async_request(
+                POST, "/api/v1/scans/", payload={"name": "scan1"}
+            )
+            return stub, response
+
+    stub, response = asyncio.run(run())
+    assert response.status_code == 201
+    _, _, headers, body = stub.requests[0]
+    assert headers["content-type"] == "application/json"
+    assert json.loads(body) == {"name": "scan1"}
+
+
+def test_async_chunked_response():
+    """Test a body sent with chunked transfer encoding is reassembled."""
+    chunked = b'4\r\n{"a"\r\n3\r\n: 1\r\n1\r\n}\r\n0\r\n\r\n'
+    routes = {(GET, "/chunked/"): (200, {"Transfer-Encoding": "chunked"}, chunked)}
+
+    async def run():
+        async with StubServer(routes):
+            return await async_request.async_request(GET, "/chunked/")
+
+    response = asyncio.run(run())
+    assert response.json() == {"a": 1}
+    assert list(response.iter_content(4)) == [b'{"a"', b": 1}"]
+
+
+def test_async_reuses_connection():
+    """Test sequential and concurrent requests share kept-alive connections."""
+    routes = {(GET, "/api/v1/status/"): json_route({})}
+
+    async def run():
+        async with StubServer(routes) as stub:
+            for _ in range(3):
+                await async_request.async_request(GET, "/api/v1/status/")
+            await asyncio.gather(
+                *(async_request.async_request(GET, "/api/v1/status/") for _ in range(5))
+            )
+            return stub
+
+    stub = asyncio.run(run())
+    assert len(stub.requests) == 8
+    assert stub.connections <= 5
+
+
+def test_async_stale_connection_dropped():
+    """Test a connection the server closed while idle is not used again."""
+    routes = {(POST, "/api/v1/scans/"): json_route({"id": 1}, status=201)}
+
+    async def run():
+        async with StubServer(routes, keep_alive=False) as stub:
+            for _ in range(2):
+                await async_request.async_request(POST, "/api/v1/scans/", payload={})
+                await asyncio.sleep(0.05)
+            return stub
+
+    stub = asyncio.run(run())
+    assert (len(stub.requests), stub.connections) == (2, 2)
+
+
+@pytest.mark.parametrize("method,again", ((POST, False), (PATCH, False), (GET, True)))
+def test_async_failed_request_sent_again(method, again):
+    """Test only idempotent requests are sent again after a connection fails."""
+    routes = {(GET, "/api/v1/status/"): json_route({}), (method, "/fail/"): None}
+
+    async def run():
+        async with StubServer(routes) as stub:
+            await async_request.async_request(GET, "/api/v1/status/")
+            with pytest.raises(QPCConnectionError):
+                await async_request.async_request(method, "/fail/", payload={})
+            return stub
+
+    stub = asyncio.run(run())
+    sent = [request[1] for request in stub.requests].count("/fail/")
+    assert (sent > 1) == again
+
+
+def test_async_server_too_old():
+    """Test the server version check matches the synchronous request()."""
+    routes = {
+        (GET, "/api/v1/status/"): json_route({}, headers={"X-Server-Version": "0.1"})
+    }
+
+    async def run():
+        async with StubServer(routes):
+            await async_request.async_request(GET, "/api/v1/status/")
+
+    with pytest.raises(QPCServerVersionError):
+        asyncio.run(run())
+
+
+def test_async_server_error():
+    """Test a 500 response raises like the synchronous send_request()."""
+    routes = {(GET, "/api/v1/status/"): json_route({"detail": "boom"}, status=500)}
+
+    async def run():
+        async with StubServer(routes):
+            await async_request.async_request(GET, "/api/v1/status/")
+
+    with pytest.raises(QPCServerError):
+        asyncio.run(run())
+
+
+def test_async_connection_refused():
+    """Test a connection error is raised, naming the server."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    write_server_config(
+        {"host": "127.0.0.1", "port": port, "use_http": True, "require_token": False}
+    )
+    with pytest.raises(QPCConnectionError, match=f'with port "{port}"'):
+        asyncio.run(async_request.async_request(GET, "/api/v1/status/"))
+
+
+def test_async_pluggable_transport(server_config):
+    """Test a custom transport receives the built request."""
+
+    class FakeTransport(async_request.AsyncTransport):
+        """Record calls instead of sending them."""
+
+        calls = []
+
+        async def send(self, method, url, headers, body=None, verify=True):
+            self.calls.append((method, url, body))
+            return async_request.AsyncResponse(url, 200, {}, b"[]")
+
+    async_request.set_transport(FakeTransport())
+    response = asyncio.run(async_request.async_request(GET, "/api/v1/credentials/"))
+    assert response.json() == []
+    assert FakeTransport.calls == [
+        (GET, "http://127.0.0.1:8000/api/v1/credentials/", None)
+    ]
+
+
+def test_async_cache_revalidation():
+    """Test a 304 answer to a conditional GET is served from the cache."""
+    routes = {(GET, "/api/v1/status/"): json_route({"a": 1}, headers={"ETag": '"v1"'})}
+
+    async def run():
+        async with StubServer(routes) as stub:
+            await async_request.async_request(GET, "/api/v1/status/")
+            routes[(GET, "/api/v1/status/")] = (304, {"ETag": '"v1"'}, b"")
+            response = await async_request.async_request(GET, "/api/v1/status/")
+            return stub, response
+
+    stub, response = asyncio.run(run())
+    assert stub.requests[1][2]["if-none-match"] == '"v1"'
+    assert (response.status_code, response.json()) == (200, {"a": 1})
+
+
+def test_async_write_invalidates_names(server_config):
+    """Test a change sent asynchronously drops the cached names."""
+
+    class FakeTransport(async_request.AsyncTransport):
+        """Answer every request with an empty object."""
+
+        async def send(self, method, url, headers, body=None, verify=True):
+            return async_request.AsyncResponse(url, 200, {}, b"{}")
+
+    names.store("/api/v1/scans/", "scan1", {"id": 1})
+    asyncio.run(
+        async_request.async_request(
+            PATCH, "/api/v1/scans/1/", payload={}, transport=FakeTransport()
+        )
+    )
+    assert names.lookup("/api/v1/scans/", "scan1") is None
+
+
+def test_main_async(capsys):
+    """Test a command can run its flow on the event loop."""
+    routes = {(GET, STATUS_URI): json_route({"api_version": 1})}
+    subparsers = ArgumentParser().add_subparsers(dest="subcommand")
+
+    async def run():
+        async with StubServer(routes):
+            command = ServerStatusCommand(subparsers)
+            await command.main_async(Namespace(path=None))
+
+    asyncio.run(run())
+    assert '"api_version": 1' in capsys.readouterr().out
@@ -0,0 +1,153 @@
+"""Test the cache module."""
+
+import os
+import time
+
+import pytest
+import requests_mock
+
+from qpc import cache, request, utils
+from qpc.utils import get_server_location, write_client_token, write_server_config
+
+CREDS_URI = "/api/v1/credentials/"
+
+
+@pytest.fixture
+def creds_url(server_config):
+    """Return the url of the credentials endpoint."""
+    return get_server_location() + CREDS_URI
+
+
+def cached_files():
+    """List the entries in the cache directory."""
+    if not os.path.isdir(utils.QPC_HTTP_CACHE):
+        return []
+    return os.listdir(utils.QPC_HTTP_CACHE)
+
+
+def test_etag_revalidation(creds_url):
+    """Test a 304 answer is served from the cached body."""
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            creds_url,
+            [
+                {"status_code": 200, "json": {"count": 1}, "headers": {"ETag": '"v1"'}},
+                {"status_code": 304},
+            ],
+        )
+        request.request(request.GET, CREDS_URI)
+        response = request.request(request.GET, CREDS_URI)
+        assert mocker.last_request.headers["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+
+
+def test_entries_private_and_reason_kept(creds_url):
+    """Test entries are only readable by their owner and keep the reason."""
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            creds_url,
+            [
+                {"json": {}, "reason": "Fine", "headers": {"ETag": '"v1"'}},
+                {"status_code": 304},
+            ],
+        )
+        request.request(request.GET, CREDS_URI)
+        response = request.request(request.GET, CREDS_URI)
+    assert response.reason == "Fine"
+    assert os.stat(utils.QPC_HTTP_CACHE).st_mode & 0o777 == 0o700
+    entry_path = os.path.join(utils.QPC_HTTP_CACHE, cached_files()[0])
+    assert os.stat(entry_path).st_mode & 0o777 == 0o600
+
+
+def test_last_modified_revalidation(creds_url):
+    """Test Last-Modified is sent back as If-Modified-Since."""
+    last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            creds_url,
+            status_code=200,
+            json={},
+            headers={"Last-Modified": last_modified},
+        )
+        request.request(request.GET, CREDS_URI)
+        request.request(request.GET, CREDS_URI)
+        assert mocker.last_request.headers["If-Modified-Since"] == last_modified
+
+
+def test_changed_resource_replaces_entry(creds_url):
+    """Test a new 200 answer replaces the cached body."""
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            creds_url,
+            [
+                {"status_code": 200, "json": {"count": 1}, "headers": {"ETag": '"v1"'}},
+                {"status_code": 200, "json": {"count": 2}, "headers": {"ETag": '"v2"'}},
+                {"status_code": 304},
+            ],
+        )
+        for _ in range(3):
+            response = request.request(request.GET, CREDS_URI)
+        assert mocker.last_request.headers["If-None-Match"] == '"v2"'
+    assert response.json() == {"count": 2}
+    assert len(cached_files()) == 1
+
+
+def test_cache_keyed_by_token(creds_url):
+    """Test responses fetched with another token are not reused."""
+    with requests_mock.Mocker() as mocker:
+        mocker.get(creds_url, status_code=200, json={}, headers={"ETag": '"v1"'})
+        write_client_token({"token": "first"})
+        request.request(request.GET, CREDS_URI)
+        write_client_token({"token": "second"})
+        request.request(request.GET, CREDS_URI)
+        assert "If-None-Match" not in mocker.last_request.headers
+    assert len(cached_files()) == 2
+
+
+def test_no_cache(creds_url):
+    """Test the cache is neither read nor written when disabled."""
+    cache.set_cache_enabled(False)
+    with requests_mock.Mocker() as mocker:
+        mocker.get(creds_url, status_code=200, json={}, headers={"ETag": '"v1"'})
+        request.request(request.GET, CREDS_URI)
+        request.request(request.GET, CREDS_URI)
+        assert "If-None-Match" not in mocker.last_request.headers
+    assert not cached_files()
+
+
+def test_expired_entry(creds_url):
+    """Test entries older than the maximum age are dropped."""
+    with requests_mock.Mocker() as mocker:
+        mocker.get(creds_url, status_code=200, json={}, headers={"ETag": '"v1"'})
+        request.request(request.GET, CREDS_URI)
+        old = time.time() - utils.DEFAULT_CACHE_MAX_AGE - 1
+        for name in cached_files():
+            os.utime(os.path.join(utils.QPC_HTTP_CACHE, name), (old, old))
+        request.request(request.GET, CREDS_URI)
+        assert "If-None-Match" not in mocker.last_request.headers
+
+
+def test_size_eviction(creds_url):
+    """Test the least recently used entries go once the cache is full."""
+    write_server_config(
+        {
+            "host": "127.0.0.1",
+            "port": 8000,
+            "use_http": True,
+            "require_token": False,
+            "cache_max_size": 300,
+        }
+    )
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            creds_url, status_code=200, json={"x": "y" * 100}, headers={"ETag": '"v1"'}
+        )
+        for name in ("a", "b", "c"):
+            request.request(request.GET, CREDS_URI, params={"name": name})
+    sizes = [
+        os.path.getsize(os.path.join(utils.QPC_HTTP_CACHE, name))
+        for name in cached_files()
+    ]
+    assert 0 < len(sizes) < 3
+    assert sum(sizes) <= 300
@@ -0,0 +1,185 @@
+"""Test the list, show and job commands printing server objects."""
+
+import json
+import sys
+import threading
+from unittest import mock
+
+import pytest
+
+from qpc.cli import CLI
+from qpc.cred import CREDENTIAL_URI
+from qpc.scan import SCAN_URI
+from qpc.source import SOURCE_URI
+from qpc.utils import get_server_location
+
+
+def mock_pages(requests_mock, url, pages):
+    """Answer url with pages of results, linked by their next links."""
+    count = sum(len(results) for results in pages)
+    for number, results in enumerate(pages, 1):
+        next_link = f"{url}?page={number + 1}" if number < len(pages) else None
+        requests_mock.get(
+            f"{url}?page={number}" if number > 1 else url,
+            json={"count": count, "next": next_link, "results": results},
+        )
+
+
+@pytest.mark.parametrize("jobs", ("1", "4"))
+def test_list_all_pages(capsys, requests_mock, jobs, server_config):
+    """--all prints the results of every page as one list, in order."""
+    url = get_server_location() + CREDENTIAL_URI
+    pages = [[{"id": 2 * page + i} for i in range(2)] for page in range(4)]
+    mock_pages(requests_mock, url, pages)
+    sys.argv = ["/bin/qpc", "--jobs", jobs, "cred", "list", "--all"]
+    with mock.patch("builtins.input") as prompt:
+        CLI().main()
+    prompt.assert_not_called()
+    out, _ = capsys.readouterr()
+    assert json.loads(out) == [{"id": number} for number in range(8)]
+    assert requests_mock.call_count == 4
+
+
+def test_list_all_pages_follows_new_pages(capsys, requests_mock, server_config):
+    """--all follows next links past the pages counted on the first page."""
+    url = get_server_location() + CREDENTIAL_URI
+    requests_mock.get(
+        url, json={"count": 2, "next": f"{url}?page=2", "results": [{"id": 1}]}
+    )
+    requests_mock.get(
+        f"{url}?page=2",
+        json={"count": 3, "next": f"{url}?page=3", "results": [{"id": 2}]},
+    )
+    requests_mock.get(f"{url}?page=3", json={"count": 3, "results": [{"id": 3}]})
+    sys.argv = ["/bin/qpc", "cred", "list", "--all"]
+    CLI().main()
+    out, _ = capsys.readouterr()
+    assert json.loads(out) == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_list_all_pages_error(requests_mock, server_config):
+    """A page failing to load fails the command."""
+    url = get_server_location() + CREDENTIAL_URI
+    requests_mock.get(
+        url, json={"count": 2, "next": f"{url}?page=2", "results": [{"id": 1}]}
+    )
+    requests_mock.get(f"{url}?page=2", status_code=500, json={})
+    sys.argv = ["/bin/qpc", "cred", "list", "--all"]
+    with pytest.raises(SystemExit):
+        CLI().main()
+
+
+def test_scan_job_pages_keep_path(capsys, requests_mock, server_config):
+    """Each page of the jobs of a scan is requested from the same path."""
+    location = get_server_location()
+    requests_mock.get(
+        location + SCAN_URI + "?name=scan1",
+        json={"count": 1, "results": [{"id": 1, "name": "scan1"}]},
+    )
+    mock_pages(
+        requests_mock, location + SCAN_URI + "1/jobs/", [[{"id": 1}], [{"id": 2}]]
+    )
+    sys.argv = ["/bin/qpc", "scan", "job", "--name", "scan1"]
+    with mock.patch("builtins.input") as prompt:
+        CLI().main()
+    prompt.assert_called_once()
+    out, _ = capsys.readouterr()
+    assert "".join(out.split()) == '[{"id":1}][{"id":2}]'
+
+
+def test_list_ndjson(capsys, requests_mock, server_config):
+    """The ndjson output prints every page, one compact unsorted object per line."""
+    url = get_server_location() + CREDENTIAL_URI
+    mock_pages(requests_mock, url, [[{"name": "b", "id": 1}], [{"name": "a", "id": 2}]])
+    sys.argv = ["/bin/qpc", "cred", "list", "--output", "ndjson"]
+    with mock.patch("builtins.input") as prompt:
+        CLI().main()
+    prompt.assert_not_called()
+    out, _ = capsys.readouterr()
+    assert out == '{"name":"b","id":1}\n{"name":"a","id":2}\n'
+
+
+def test_show_ndjson(capsys, requests_mock, server_config):
+    """The ndjson output prints a single object on one line."""
+    url = get_server_location() + CREDENTIAL_URI
+    requests_mock.get(url, json={"count": 1, "results": [{"name": "a", "id": 1}]})
+    sys.argv = ["/bin/qpc", "cred", "show", "--name", "a", "--output", "ndjson"]
+    CLI().main()
+    out, _ = capsys.readouterr()
+    assert out == '{"name":"a","id":1}\n'
+
+
+def test_list_page_size_and_prefetch(capsys, requests_mock, server_config):
+    """--page-size is sent, and the next page is fetched while prompting."""
+    url = get_server_location() + SCAN_URI
+    fetched = threading.Event()
+
+    def second_page(request, context):
+        fetched.set()
+        return {"count": 2, "results": [{"id": 2}]}
+
+    requests_mock.get(
+        url, json={"count": 2, "next": f"{url}?page=2", "results": [{"id": 1}]}
+    )
+    requests_mock.get(f"{url}?page=2", json=second_page)
+    waits = []
+    sys.argv = ["/bin/qpc", "scan", "list", "--page-size", "1"]
+    with mock.patch("builtins.input", lambda _: waits.append(fetched.wait(5))):
+        CLI().main()
+    assert waits == [True]
+    assert [request.qs["page_size"] for request in requests_mock.request_history] == [
+        ["1"],
+        ["1"],
+    ]
+    out, _ = capsys.readouterr()
+    assert "".join(out.split()) == '[{"id":1}][{"id":2}]'
+
+
+def test_list_fields_and_filters(capsys, requests_mock, server_config):
+    """Supported filters are sent, the others and --fields apply to results."""
+    url = get_server_location() + SOURCE_URI
+    sources = [
+        {"id": 1, "name": "a", "hosts": ["10.0.0.1", "10.0.0.2"], "port": 22},
+        {"id": 2, "name": "b", "hosts": ["10.0.0.3"], "port": 22},
+        {"id": 3, "name": "c", "hosts": ["10.0.0.1"], "port": 2222},
+    ]
+    requests_mock.get(url, json={"count": 3, "results": sources})
+    sys.argv = [
+        "/bin/qpc",
+        "source",
+        "list",
+        "--filter",
+        "source_type=network",
+        "--filter",
+        "hosts=10.0.0.1",
+        "--filter",
+        "port=22",
+        "--fields",
+        "name,id",
+        "--output",
+        "ndjson",
+    ]
+    CLI().main()
+    assert requests_mock.last_request.qs == {"source_type": ["network"]}
+    out, _ = capsys.readouterr()
+    assert out == '{"name":"a","id":1}\n'
+
+
+@pytest.mark.parametrize("all_pages", ([], ["--all"]))
+def test_list_filtered_out(all_pages, caplog, capsys, requests_mock, server_config):
+    """Results all filtered out count as none, with or without --all."""
+    url = get_server_location() + CREDENTIAL_URI
+    mock_pages(requests_mock, url, [[{"id": 1}], [{"id": 3}]])
+    sys.argv = ["/bin/qpc", "cred", "list", "--filter", "id=2"] + all_pages
+    with mock.patch("builtins.input"):
+        CLI().main()
+    assert capsys.readouterr().out == ""
+    assert set(caplog.messages) == {"No credentials exist yet."}
+
+
+@pytest.mark.parametrize("option", (["--filter", "name"], ["--fields", ","]))
+def test_list_fields_and_filters_invalid(option, server_config):
+    """Malformed --filter and --fields values are refused."""
+    sys.argv = ["/bin/qpc", "source", "list"] + option
+    with pytest.raises(SystemExit):
+        CLI().main()
@@ -0,0 +1,78 @@
+"""Test running commands against many server profiles."""
+
+import os
+
+import pytest
+
+from qpc import agent, fanout, utils
+from qpc.cli import CLI
+
+
+def test_strip_servers_options():
+    """The options selecting many servers are left out of each command."""
+    argv = ["-v", "--servers", "a,b", "--all-servers", "--servers=c", "cred", "list"]
+    assert fanout.strip_servers_options(argv) == ["-v", "cred", "list"]
+
+
+@pytest.mark.parametrize("option", ["--all-s", "--serv=a,b"])
+def test_abbreviated_servers_options_refused(option):
+    """Abbreviations could not be removed from the command of each server."""
+    with pytest.raises(SystemExit) as error:
+        CLI().parse_args([option, "cred", "list"])
+    assert error.value.code == 2
+
+
+def test_run_on_server_does_not_page(mocker):
+    """The command of each server prints every page, as stdin is closed."""
+    run = mocker.patch.object(fanout.subprocess, "run")
+    run.return_value.returncode = 0
+    fanout.run_on_server("dc1", ["cred", "list"])
+    env = run.call_args.kwargs["env"]
+    assert env[utils.NO_PAGING_ENV] == env[agent.NO_AGENT_ENV] == "1"
+
+
+def test_profiles_keep_their_own_config_and_token():
+    """Each profile reads and writes its own server config and token."""
+    utils.write_server_config({"host": "default.example.com", "port": 443})
+    utils.set_server_profile("dc1")
+    utils.write_server_config({"host": "dc1.example.com", "port": 443})
+    utils.write_client_token({"token": "dc1-token"})
+    assert utils.read_server_config()["host"] == "dc1.example.com"
+    assert utils.read_client_token() == "dc1-token"
+    assert os.path.dirname(utils.get_client_token_path()) == os.path.join(
+        utils.QPC_SERVERS_DIR, "dc1"
+    )
+    utils.set_server_profile()
+    assert utils.read_server_config()["host"] == "default.example.com"
+    assert utils.read_client_token() is None
+    assert utils.list_server_profiles() == ["default", "dc1"]
+
+
+def test_select_unknown_profile(caplog):
+    """Selecting a profile that is not configured fails."""
+    with pytest.raises(SystemExit):
+        fanout.select_profiles(["dc9"], False)
+    assert 'Server profile "dc9" is not configured.' in caplog.text
+
+
+def test_run_on_servers(mocker, capsys):
+    """Output is tagged and written in the order of the profiles."""
+    results = {
+        "dc1": (0, '{\n"id": 1\n}\n', "", 2.5),
+        "dc2": (1, "", "failed\n", 0.5),
+    }
+    run = mocker.patch.object(
+        fanout, "run_on_server", side_effect=lambda profile, argv: results[profile]
+    )
+    exit_code = fanout.run_on_servers(
+        ["dc1", "dc2"], ["--servers", "x", "scan", "list"]
+    )
+    assert exit_code == 1
+    run.assert_any_call("dc2", ["scan", "list"])
+    captured = capsys.readouterr()
+    assert captured.out == 'dc1: {\ndc1: "id": 1\ndc1: }\n'
+    assert captured.err == (
+        "dc2: failed\n"
+        "dc1: exit code 0 in 2.500 seconds\n"
+        "dc2: exit code 1 in 0.500 seconds\n"
+    )
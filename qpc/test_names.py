@@ -0,0 +1,123 @@
+"""Test the cache of the ids of objects by name."""
+
+import json
+import sys
+
+import pytest
+
+from qpc import names
+from qpc.cli import CLI
+from qpc.cred import CREDENTIAL_URI
+from qpc.request import DELETE, POST, request
+from qpc.scan import SCAN_URI
+from qpc.utils import get_server_location, write_server_config
+
+
+def run_qpc(*argv):
+    """Run a qpc command line."""
+    sys.argv = ["/bin/qpc", *argv]
+    CLI().main()
+
+
+@pytest.fixture
+def scans(server_config, requests_mock):
+    """Answer the lookup of scan1 with id 1, and return its mock."""
+    return requests_mock.get(
+        get_server_location() + SCAN_URI + "?name=scan1",
+        json={"count": 1, "results": [{"id": 1, "name": "scan1"}]},
+    )
+
+
+def test_lookup_is_cached(scans, requests_mock, capsys):
+    """Commands naming the same scan only look its id up once."""
+    location = get_server_location()
+    requests_mock.get(f"{location}{SCAN_URI}1/", json={"id": 1, "name": "scan1"})
+    requests_mock.get(
+        f"{location}{SCAN_URI}1/jobs/", json={"count": 1, "results": [{"id": 3}]}
+    )
+    for _ in range(2):
+        run_qpc("scan", "show", "--name", "scan1")
+        assert json.loads(capsys.readouterr().out) == {"id": 1, "name": "scan1"}
+    run_qpc("scan", "job", "--name", "scan1")
+    assert json.loads(capsys.readouterr().out) == [{"id": 3}]
+    assert scans.call_count == 1
+
+
+def test_stale_id_is_looked_up_again(scans, requests_mock, capsys):
+    """A 404 answer for a cached id looks the name up again, once."""
+    location = get_server_location()
+    names.store(SCAN_URI, "scan1", {"id": 9, "name": "scan1"})
+    stale = requests_mock.get(f"{location}{SCAN_URI}9/", status_code=404)
+    requests_mock.get(f"{location}{SCAN_URI}1/", json={"id": 1, "name": "scan1"})
+    run_qpc("scan", "show", "--name", "scan1")
+    assert json.loads(capsys.readouterr().out) == {"id": 1, "name": "scan1"}
+    assert (stale.call_count, scans.call_count) == (1, 1)
+    assert names.lookup(SCAN_URI, "scan1") == {"id": 1}
+
+
+def test_changes_invalidate(server_config, requests_mock):
+    """Deleting an object or creating one drops the cached ids."""
+    location = get_server_location()
+    requests_mock.delete(f"{location}{SCAN_URI}1/", status_code=204)
+    requests_mock.post(f"{location}{SCAN_URI}", status_code=201)
+    names.store(SCAN_URI, "scan1", {"id": 1})
+    names.store(SCAN_URI, "scan2", {"id": 2})
+    request(DELETE, f"{SCAN_URI}1/")
+    assert names.lookup(SCAN_URI, "scan1") is None
+    assert names.lookup(SCAN_URI, "scan2") == {"id": 2}
+    request(POST, SCAN_URI, payload={})
+    assert names.lookup(SCAN_URI, "scan2") is None
+
+
+def test_ttl(server_config, monkeypatch):
+    """Ids older than the time to live are not used."""
+    names.store(SCAN_URI, "scan1", {"id": 1})
+    monkeypatch.setattr(names, "NAME_CACHE_TTL", -1)
+    assert names.lookup(SCAN_URI, "scan1") is None
+
+
+def test_scan_name_must_match(server_config, requests_mock):
+    """A scan is only found by its exact name, even if it is the only one."""
+    requests_mock.get(
+        get_server_location() + SCAN_URI + "?name=scan1",
+        json={"count": 1, "results": [{"id": 1, "name": "scan10"}]},
+    )
+    with pytest.raises(SystemExit):
+        run_qpc("scan", "show", "--name", "scan1")
+    assert names.lookup(SCAN_URI, "scan1") is None
+
+
+def test_clear_ignores_cached_id(server_config, requests_mock):
+    """Deleting by name looks the id up on the server, never in the cache."""
+    location = get_server_location()
+    names.store(CREDENTIAL_URI, "cred1", {"id": 9})
+    requests_mock.get(
+        f"{location}{CREDENTIAL_URI}?name=cred1",
+        json={"count": 1, "results": [{"id": 1, "name": "cred1"}]},
+    )
+    stale = requests_mock.delete(f"{location}{CREDENTIAL_URI}9/", status_code=204)
+    current = requests_mock.delete(f"{location}{CREDENTIAL_URI}1/", status_code=204)
+    run_qpc("cred", "clear", "--name", "cred1")
+    assert (stale.call_count, current.call_count) == (0, 1)
+
+
+def test_host_change(server_config, requests_mock):
+    """Ids cached for a server are never used for another one."""
+    names.store(SCAN_URI, "nightly", {"id": 7})
+    write_server_config({"host": "other", "port": 8000, "use_http": True})
+    assert names.lookup(SCAN_URI, "nightly") is None
+    names.store(SCAN_URI, "nightly", {"id": 7})
+    run_qpc("server", "config", "--host", "new", "--use-http", "--disable-auth")
+    location = get_server_location()
+    requests_mock.get(
+        f"{location}{SCAN_URI}?name=nightly",
+        json={"count": 1, "results": [{"id": 3, "name": "nightly"}]},
+    )
+    stale = requests_mock.post(
+        f"{location}{SCAN_URI}7/jobs/", status_code=201, json={"id": 1}
+    )
+    current = requests_mock.post(
+        f"{location}{SCAN_URI}3/jobs/", status_code=201, json={"id": 1}
+    )
+    run_qpc("scan", "start", "--name", "nightly")
+    assert (stale.call_count, current.call_count) == (0, 1)
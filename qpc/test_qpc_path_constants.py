@@ -8,9 +8,16 @@ from qpc.utils import (
     INSIGHTS_CONFIG,
     INSIGHTS_ENCRYPTION,
     INSIGHTS_LOGIN_CONFIG,
+    QPC_AGENT_SOCKET,
     QPC_CLIENT_TOKEN,
+    QPC_COMPLETION_CACHE,
+    QPC_HTTP_CACHE,
     QPC_LOG,
+    QPC_MIRROR_DIR,
+    QPC_NAME_CACHE,
     QPC_SERVER_CONFIG,
+    QPC_SERVER_INFO,
+    QPC_SERVERS_DIR,
 )
 
 
@@ -22,9 +29,16 @@ from qpc.utils import (
         INSIGHTS_CONFIG,
         INSIGHTS_ENCRYPTION,
         INSIGHTS_LOGIN_CONFIG,
+        QPC_AGENT_SOCKET,
         QPC_CLIENT_TOKEN,
+        QPC_COMPLETION_CACHE,
+        QPC_HTTP_CACHE,
         QPC_LOG,
+        QPC_MIRROR_DIR,
+        QPC_NAME_CACHE,
         QPC_SERVER_CONFIG,
+        QPC_SERVER_INFO,
+        QPC_SERVERS_DIR,
     ),
 )
 def test_path_constant_is_patched(path_constant):
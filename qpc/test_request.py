@@ -0,0 +1,297 @@
+"""Test the request module."""
+
+import gzip
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+import requests
+import requests_mock
+
+from qpc import request
+from qpc.cli import CLI
+from qpc.utils import CONFIG_POOL_SIZE, get_server_location, write_server_config
+
+
+@pytest.fixture
+def pooled_server_config():
+    """Write a server config with custom connection pool settings."""
+    write_server_config(
+        {
+            "host": "127.0.0.1",
+            "port": 8000,
+            "use_http": True,
+            "require_token": False,
+            "pool_size": 3,
+            "keep_alive": False,
+        }
+    )
+
+
+def test_session_is_shared(server_config):
+    """Test every call made through request() reuses the same session."""
+    url = get_server_location() + "/api/v1/status/"
+    with requests_mock.Mocker() as mocker:
+        mocker.get(url, status_code=200, json={})
+        request.request(request.GET, "/api/v1/status/")
+        first_session = request.get_session()
+        request.request(request.GET, "/api/v1/status/")
+        assert request.get_session() is first_session
+        assert mocker.call_count == 2
+
+
+def test_session_default_pool(server_config):
+    """Test the session pool uses the default size."""
+    adapter = request.get_session().get_adapter("http://127.0.0.1:8000/")
+    assert adapter._pool_maxsize == request.DEFAULT_POOL_SIZE
+    assert request.get_session().headers["Connection"] == "keep-alive"
+
+
+def test_session_configured_pool(pooled_server_config):
+    """Test the session honours pool size and keep-alive settings."""
+    session = request.get_session()
+    adapter = session.get_adapter("https://127.0.0.1:8000/")
+    assert adapter._pool_maxsize == 3
+    assert adapter._pool_connections == 3
+    assert session.headers["Connection"] == "close"
+
+
+def test_close_session(server_config):
+    """Test closing the session makes the next call create a new one."""
+    first_session = request.get_session()
+    request.close_session()
+    assert request.get_session() is not first_session
+
+
+@pytest.mark.parametrize("pool_size", [0, -1, "10", True])
+def test_invalid_pool_size(pool_size):
+    """Test invalid pool sizes invalidate the server config."""
+    write_server_config(
+        {"host": "127.0.0.1", "port": 8000, CONFIG_POOL_SIZE: pool_size}
+    )
+    assert request.read_server_config() is None
+
+
+def test_response_body_decoded_once(server_config, mocker):
+    """Test the response body is decoded once however many times it is read."""
+    url = get_server_location() + "/api/v1/credentials/"
+    json_spy = mocker.spy(requests.Response, "json")
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.get(url, status_code=200, json={"count": 1, "results": [{}]})
+        response = request.request(request.GET, "/api/v1/credentials/")
+    assert isinstance(response, request.QPCResponse)
+    assert response.json() is response.json()
+    assert response.status_code == 200
+    assert json_spy.call_count == 1
+
+
+def test_response_invalid_json_cached(server_config, mocker):
+    """Test a body that is not JSON is only parsed once and keeps raising."""
+    url = get_server_location() + "/api/v1/reports/1/"
+    json_spy = mocker.spy(requests.Response, "json")
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.get(url, status_code=200, text="not,json")
+        response = request.request(request.GET, "/api/v1/reports/1/")
+    with pytest.raises(ValueError):
+        response.json()
+    assert response.text == "not,json"
+    assert json_spy.call_count == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_run_concurrently_keeps_order(jobs):
+    """Test results come back in item order with errors collected per item."""
+    request.set_jobs(jobs)
+
+    def func(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item * 2
+
+    results = request.run_concurrently(func, range(6))
+    assert [result.item for result in results] == list(range(6))
+    assert [result.result for result in results] == [0, 2, 4, None, 8, 10]
+    assert isinstance(results[3].error, ValueError)
+    assert all(result.error is None for result in results if result.item != 3)
+
+
+def test_run_concurrently_system_exit():
+    """Test a SystemExit raised by request() still stops the command."""
+    request.set_jobs(4)
+
+    def func(item):
+        if item == 1:
+            sys.exit(1)
+        return item
+
+    with pytest.raises(SystemExit):
+        request.run_concurrently(func, range(3))
+
+
+def test_run_concurrently_uses_jobs(server_config):
+    """Test requests are spread over --jobs worker threads."""
+    request.set_jobs(3)
+    barrier = threading.Barrier(3, timeout=5)
+
+    def func(item):
+        barrier.wait()
+        return threading.current_thread().name
+
+    results = request.run_concurrently(func, range(3))
+    assert len({result.result for result in results}) == 3
+
+
+def test_session_pool_fits_jobs(server_config):
+    """Test the connection pool grows to fit more jobs than pool_size."""
+    request.set_jobs(request.DEFAULT_POOL_SIZE + 5)
+    adapter = request.get_session().get_adapter("http://127.0.0.1:8000/")
+    assert adapter._pool_maxsize == request.DEFAULT_POOL_SIZE + 5
+
+
+def test_cli_jobs_option(server_config, mocker):
+    """Test the global --jobs option configures the executor."""
+    set_jobs = mocker.patch("qpc.request.set_jobs")
+    mocker.patch.object(
+        sys, "argv", ["/bin/qpc", "--jobs", "8", "server", "config", "--host", "x"]
+    )
+    CLI().main()
+    set_jobs.assert_called_once_with(8)
+
+
+def test_retry_transient_status(server_config, caplog):
+    """Test a GET answered with 503 is retried and the retry is logged."""
+    url = get_server_location() + "/api/v1/status/"
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            url, [{"status_code": 503}, {"status_code": 200, "json": {"ok": True}}]
+        )
+        with caplog.at_level("INFO"):
+            response = request.request(request.GET, "/api/v1/status/")
+        assert mocker.call_count == 2
+    assert response.json() == {"ok": True}
+    assert "retry 1 of 3" in caplog.text
+
+
+def test_retry_connection_error(server_config):
+    """Test a GET that fails to connect is sent again."""
+    url = get_server_location() + "/api/v1/status/"
+    with requests_mock.Mocker() as mocker:
+        mocker.get(
+            url,
+            [
+                {"exc": requests.exceptions.ConnectionError},
+                {"status_code": 200, "json": {}},
+            ],
+        )
+        assert request.request(request.GET, "/api/v1/status/").status_code == 200
+        assert mocker.call_count == 2
+
+
+def test_no_retry_for_post(server_config):
+    """Test a POST is never sent twice."""
+    url = get_server_location() + "/api/v1/scans/"
+    with requests_mock.Mocker() as mocker:
+        mocker.post(url, status_code=503)
+        response = request.request(request.POST, "/api/v1/scans/", payload={})
+        assert response.status_code == 503
+        assert mocker.call_count == 1
+
+
+def test_retry_after_header(server_config, mocker):
+    """Test the delay requested by the server is honoured."""
+    sleep = mocker.patch("qpc.request.time.sleep")
+    url = get_server_location() + "/api/v1/status/"
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.get(
+            url,
+            [
+                {"status_code": 429, "headers": {"Retry-After": "7"}},
+                {"status_code": 200, "json": {}},
+            ],
+        )
+        request.request(request.GET, "/api/v1/status/")
+    sleep.assert_called_once_with(7.0)
+
+
+def test_retry_budget(server_config):
+    """Test retries stop once the invocation budget is spent."""
+    write_server_config(
+        {
+            "host": "127.0.0.1",
+            "port": 8000,
+            "use_http": True,
+            "require_token": False,
+            "retries": 5,
+            "retry_budget": 2,
+        }
+    )
+    url = get_server_location() + "/api/v1/status/"
+    with requests_mock.Mocker() as mocker:
+        mocker.get(url, status_code=502)
+        assert request.request(request.GET, "/api/v1/status/").status_code == 502
+        assert mocker.call_count == 3
+        request.request(request.GET, "/api/v1/status/")
+        assert mocker.call_count == 4
+
+
+def test_retry_delay_backoff(monkeypatch):
+    """Test delays grow exponentially, with jitter, up to the maximum."""
+    monkeypatch.setattr(request, "RETRY_BACKOFF_FACTOR", 1)
+    assert 0.5 <= request.get_retry_delay(1) <= 1
+    assert 4 <= request.get_retry_delay(4) <= 8
+    assert request.get_retry_delay(20) == request.RETRY_MAX_DELAY
+
+
+def test_parse_retry_after_date():
+    """Test Retry-After given as an HTTP date in the past means no wait."""
+    assert request.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert request.parse_retry_after("soon") is None
+
+
+def test_http_modules_import_lazily():
+    """Test the request helpers load requests and sqlite3 only when used."""
+    code = (
+        "import sys\n"
+        "import qpc.request, qpc.cache, qpc.mirror, qpc.names\n"
+        "print('requests' in sys.modules, 'sqlite3' in sys.modules)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+    assert output.split() == ["False", "False"]
+
+
+def test_mirror_skipped_when_disabled(server_config, mocker):
+    """Test GET requests leave the mirror alone without --offline."""
+    lookup = mocker.patch("qpc.mirror.lookup")
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.get(get_server_location() + "/api/v1/credentials/", json={})
+        request.request(request.GET, "/api/v1/credentials/")
+    lookup.assert_not_called()
+
+
+def test_gzip_json():
+    """Test payloads are gzip-compressed JSON, whatever their size."""
+    payload = {"sources": [{"facts": ["x" * 100] * 1000}]}
+    compressed = request.gzip_json(payload)
+    assert json.loads(gzip.decompress(compressed)) == payload
+    assert len(compressed) < len(json.dumps(payload)) / 10
+
+
+def test_compressed_post_rejected(server_config, caplog):
+    """Test a body refused with 415 is sent again uncompressed."""
+    url = get_server_location() + "/api/v1/reports/merge/"
+    with requests_mock.Mocker() as mocker:
+        mocker.post(url, [{"status_code": 415}, {"status_code": 201, "json": {}}])
+        with caplog.at_level("INFO"):
+            response = request.request(
+                request.POST, "/api/v1/reports/merge/", payload={"a": 1}, compress=True
+            )
+        first, second = mocker.request_history
+    assert response.status_code == 201
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in second.headers
+    assert second.json() == {"a": 1}
+    assert "does not accept compressed requests" in caplog.text
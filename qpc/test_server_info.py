@@ -0,0 +1,122 @@
+"""Test the server_info module."""
+
+import sys
+import time
+
+import pytest
+import requests_mock
+
+from qpc import request, server_info
+from qpc.cli import CLI
+from qpc.clicommand import BULK_PAGE_SIZE
+from qpc.cred import CREDENTIAL_URI
+from qpc.utils import get_server_location, write_client_token
+
+STATUS_URI = "/api/v1/status/"
+MERGE_URI = "/api/v1/reports/merge/"
+
+
+@pytest.fixture
+def status_url(server_config):
+    """Return the url of the status endpoint."""
+    return get_server_location() + STATUS_URI
+
+
+def get_status(mocker, url, version):
+    """Send a GET answered with the given server version."""
+    mocker.get(url, status_code=200, json={}, headers={"X-Server-Version": version})
+    request.request(request.GET, STATUS_URI)
+
+
+def test_version_recorded(status_url):
+    """Test the version is kept across invocations."""
+    with requests_mock.Mocker() as mocker:
+        get_status(mocker, status_url, "1.2.0")
+    server_info.reset_server_info()
+    assert server_info.get_server_version() == "1.2.0"
+
+
+def test_version_written_once(status_url, mocker):
+    """Test repeated responses with the same version do not rewrite the file."""
+    save = mocker.spy(server_info, "_save")
+    with requests_mock.Mocker() as req_mocker:
+        for _ in range(3):
+            get_status(req_mocker, status_url, "1.2.0")
+    assert save.call_count == 1
+
+
+def test_version_change_resets_capabilities(status_url):
+    """Test capabilities learned from an older server are forgotten."""
+    with requests_mock.Mocker() as mocker:
+        get_status(mocker, status_url, "1.2.0")
+        server_info.set_capability(server_info.CAPABILITY_COMPRESSED_REQUESTS, True)
+        get_status(mocker, status_url, "1.3.0")
+    assert (
+        server_info.get_capability(server_info.CAPABILITY_COMPRESSED_REQUESTS) is None
+    )
+
+
+def test_version_keyed_by_token(status_url):
+    """Test another token does not see what was learned with the first one."""
+    with requests_mock.Mocker() as mocker:
+        write_client_token({"token": "first"})
+        get_status(mocker, status_url, "1.2.0")
+    write_client_token({"token": "second"})
+    assert server_info.get_server_version() is None
+
+
+def test_version_expires(status_url, monkeypatch):
+    """Test entries are ignored once older than the TTL."""
+    with requests_mock.Mocker() as mocker:
+        get_status(mocker, status_url, "1.2.0")
+    future = time.time() + server_info.SERVER_INFO_TTL + 1
+    monkeypatch.setattr(server_info.time, "time", lambda: future)
+    assert server_info.get_server_version() is None
+
+
+def test_old_server_rejected(status_url):
+    """Test the version check still applies to every response."""
+    with requests_mock.Mocker() as mocker:
+        with pytest.raises(SystemExit):
+            get_status(mocker, status_url, "0.1.0")
+
+
+def test_compression_capability(server_config):
+    """Test compression is used once accepted and skipped once refused."""
+    url = get_server_location() + MERGE_URI
+    assert not server_info.use_compressed_requests()
+    with requests_mock.Mocker() as mocker:
+        mocker.post(url, status_code=201, json={})
+        request.request(request.POST, MERGE_URI, payload={}, compress=True)
+    assert server_info.use_compressed_requests()
+
+    server_info.set_capability(server_info.CAPABILITY_COMPRESSED_REQUESTS, False)
+    with requests_mock.Mocker() as mocker:
+        mocker.post(url, status_code=201, json={})
+        request.request(request.POST, MERGE_URI, payload={}, compress=True)
+        assert mocker.call_count == 1
+        assert "Content-Encoding" not in mocker.last_request.headers
+
+
+def test_cached_old_version_refused(status_url, caplog):
+    """Test a command is refused without a request once the server is too old."""
+    with requests_mock.Mocker() as mocker:
+        get_status(mocker, status_url, "0.9.1")
+    sys.argv = ["/bin/qpc", "report", "details", "--report", "1", "--json"]
+    with requests_mock.Mocker() as mocker:
+        with pytest.raises(SystemExit):
+            CLI().main()
+        assert mocker.call_count == 0
+    assert "minimum server version of 0.9.2" in caplog.text
+
+
+def test_page_size_capability(server_config, capsys):
+    """Test every page is fetched in bulk once the server honors page_size."""
+    url = get_server_location() + CREDENTIAL_URI
+    with requests_mock.Mocker() as mocker:
+        mocker.get(url, json={"count": 2, "results": [{"id": 1}]})
+        sys.argv = ["/bin/qpc", "cred", "list", "--page-size", "1"]
+        CLI().main()
+        sys.argv = ["/bin/qpc", "cred", "list", "--all"]
+        CLI().main()
+        assert mocker.last_request.qs["page_size"] == [str(BULK_PAGE_SIZE)]
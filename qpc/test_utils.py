@@ -1,8 +1,31 @@
 """Test qpc cred utils."""
+
+import json
+import os
+from argparse import ArgumentTypeError
+from unittest import mock
+
 import pytest
 
-from qpc.messages import PROMPT_INPUT
-from qpc.utils import check_if_prompt_is_not_empty
+from qpc import utils
+from qpc.messages import (
+    PROMPT_INPUT,
+    VALUE_NOT_NON_NEGATIVE_INT,
+    VALUE_NOT_POSITIVE_INT,
+)
+from qpc.utils import (
+    DEFAULT_LOG_BODY_LIMIT,
+    LOG_LEVEL_TRACE,
+    check_if_prompt_is_not_empty,
+    iter_response_text,
+    log_request_info,
+    read_client_token,
+    read_server_config,
+    validate_non_negative_int,
+    validate_positive_int,
+    write_client_token,
+    write_file,
+)
 
 
 @pytest.mark.parametrize("pass_prompt", ["", None])
@@ -12,3 +35,129 @@ def test_invalid_pass_prompt(pass_prompt, caplog):
     with pytest.raises(SystemExit):
         check_if_prompt_is_not_empty(pass_prompt)
     assert caplog.messages[-1] == PROMPT_INPUT
+
+
+@pytest.fixture
+def logged_response():
+    """Response mock with a body larger than the default log limit."""
+    response = mock.Mock()
+    response.status_code = 200
+    response.content = b"x" * (DEFAULT_LOG_BODY_LIMIT + 10)
+    response.text = response.content.decode()
+    return response
+
+
+def test_log_request_info_skipped(caplog, logged_response):
+    """Test the response is not read when INFO records are dropped."""
+    caplog.set_level("ERROR")
+    log_request_info("GET", "qpc cred list", "http://url", logged_response)
+    assert not caplog.records
+    assert not logged_response.mock_calls
+
+
+def test_log_request_info_truncated(caplog, logged_response):
+    """Test the response body is capped at INFO level."""
+    caplog.set_level("INFO")
+    log_request_info("GET", "qpc cred list", "http://url", logged_response)
+    message = caplog.messages[-1]
+    assert "x" * DEFAULT_LOG_BODY_LIMIT + "... [10 more bytes]" in message
+
+
+def test_log_request_info_trace(caplog, logged_response):
+    """Test the full response body is logged at TRACE level."""
+    caplog.set_level(LOG_LEVEL_TRACE)
+    log_request_info("GET", "qpc cred list", "http://url", logged_response)
+    assert caplog.records[-1].levelname == "TRACE"
+    assert logged_response.text in caplog.messages[-1]
+
+
+def test_write_file_chunks(tmp_path):
+    """Test writing an iterable of chunks reports the running byte count."""
+    output_path = tmp_path / "out.bin"
+    progress = mock.Mock()
+    write_file(str(output_path), iter([b"abc", b"de"]), binary=True, progress=progress)
+    assert output_path.read_bytes() == b"abcde"
+    assert progress.mock_calls == [mock.call(3), mock.call(5), mock.call(5, done=True)]
+
+
+def test_iter_response_text():
+    """Test a streamed body is decoded with its encoding, across chunks."""
+    response = mock.Mock(encoding="utf-8")
+    # the two bytes of the e with an acute accent are split between chunks
+    response.iter_content.return_value = iter([b"caf\xc3", b"\xa9 \xc3\xa0"])
+    assert "".join(iter_response_text(response)) == "caf\u00e9 \u00e0"
+
+
+def test_server_config_parsed_once(server_config, mocker):
+    """Test the server config is not parsed again while unchanged."""
+    load = mocker.spy(utils, "_load_server_config")
+    for _ in range(3):
+        assert read_server_config()["host"] == "127.0.0.1"
+    assert load.call_count == 1
+
+
+def test_server_config_reloaded_when_changed(server_config):
+    """Test changes made by another process are picked up."""
+    read_server_config()
+    with open(utils.QPC_SERVER_CONFIG, encoding="utf-8") as config_file:
+        config = json.load(config_file)
+    config["port"] = 9443
+    with open(utils.QPC_SERVER_CONFIG, "w", encoding="utf-8") as config_file:
+        json.dump(config, config_file)
+    stat = os.stat(utils.QPC_SERVER_CONFIG)
+    os.utime(utils.QPC_SERVER_CONFIG, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert read_server_config()["port"] == 9443
+
+
+def test_server_config_copy(server_config):
+    """Test callers can not alter the cached config."""
+    read_server_config()["host"] = "changed"
+    assert read_server_config()["host"] == "127.0.0.1"
+
+
+def test_client_token_rewritten():
+    """Test the token is read again after being written or deleted."""
+    write_client_token({"token": "first"})
+    assert read_client_token() == "first"
+    write_client_token({"token": "other"})
+    assert read_client_token() == "other"
+    utils.delete_client_token()
+    assert read_client_token() is None
+
+
+@pytest.mark.parametrize(
+    "older,newer",
+    [
+        ("0.9.0", "0.9.1"),
+        ("1.9.2", "1.10.0"),
+        ("1.0", "1.0.0"),
+        ("1.0.0rc1", "1.0.0.1"),
+        ("3.0.14", "3.0.14.1"),
+        ("1.2.0.dev1", "1.2.1"),
+    ],
+)
+def test_parse_version_ordering(older, newer):
+    """Test versions compare part by part, numbers numerically."""
+    assert utils.parse_version(older) < utils.parse_version(newer)
+
+
+def test_parse_version_equal():
+    """Test separators and case do not affect the comparison."""
+    assert utils.parse_version("1.4.3") == utils.parse_version("1-4-3")
+    assert utils.parse_version("1.0.0RC1") == utils.parse_version("1.0.0rc1")
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "ten"])
+def test_validate_positive_int_invalid(value):
+    """Test values that are not positive integers are refused."""
+    with pytest.raises(ArgumentTypeError) as error:
+        validate_positive_int(value)
+    assert str(error.value) == VALUE_NOT_POSITIVE_INT % value
+
+
+@pytest.mark.parametrize("value", ["-1", "ten"])
+def test_validate_non_negative_int_invalid(value):
+    """Test values that are not zero or positive integers are refused."""
+    with pytest.raises(ArgumentTypeError) as error:
+        validate_non_negative_int(value)
+    assert str(error.value) == VALUE_NOT_NON_NEGATIVE_INT % value
@@ -1,13 +1,21 @@
 """Test the CLI module."""
 
+import os
+import subprocess
 import sys
+import tempfile
 import unittest
+from argparse import ArgumentParser
 from io import StringIO
 
-from qpc.cli import CLI
+from qpc.cli import CLI, COMMANDS, load_command
 from qpc.release import VERSION
 from qpc.tests_utilities import HushUpStderr, redirect_stdout
 
+# budget for importing qpc.cli, in microseconds; generous for slow machines,
+# but well below the cost of importing requests and cryptography
+IMPORT_TIME_BUDGET = 250000
+
 
 class CliTests(unittest.TestCase):
     """Class for testing the base cli arguments for qpc."""
@@ -32,3 +40,62 @@ class CliTests(unittest.TestCase):
                 sys.argv = ["/bin/qpc", "--version"]
                 CLI().main()
                 self.assertEqual(version_out.getvalue(), VERSION)
+
+    def test_command_registry(self):
+        """Test every registered command matches its registry key."""
+        subparsers = ArgumentParser().add_subparsers()
+        action_subparsers = {}
+        for (subcommand, action), path in COMMANDS.items():
+            command = load_command(path)
+            self.assertEqual((command.SUBCOMMAND, command.ACTION), (subcommand, action))
+            if action is None:
+                command(subparsers)
+                continue
+            if subcommand not in action_subparsers:
+                action_subparsers[subcommand] = subparsers.add_parser(
+                    subcommand
+                ).add_subparsers()
+            command(action_subparsers[subcommand])
+
+    def test_only_requested_command_imported(self):
+        """Test other command modules are not imported to run a command."""
+        code = (
+            "import sys\n"
+            "from qpc.cli import CLI\n"
+            "sys.argv = ['qpc', 'cred', 'list', '--help']\n"
+            "try:\n"
+            "    CLI().main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted(m for m in sys.modules if m.startswith('qpc.cred.')))\n"
+            "print('qpc.scan.add' in sys.modules)\n"
+        )
+        with tempfile.TemporaryDirectory() as home:
+            output = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                check=True,
+                env={**os.environ, "HOME": home},
+                text=True,
+            ).stdout.splitlines()
+        self.assertEqual(output[-2:], ["['qpc.cred.list']", "False"])
+
+    def test_version_import_time(self):
+        """Test qpc --version stays clear of the heavy imports."""
+        with tempfile.TemporaryDirectory() as home:
+            stderr = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", "qpc", "--version"],
+                capture_output=True,
+                check=True,
+                env={**os.environ, "HOME": home},
+                text=True,
+            ).stderr
+        cumulative = {}
+        for line in stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, total, name = line.split("|")
+                if total.strip().isdigit():
+                    cumulative[name.strip()] = int(total)
+        for heavy in ("requests", "cryptography", "distutils", "tarfile"):
+            self.assertNotIn(heavy, cumulative)
+        self.assertLess(cumulative["qpc.cli"], IMPORT_TIME_BUDGET)
@@ -1,15 +1,16 @@
 """QPC Command Line utilities."""
 
+import codecs
 import io
 import json
 import logging
 import os
+import re
 import sys
-import tarfile
+import threading
+from argparse import ArgumentTypeError
 from collections import defaultdict
 
-from cryptography.fernet import Fernet, InvalidToken
-
 from qpc import messages
 from qpc.insights.exceptions import QPCEncryptionKeyError, QPCLoginConfigError
 from qpc.translation import _ as t
@@ -22,8 +23,15 @@ DATA_HOME = os.path.expanduser(DATA_HOME_PATH)
 CONFIG_DIR = os.path.join(CONFIG_HOME, QPC_PATH)
 DATA_DIR = os.path.join(DATA_HOME, QPC_PATH)
 QPC_LOG = os.path.join(DATA_DIR, "qpc.log")
+QPC_HTTP_CACHE = os.path.join(DATA_DIR, "http_cache")
+QPC_SERVER_INFO = os.path.join(DATA_DIR, "server_info.json")
+QPC_AGENT_SOCKET = os.path.join(DATA_DIR, "agent.sock")
+QPC_COMPLETION_CACHE = os.path.join(DATA_DIR, "completion")
+QPC_MIRROR_DIR = os.path.join(DATA_DIR, "mirror")
+QPC_NAME_CACHE = os.path.join(DATA_DIR, "names")
 QPC_SERVER_CONFIG = os.path.join(CONFIG_DIR, "server.config")
 QPC_CLIENT_TOKEN = os.path.join(CONFIG_DIR, "client_token")
+QPC_SERVERS_DIR = os.path.join(CONFIG_DIR, "servers")
 INSIGHTS_CONFIG = os.path.join(CONFIG_DIR, "insights.config")
 INSIGHTS_LOGIN_CONFIG = os.path.join(CONFIG_DIR, "insights_login_config")
 
@@ -34,6 +42,41 @@ CONFIG_PORT_KEY = "port"
 CONFIG_USE_HTTP = "use_http"
 CONFIG_SSL_VERIFY = "ssl_verify"
 CONFIG_REQUIRE_TOKEN = "require_token"
+CONFIG_POOL_SIZE = "pool_size"
+CONFIG_KEEP_ALIVE = "keep_alive"
+CONFIG_LOG_BODY_LIMIT = "log_body_limit"
+CONFIG_RETRIES = "retries"
+CONFIG_RETRY_BUDGET = "retry_budget"
+CONFIG_CACHE_MAX_SIZE = "cache_max_size"
+CONFIG_CACHE_MAX_AGE = "cache_max_age"
+CONFIG_COMPRESS_REQUESTS = "compress_requests"
+
+DEFAULT_JOBS = 1
+
+# the server profile kept in QPC_SERVER_CONFIG and QPC_CLIENT_TOKEN; other
+# profiles keep these files in a directory of QPC_SERVERS_DIR
+DEFAULT_SERVER_PROFILE = "default"
+SERVER_CONFIG_FILE = "server.config"
+CLIENT_TOKEN_FILE = "client_token"
+SERVER_PROFILE_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+DEFAULT_POOL_SIZE = 10
+DEFAULT_LOG_BODY_LIMIT = 4096
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BUDGET = 30
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 * 1024
+DEFAULT_CACHE_MAX_AGE = 24 * 60 * 60
+
+# size of the chunks used when streaming response bodies to a file
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# formats of the --output option of the list, show and job commands
+OUTPUT_JSON = "json"
+OUTPUT_NDJSON = "ndjson"
+OUTPUT_FORMATS = (OUTPUT_JSON, OUTPUT_NDJSON)
+
+# set to any non-empty value to have list commands print every page, as
+# with --all, where no one can answer the prompt for the next page
+NO_PAGING_ENV = "QPC_NO_PAGING"
 
 INSIGHTS_CONFIG_USERNAME_KEY = "username"
 INSIGHTS_CONFIG_PASSWORD_KEY = "password"
@@ -49,18 +92,21 @@ DEFAULT_INSIGHTS_CONFIG = {
 }
 
 LOG_LEVEL_INFO = 0
+# below DEBUG; logs full request/response bodies
+LOG_LEVEL_TRACE = 5
 
 QPC_MIN_SERVER_VERSION = "0.9.0"
 
 # pylint: disable=invalid-name
 logging.captureWarnings(True)
+logging.addLevelName(LOG_LEVEL_TRACE, "TRACE")
 logger = logging.getLogger(__name__)
 
 
 def ensure_config_dir_exists():
     """Ensure the qpc configuration directory exists."""
-    if not os.path.exists(CONFIG_DIR):
-        os.makedirs(CONFIG_DIR)
+    # concurrent qpc processes (i.e. of batch --parallel) may create it too
+    os.makedirs(CONFIG_DIR, exist_ok=True)
 
 
 def get_ssl_verify():
@@ -102,16 +148,121 @@ except AttributeError:
     exception_class = ValueError
 
 
+# server profile used by this process; see set_server_profile
+_server_profile = DEFAULT_SERVER_PROFILE
+
+
+def set_server_profile(profile=None):
+    """Select the server profile whose config and token are used.
+
+    :param profile: profile name; the default profile if None
+    """
+    global _server_profile  # pylint: disable=global-statement
+    _server_profile = profile or DEFAULT_SERVER_PROFILE
+
+
+def get_server_profile():
+    """Return the name of the selected server profile."""
+    return _server_profile
+
+
+def get_server_config_path(profile=None):
+    """Return the path of the server config of a profile.
+
+    :param profile: profile name; the selected profile if None
+    """
+    profile = profile or _server_profile
+    if profile == DEFAULT_SERVER_PROFILE:
+        return QPC_SERVER_CONFIG
+    return os.path.join(QPC_SERVERS_DIR, profile, SERVER_CONFIG_FILE)
+
+
+def get_client_token_path(profile=None):
+    """Return the path of the client token of a profile.
+
+    :param profile: profile name; the selected profile if None
+    """
+    profile = profile or _server_profile
+    if profile == DEFAULT_SERVER_PROFILE:
+        return QPC_CLIENT_TOKEN
+    return os.path.join(QPC_SERVERS_DIR, profile, CLIENT_TOKEN_FILE)
+
+
+def list_server_profiles():
+    """List the names of the server profiles that have a server config."""
+    try:
+        names = sorted(os.listdir(QPC_SERVERS_DIR))
+    except OSError:
+        names = []
+    profiles = [DEFAULT_SERVER_PROFILE] + names
+    return [
+        profile
+        for profile in profiles
+        if os.path.isfile(get_server_config_path(profile))
+    ]
+
+
+# parsed config files, keyed by path; see read_cached_config
+_config_store = {}
+_config_store_lock = threading.Lock()
+
+
+def read_cached_config(path, loader):
+    """Return loader(path), reusing the previous result while path is unchanged.
+
+    The file is parsed and validated again only when its modification
+    time, size or inode change, so the configuration can be read for every
+    request at the cost of a single stat() call.
+
+    :param path: path of the configuration file
+    :param loader: function parsing the file at path
+    :returns: a copy of the value returned by loader
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        forget_cached_config(path)
+        return loader(path)
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _config_store_lock:
+        cached = _config_store.get(path)
+    if cached is None or cached[0] != signature or cached[1] is not loader:
+        cached = (signature, loader, loader(path))
+        with _config_store_lock:
+            _config_store[path] = cached
+    value = cached[2]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def forget_cached_config(path):
+    """Drop the cached content of a configuration file.
+
+    Writers call this so that two writes within the file system timestamp
+    granularity are never mistaken for an unchanged file.
+
+    :param path: path of the configuration file
+    """
+    with _config_store_lock:
+        _config_store.pop(path, None)
+
+
 def read_client_token():
     """Retrieve client token for sonar server.
 
     :returns: The client token or None
     """
-    if not os.path.exists(QPC_CLIENT_TOKEN):
+    return read_cached_config(get_client_token_path(), _load_client_token)
+
+
+def _load_client_token(path):
+    """Parse the client token file at path."""
+    if not os.path.exists(path):
         return None
 
     token = None
-    with open(QPC_CLIENT_TOKEN, encoding="utf-8") as client_token_file:
+    with open(path, encoding="utf-8") as client_token_file:
         try:
             token_json = json.load(client_token_file)
             token = token_json.get("token")
@@ -153,14 +304,21 @@ def read_insights_config():
 def read_server_config():
     """Retrieve configuration for sonar server.
 
+    The file is only parsed again when it changed since the last call.
+
     :returns: The validate dictionary with configuration
     """
+    return read_cached_config(get_server_config_path(), _load_server_config)
+
+
+def _load_server_config(path):
+    """Parse and validate the server configuration file at path."""
     # pylint: disable=too-many-return-statements
-    if not os.path.exists(QPC_SERVER_CONFIG):
-        logger.error("Server config %s was not found.", QPC_SERVER_CONFIG)
+    if not os.path.exists(path):
+        logger.error("Server config %s was not found.", path)
         return None
 
-    with open(QPC_SERVER_CONFIG, encoding="utf-8") as server_config_file:
+    with open(path, encoding="utf-8") as server_config_file:
         try:
             config = json.load(server_config_file)
         except exception_class:
@@ -171,6 +329,14 @@ def read_server_config():
         use_http = config.get(CONFIG_USE_HTTP)
         ssl_verify = config.get(CONFIG_SSL_VERIFY, False)
         require_token = config.get(CONFIG_REQUIRE_TOKEN)
+        pool_size = config.get(CONFIG_POOL_SIZE)
+        keep_alive = config.get(CONFIG_KEEP_ALIVE)
+        log_body_limit = config.get(CONFIG_LOG_BODY_LIMIT)
+        retries = config.get(CONFIG_RETRIES)
+        retry_budget = config.get(CONFIG_RETRY_BUDGET)
+        cache_max_size = config.get(CONFIG_CACHE_MAX_SIZE)
+        cache_max_age = config.get(CONFIG_CACHE_MAX_AGE)
+        compress_requests = config.get(CONFIG_COMPRESS_REQUESTS)
 
         host_empty = host is None or host == ""
         port_empty = port is None or port == ""
@@ -181,7 +347,7 @@ def read_server_config():
         if not isinstance(host, str):
             logger.error(
                 "Server config %s has invalid value for host %s",
-                QPC_SERVER_CONFIG,
+                path,
                 host,
             )
             return None
@@ -189,7 +355,7 @@ def read_server_config():
         if not isinstance(port, int):
             logger.error(
                 "Server config %s has invalid value for port %s",
-                QPC_SERVER_CONFIG,
+                path,
                 port,
             )
             return None
@@ -200,10 +366,34 @@ def read_server_config():
         if require_token is None:
             require_token = True
 
+        if pool_size is None:
+            pool_size = DEFAULT_POOL_SIZE
+
+        if keep_alive is None:
+            keep_alive = True
+
+        if log_body_limit is None:
+            log_body_limit = DEFAULT_LOG_BODY_LIMIT
+
+        if retries is None:
+            retries = DEFAULT_RETRIES
+
+        if retry_budget is None:
+            retry_budget = DEFAULT_RETRY_BUDGET
+
+        if cache_max_size is None:
+            cache_max_size = DEFAULT_CACHE_MAX_SIZE
+
+        if cache_max_age is None:
+            cache_max_age = DEFAULT_CACHE_MAX_AGE
+
+        if compress_requests is None:
+            compress_requests = False
+
         if not isinstance(use_http, bool):
             logger.error(
                 "Server config %s has invalid value for use_http %s",
-                QPC_SERVER_CONFIG,
+                path,
                 use_http,
             )
             return None
@@ -211,11 +401,95 @@ def read_server_config():
         if not isinstance(require_token, bool):
             logger.error(
                 "Server config %s has invalid value for require_token %s",
-                QPC_SERVER_CONFIG,
+                path,
                 require_token,
             )
             return None
 
+        if (
+            isinstance(pool_size, bool)
+            or not isinstance(pool_size, int)
+            or pool_size < 1
+        ):
+            logger.error(
+                "Server config %s has invalid value for pool_size %s",
+                path,
+                pool_size,
+            )
+            return None
+
+        if not isinstance(keep_alive, bool):
+            logger.error(
+                "Server config %s has invalid value for keep_alive %s",
+                path,
+                keep_alive,
+            )
+            return None
+
+        if (
+            isinstance(log_body_limit, bool)
+            or not isinstance(log_body_limit, int)
+            or log_body_limit < 0
+        ):
+            logger.error(
+                "Server config %s has invalid value for log_body_limit %s",
+                path,
+                log_body_limit,
+            )
+            return None
+
+        if isinstance(retries, bool) or not isinstance(retries, int) or retries < 0:
+            logger.error(
+                "Server config %s has invalid value for retries %s",
+                path,
+                retries,
+            )
+            return None
+
+        if (
+            isinstance(retry_budget, bool)
+            or not isinstance(retry_budget, int)
+            or retry_budget < 0
+        ):
+            logger.error(
+                "Server config %s has invalid value for retry_budget %s",
+                path,
+                retry_budget,
+            )
+            return None
+
+        if (
+            isinstance(cache_max_size, bool)
+            or not isinstance(cache_max_size, int)
+            or cache_max_size < 0
+        ):
+            logger.error(
+                "Server config %s has invalid value for cache_max_size %s",
+                path,
+                cache_max_size,
+            )
+            return None
+
+        if (
+            isinstance(cache_max_age, bool)
+            or not isinstance(cache_max_age, int)
+            or cache_max_age < 0
+        ):
+            logger.error(
+                "Server config %s has invalid value for cache_max_age %s",
+                path,
+                cache_max_age,
+            )
+            return None
+
+        if not isinstance(compress_requests, bool):
+            logger.error(
+                "Server config %s has invalid value for compress_requests %s",
+                path,
+                compress_requests,
+            )
+            return None
+
         if (
             ssl_verify is not None
             and not isinstance(ssl_verify, bool)
@@ -223,7 +497,7 @@ def read_server_config():
         ):
             logger.error(
                 "Server config %s has invalid value for ssl_verify %s",
-                QPC_SERVER_CONFIG,
+                path,
                 ssl_verify,
             )
             return None
@@ -235,7 +509,7 @@ def read_server_config():
         ):
             logger.error(
                 "Server config %s has invalid path for ssl_verify %s",
-                QPC_SERVER_CONFIG,
+                path,
                 ssl_verify,
             )
             return None
@@ -246,6 +520,14 @@ def read_server_config():
             CONFIG_USE_HTTP: use_http,
             CONFIG_SSL_VERIFY: ssl_verify,
             CONFIG_REQUIRE_TOKEN: require_token,
+            CONFIG_POOL_SIZE: pool_size,
+            CONFIG_KEEP_ALIVE: keep_alive,
+            CONFIG_LOG_BODY_LIMIT: log_body_limit,
+            CONFIG_RETRIES: retries,
+            CONFIG_RETRY_BUDGET: retry_budget,
+            CONFIG_CACHE_MAX_SIZE: cache_max_size,
+            CONFIG_CACHE_MAX_AGE: cache_max_age,
+            CONFIG_COMPRESS_REQUESTS: compress_requests,
         }
 
 
@@ -256,9 +538,11 @@ def write_config(config_file_path, config_dict):
     :param config_file_path: path to configuration file
     """
     ensure_config_dir_exists()
+    os.makedirs(os.path.dirname(config_file_path), exist_ok=True)
 
     with open(config_file_path, "w", encoding="utf-8") as config_file:
         json.dump(config_dict, config_file, indent=4)
+    forget_cached_config(config_file_path)
 
 
 def write_server_config(server_config):
@@ -266,7 +550,7 @@ def write_server_config(server_config):
 
     :param server_config: dict containing server configuration
     """
-    write_config(QPC_SERVER_CONFIG, server_config)
+    write_config(get_server_config_path(), server_config)
 
 
 def write_insights_login_config(login_config):
@@ -319,24 +603,29 @@ def write_client_token(client_token):
     :param client_token: dict containing client_token
     """
     ensure_config_dir_exists()
+    path = get_client_token_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
 
-    with open(QPC_CLIENT_TOKEN, "w", encoding="utf-8") as configFile:
+    with open(path, "w", encoding="utf-8") as configFile:
         json.dump(client_token, configFile)
+    forget_cached_config(path)
 
 
 def delete_client_token():
     """Remove file client_token."""
     ensure_config_dir_exists()
+    path = get_client_token_path()
     try:
-        os.remove(QPC_CLIENT_TOKEN)
+        os.remove(path)
     except FileNotFoundError:
         pass
+    forget_cached_config(path)
 
 
 def ensure_data_dir_exists():
     """Ensure the qpc data directory exists."""
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+    # concurrent qpc processes (i.e. of batch --parallel) may create it too
+    os.makedirs(DATA_DIR, exist_ok=True)
 
 
 def setup_logging(verbosity):
@@ -347,15 +636,15 @@ def setup_logging(verbosity):
     :param verbosity: verbosity level, as measured in -v's on the command line.
         Should be an integer.
     """
-    # using default dict so any value (supposedly) higher than 1 will map to DEBUG
-    # e.g calling qpc -vv would be the same as qpc -vvvvvvvvvvv
+    # using default dict so any value (supposedly) higher than 3 will map to TRACE
+    # e.g calling qpc -vvvv would be the same as qpc -vvvvvvvvvvv
     verbosity_map = defaultdict(
-        lambda: logging.DEBUG,
-        {0: logging.ERROR, 1: logging.INFO},
+        lambda: LOG_LEVEL_TRACE,
+        {0: logging.ERROR, 1: logging.INFO, 2: logging.DEBUG, 3: logging.DEBUG},
     )
     log_level = verbosity_map[verbosity]
     log_prefix = "%(asctime)s - %(name)s - %(levelname)s"
-    if log_level == logging.DEBUG:
+    if log_level <= logging.DEBUG:
         log_prefix += " - [%(funcName)s] - %(pathname)s:%(lineno)d"
 
     log_fmt = f"{log_prefix} - %(message)s"
@@ -363,7 +652,7 @@ def setup_logging(verbosity):
     # those not coming from qpc, will go to the log file
     logging.basicConfig(filename=QPC_LOG, format=log_fmt, level=log_level)
     stream_handler = logging.StreamHandler()
-    if log_level == logging.DEBUG:
+    if log_level <= logging.DEBUG:
         # changing log format was breaking camayoc tests. let's add this extra logging
         # information only when the user actually requests for more logs.
         # (at least until we add an option controlling the log format)
@@ -372,18 +661,66 @@ def setup_logging(verbosity):
     logger.addHandler(stream_handler)
 
 
-def log_request_info(method, command, url, response_json, response_code):
+def get_log_body_limit():
+    """Obtain the maximum number of response bytes logged at INFO level.
+
+    :returns: the configured limit, or the default when there is no config
+    """
+    config = read_server_config()
+    if config is None:
+        return DEFAULT_LOG_BODY_LIMIT
+    return config.get(CONFIG_LOG_BODY_LIMIT, DEFAULT_LOG_BODY_LIMIT)
+
+
+def get_compress_requests():
+    """Check whether large request bodies are sent gzip-encoded by default.
+
+    :returns: the configured value, or False when there is no config
+    """
+    config = read_server_config()
+    if config is None:
+        return False
+    return config.get(CONFIG_COMPRESS_REQUESTS, False)
+
+
+def log_request_info(method, command, url, response, streamed=False):
     """Log the information regarding the request being made.
 
+    Nothing is read from the response unless the record would be emitted.
+    At INFO level the logged body is capped to the configured
+    log_body_limit; at TRACE level (-vvvv) the full body is logged.
+
     :param method: the method being called (ie. POST)
     :param command: the command being used (ie. qpc cred add)
     :param url: the server, port, and path
     (i.e. http://127.0.0.1:8000/api/v1/credentials/1)
-    :param response_json: the response returned from the request
-    :param response_code: the status code being returned (ie. 200)
+    :param response: the response returned from the request
+    :param streamed: True if the body is streamed, in which case it is left
+        unread for the caller to consume
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
     message = 'Method: "%s", Command: "%s", URL: "%s", Response: "%s", Status Code: "%s'
-    logger.info(message, method, command, url, response_json, response_code)
+    if streamed:
+        logger.info(message, method, command, url, "<streamed>", response.status_code)
+        return
+    if logger.isEnabledFor(LOG_LEVEL_TRACE):
+        logger.log(
+            LOG_LEVEL_TRACE,
+            message,
+            method,
+            command,
+            url,
+            response.text,
+            response.status_code,
+        )
+        return
+    limit = get_log_body_limit()
+    content = response.content or b""
+    body = content[:limit].decode("utf-8", errors="replace")
+    if len(content) > limit:
+        body += f"... [{len(content) - limit} more bytes]"
+    logger.info(message, method, command, url, body, response.status_code)
 
 
 def log_args(args):
@@ -435,6 +772,27 @@ def pretty_print(json_data):
     return json.dumps(json_data, sort_keys=True, indent=4, separators=(",", ": "))
 
 
+def print_json(json_data, output=OUTPUT_JSON):
+    """Print json data in one of the OUTPUT_FORMATS.
+
+    With OUTPUT_NDJSON every object, or every item of a list, is written
+    compactly on its own line, unsorted, and stdout is flushed so the
+    lines reach a pipe as soon as they are printed.
+
+    :param json_data: the json data to print
+    :param output: the output format
+    """
+    if output != OUTPUT_NDJSON:
+        print(pretty_print(json_data))
+        return
+    if not isinstance(json_data, list):
+        json_data = [json_data]
+    sys.stdout.writelines(
+        json.dumps(item, separators=(",", ":")) + "\n" for item in json_data
+    )
+    sys.stdout.flush()
+
+
 # Read in a file and make it a list
 def read_in_file(filename):
     """Read values from file into a list object. Expecting newline delimited.
@@ -479,11 +837,38 @@ def validate_write_file(filename, param_name):
         raise ValueError(t(messages.REPORT_DIRECTORY_DOES_NOT_EXIST % directory))
 
 
-def write_file(filename, content, binary=False):
+def iter_response_text(response, chunk_size=STREAM_CHUNK_SIZE):
+    """Decode a streamed response body chunk by chunk.
+
+    The body is decoded as response.text would, with the encoding of the
+    response (utf-8 if it has none), so it can be written in text mode.
+
+    :param response: response of a request sent with stream=True
+    :param chunk_size: size in bytes of the chunks read from the response
+    :returns: iterator of str chunks
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(
+        errors="replace"
+    )
+    for chunk in response.iter_content(chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def write_file(filename, content, binary=False, progress=None):
     """Write content to a file.
 
     :param filename: the filename to write
-    :param content: the file content to write
+    :param content: the file content to write; either a str/bytes object or
+        an iterable of chunks (i.e. response.iter_content()), which is written
+        chunk by chunk so the whole content is never held in memory
+    :param binary: True to write the file in binary mode
+    :param progress: optional callable receiving the number of bytes written
+        so far after each chunk, and done=True once all chunks are written
     :raises: EnvironmentError if file cannot be written
     """
     result = None
@@ -495,10 +880,32 @@ def write_file(filename, content, binary=False):
         if binary:
             mode = "wb"
         with open(input_path, mode) as out_file:  # pylint: disable=unspecified-encoding
-            out_file.write(content)
+            if isinstance(content, (str, bytes)):
+                out_file.write(content)
+            else:
+                written = 0
+                for chunk in content:
+                    out_file.write(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress(written)
+                if progress:
+                    progress(written, done=True)
     return result
 
 
+def print_progress(bytes_written, done=False):
+    """Print the number of bytes downloaded so far to stderr.
+
+    :param bytes_written: the number of bytes written so far
+    :param done: True once the download is complete
+    """
+    sys.stderr.write("\r" + t(messages.DOWNLOAD_PROGRESS) % bytes_written)
+    if done:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
 def extract_json_from_tar(fileobj_content, print_pretty=True):
     """Extract json data from tar.gz bytes.
 
@@ -506,6 +913,8 @@ def extract_json_from_tar(fileobj_content, print_pretty=True):
     :param print_pretty: Boolean to determine whether to return pretty
         print json (str) or normal json
     """
+    import tarfile  # pylint: disable=import-outside-toplevel
+
     with tarfile.open(fileobj=io.BytesIO(fileobj_content), mode="r:gz") as tar:
         json_file = tar.getmembers()[0]
         tar_info = tar.extractfile(json_file)
@@ -515,8 +924,31 @@ def extract_json_from_tar(fileobj_content, print_pretty=True):
         return json_data
 
 
+def extract_json_from_tar_stream(fileobj, print_pretty=True):
+    """Extract json data from a tar.gz file object without buffering it.
+
+    The tarball is read sequentially, so fileobj can be a non-seekable
+    stream such as the raw body of a streamed response.
+
+    :param fileobj: file-like object with tarball of json dict
+    :param print_pretty: Boolean to determine whether to return pretty
+        print json (str) or normal json
+    """
+    import tarfile  # pylint: disable=import-outside-toplevel
+
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        json_file = tar.next()
+        tar_info = tar.extractfile(json_file)
+        json_data = json.load(tar_info)
+        if print_pretty:
+            return pretty_print(json_data)
+        return json_data
+
+
 def create_tar_buffer(files_data):
     """Generate a file buffer based off a dictionary."""
+    import tarfile  # pylint: disable=import-outside-toplevel
+
     if not isinstance(files_data, (dict,)):
         logger.error(messages.CREATE_TAR_ERROR_FILE)
         return None
@@ -556,6 +988,9 @@ def write_encryption_key_if_non_existent():
     the function will check its existence every time it is called
     """
     if not os.path.exists(INSIGHTS_ENCRYPTION):
+        # pylint: disable=import-outside-toplevel
+        from cryptography.fernet import Fernet
+
         key = Fernet.generate_key()
         with open(INSIGHTS_ENCRYPTION, "wb") as key_file:
             key_file.write(key)
@@ -575,6 +1010,9 @@ def load_encryption_key():
 
 def encrypt_password(password):
     """Encrypt password before saving it to insights_login_config file."""
+    # pylint: disable=import-outside-toplevel
+    from cryptography.fernet import Fernet
+
     write_encryption_key_if_non_existent()
     key = load_encryption_key()
 
@@ -586,6 +1024,9 @@ def encrypt_password(password):
 
 def decrypt_password(password):
     """Retrieve password from login config file and decrypt it."""
+    # pylint: disable=import-outside-toplevel
+    from cryptography.fernet import Fernet, InvalidToken
+
     key = load_encryption_key()
     encryption_algorithm = Fernet(key)
 
@@ -598,6 +1039,123 @@ def decrypt_password(password):
     return decrypted_password.decode()
 
 
+def validate_server_profile(arg):
+    """Check that arg can name a server profile.
+
+    :param arg: the profile name
+    :returns: The arg
+    :raises: ArgumentTypeError, if arg is not a valid profile name.
+    """
+    if not SERVER_PROFILE_PATTERN.match(arg):
+        raise ArgumentTypeError(t(messages.SERVER_PROFILE_INVALID) % arg)
+    return arg
+
+
+def validate_server_profiles(arg):
+    """Check that arg is a comma separated list of server profiles.
+
+    :param arg: the profile names, separated by commas
+    :returns: list of profile names, without duplicates
+    :raises: ArgumentTypeError, if a name is not a valid profile name.
+    """
+    names = [name.strip() for name in arg.split(",") if name.strip()]
+    if not names:
+        raise ArgumentTypeError(t(messages.SERVER_PROFILE_INVALID) % arg)
+    return list(dict.fromkeys(validate_server_profile(name) for name in names))
+
+
+def validate_field_list(arg):
+    """Check that arg is a comma separated list of field names.
+
+    :param arg: the field names, separated by commas
+    :returns: list of field names, without duplicates
+    :raises: ArgumentTypeError, if no field is named.
+    """
+    fields = [field.strip() for field in arg.split(",") if field.strip()]
+    if not fields:
+        raise ArgumentTypeError(t(messages.LIST_FIELDS_INVALID) % arg)
+    return list(dict.fromkeys(fields))
+
+
+def validate_filter(arg):
+    """Check that arg is a KEY=VALUE filter expression.
+
+    :param arg: the filter expression
+    :returns: tuple of the key and the value
+    :raises: ArgumentTypeError, if arg has no key or no "=".
+    """
+    key, equals, value = arg.partition("=")
+    if not equals or not key.strip():
+        raise ArgumentTypeError(t(messages.LIST_FILTER_INVALID) % arg)
+    return key.strip(), value
+
+
+def validate_positive_int(arg):
+    """Check that arg is a positive integer.
+
+    :param arg: either a string or an integer.
+    :returns: The arg, as an integer.
+    :raises: ArgumentTypeError, if arg is not a positive integer.
+    """
+    try:
+        value = int(arg)
+    except (TypeError, ValueError) as exception:
+        raise ArgumentTypeError(t(messages.VALUE_NOT_POSITIVE_INT) % arg) from exception
+    if value < 1:
+        raise ArgumentTypeError(t(messages.VALUE_NOT_POSITIVE_INT) % arg)
+    return value
+
+
+def validate_non_negative_int(arg):
+    """Check that arg is zero or a positive integer.
+
+    :param arg: either a string or an integer.
+    :returns: The arg, as an integer.
+    :raises: ArgumentTypeError, if arg is not a non-negative integer.
+    """
+    try:
+        value = int(arg)
+    except (TypeError, ValueError) as exception:
+        raise ArgumentTypeError(
+            t(messages.VALUE_NOT_NON_NEGATIVE_INT) % arg
+        ) from exception
+    if value < 0:
+        raise ArgumentTypeError(t(messages.VALUE_NOT_NON_NEGATIVE_INT) % arg)
+    return value
+
+
+def parse_version(version):
+    """Split a version string into a tuple that compares as versions do.
+
+    Runs of digits compare numerically and runs of letters alphabetically,
+    so "1.10.0" > "1.9.2" and "1.0.0" > "1.0"; a number sorts after
+    letters at the same position. Other characters only separate the parts.
+
+    :param version: version string (i.e. "1.4.3")
+    :returns: tuple to compare with other parsed versions
+    """
+    return tuple(
+        (1, int(part), "") if part.isdigit() else (0, 0, part)
+        for part in re.findall(r"\d+|[a-z]+", str(version).lower())
+    )
+
+
+def get_exit_code(code):
+    """Turn the code of a SystemExit into a process exit status.
+
+    As the interpreter does, messages are printed to stderr and give 1.
+
+    :param code: the code attribute of the SystemExit
+    :returns: exit status as an integer
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
 def check_if_prompt_is_not_empty(pass_prompt):
     """Validate user prompt."""
     if not pass_prompt: